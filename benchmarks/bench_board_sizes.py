@@ -0,0 +1,106 @@
+"""Benchmark how move generation and search scale with the board size.
+
+Run with: python benchmarks/bench_board_sizes.py
+"""
+import argparse
+import random
+import time
+from collections.abc import Callable
+
+from othello.ai import search_move
+from othello.bitboard import get_board_masks, get_player_bitboards, get_legal_moves_bits
+from othello.components import (
+    BOARD_TYPE, COLOUR_TYPE, initialise_board, get_legal_moves, make_move, invert_player_colour
+)
+
+BOARD_SIZES = [4, 6, 8, 10, 12, 14, 16]
+
+def get_random_positions(
+    board_size: int,
+    count: int,
+    seed: int
+) -> list[tuple[BOARD_TYPE, COLOUR_TYPE]]:
+    """Return positions reached by random moves, roughly half way through the game."""
+    rng = random.Random(seed)
+    positions: list[tuple[BOARD_TYPE, COLOUR_TYPE]] = []
+
+    while len(positions) < count:
+        board = initialise_board(board_size)
+        colour: COLOUR_TYPE = "Dark"
+
+        for _ in range((board_size * board_size) // 2):
+            legal_moves = get_legal_moves(board=board, colour=colour)
+
+            if len(legal_moves) > 0:
+                make_move(board=board, move=rng.choice(legal_moves), colour=colour)
+
+            colour = invert_player_colour(colour)
+
+        if len(get_legal_moves(board=board, colour=colour)) > 0:
+            positions.append((board, colour))
+
+    return positions
+
+def time_per_call_us(function: Callable[[], object], repeats: int) -> float:
+    """Return the mean time of calling a function, in microseconds."""
+    start_time = time.perf_counter()
+
+    for _ in range(repeats):
+        function()
+
+    return (time.perf_counter() - start_time) / repeats * 1_000_000
+
+def main() -> None:
+    """Print a table of move generation and search timings for each board size."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--positions", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(
+        f"{'size':>4}  {'list movegen (us)':>18}  {'bitboard movegen (us)':>22}  "
+        f"{'speedup':>8}  {f'depth {args.depth} search (ms)':>20}  {'nodes':>8}"
+    )
+
+    for board_size in BOARD_SIZES:
+        positions = get_random_positions(board_size, args.positions, args.seed)
+        masks = get_board_masks(board_size)
+
+        list_times = []
+        bitboard_times = []
+        search_times = []
+        search_nodes = []
+
+        for board, colour in positions:
+            player, opponent = get_player_bitboards(board=board, colour=colour)
+
+            list_times.append(time_per_call_us(
+                lambda board=board, colour=colour: get_legal_moves(board=board, colour=colour),
+                args.repeats
+            ))
+            bitboard_times.append(time_per_call_us(
+                lambda player=player, opponent=opponent: get_legal_moves_bits(
+                    player, opponent, masks
+                ),
+                args.repeats
+            ))
+
+            start_time = time.perf_counter()
+            search_result = search_move(board=board, colour=colour, max_depth=args.depth)
+            search_times.append((time.perf_counter() - start_time) * 1000)
+            search_nodes.append(search_result.nodes)
+
+        list_mean = sum(list_times) / len(list_times)
+        bitboard_mean = sum(bitboard_times) / len(bitboard_times)
+
+        print(
+            f"{board_size:>4}  {list_mean:>18.1f}  {bitboard_mean:>22.1f}  "
+            f"{list_mean / bitboard_mean:>7.1f}x  "
+            f"{sum(search_times) / len(search_times):>20.1f}  "
+            f"{sum(search_nodes) // len(search_nodes):>8}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark the depth reached at a fixed time budget with each selective search feature.
+
+Run with: python benchmarks/bench_selective_search.py
+"""
+import argparse
+import time
+
+from bench_board_sizes import get_random_positions
+
+from othello.ai import SelectiveSearchOptions, get_transposition_table, search_move
+
+SETTINGS = {
+    "none": SelectiveSearchOptions(),
+    "stability": SelectiveSearchOptions(stability_cutoffs=True),
+    "probcut": SelectiveSearchOptions(probcut=True),
+    "both": SelectiveSearchOptions(probcut=True, stability_cutoffs=True),
+}
+
+def main() -> None:
+    """Print the mean depth, nodes and time of searches with each selective search setting."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=8)
+    parser.add_argument("--positions", type=int, default=20)
+    parser.add_argument("--time-ms", type=float, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    positions = get_random_positions(args.size, args.positions, args.seed)
+    baseline_moves = []
+
+    print(
+        f"{'setting':>10}  {'mean depth':>10}  {'max depth':>9}  {'nodes':>8}  "
+        f"{'time (ms)':>9}  {'same move':>9}"
+    )
+
+    for name, options in SETTINGS.items():
+        depths = []
+        nodes = []
+        times = []
+        moves = []
+
+        for board, colour in positions:
+            # Every search starts cold, so the settings are compared fairly
+            get_transposition_table(options).clear()
+
+            start_time = time.perf_counter()
+            search_result = search_move(
+                board=board, colour=colour, deadline_ms=args.time_ms, options=options
+            )
+            times.append((time.perf_counter() - start_time) * 1000)
+
+            depths.append(search_result.depth)
+            nodes.append(search_result.nodes)
+            moves.append(search_result.move)
+
+        if len(baseline_moves) == 0:
+            baseline_moves = moves
+
+        same_moves = sum(
+            move == baseline_move for move, baseline_move in zip(moves, baseline_moves)
+        )
+
+        print(
+            f"{name:>10}  {sum(depths) / len(depths):>10.2f}  {max(depths):>9}  "
+            f"{sum(nodes) // len(nodes):>8}  {sum(times) / len(times):>9.1f}  "
+            f"{same_moves / len(moves):>8.0%}"
+        )
+
+if __name__ == "__main__":
+    main()
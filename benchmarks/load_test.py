@@ -0,0 +1,254 @@
+"""Load test the web app with concurrent virtual players, each playing full games.
+
+Runs the app in-process through the Flask test client, or against a running server with --url.
+
+Run with: python benchmarks/load_test.py --players 16 --games 4
+"""
+import argparse
+import functools
+import http.cookiejar
+import json
+import logging
+import math
+import random
+import tempfile
+import time
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from othello.components import get_legal_moves
+from othello.flask_game_engine import app
+
+# A JSON response from the app
+RESPONSE_TYPE = dict[str, Any]
+
+# Sends a GET request to a route with query arguments, returning the JSON response
+GET_TYPE = Callable[[str, dict[str, object]], RESPONSE_TYPE]
+
+ENDPOINTS = ["/newgame", "/move"]
+PERCENTILES = [50, 95, 99]
+
+class PlayerStats:
+    """Class to hold one virtual player's request latencies and failures, per endpoint."""
+
+    latencies_ms: dict[str, list[float]]
+    errors: dict[str, int]
+    games_finished: int
+
+    def __init__(self) -> None:
+        """Initialise empty stats."""
+        self.latencies_ms = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.games_finished = 0
+
+def get_in_process_client() -> GET_TYPE:
+    """Return a function sending requests to the app through its own test client."""
+    client = app.test_client()
+
+    def get(path: str, args: dict[str, object]) -> RESPONSE_TYPE:
+        """Send a request through the test client."""
+        return client.get(path, query_string=args).get_json()
+
+    return get
+
+def get_http_client(url: str) -> GET_TYPE:
+    """Return a function sending requests to a running server, keeping its session cookie.
+
+    The app only lets the client that started a game change it, so each player keeps its own.
+    """
+    opener = urllib.request.build_opener(
+        urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+    )
+
+    def get(path: str, args: dict[str, object]) -> RESPONSE_TYPE:
+        """Send a request over HTTP."""
+        with opener.open(
+            f"{url.rstrip('/')}{path}?{urllib.parse.urlencode(args)}", timeout=60
+        ) as response:
+            return json.load(response)
+
+    return get
+
+def timed_get(
+    get: GET_TYPE,
+    path: str,
+    args: dict[str, object],
+    stats: PlayerStats
+) -> RESPONSE_TYPE | None:
+    """Send a request and record its latency, returning None if it failed."""
+    start_time = time.perf_counter()
+
+    try:
+        response = get(path, args)
+    except Exception:
+        response = None
+
+    stats.latencies_ms[path].append((time.perf_counter() - start_time) * 1000)
+
+    if response is None or response.get("status") != "success":
+        stats.errors[path] += 1
+
+        return None
+
+    return response
+
+def play_games(
+    get: GET_TYPE,
+    game_mode: str,
+    board_size: int,
+    games: int,
+    seed: int
+) -> PlayerStats:
+    """Play full games as one virtual player, choosing random legal moves."""
+    rng = random.Random(seed)
+    stats = PlayerStats()
+    game_id = None
+
+    for _ in range(games):
+        new_game_args: dict[str, object] = {"game_mode": game_mode, "size": board_size}
+
+        # Like the front-end, each new game replaces the player's previous one
+        if game_id is not None:
+            new_game_args["game_id"] = game_id
+
+        response = timed_get(get, "/newgame", new_game_args, stats)
+
+        if response is None:
+            continue
+
+        game_id = response["game_id"]
+
+        # In AI mode the AI's replies are made within the /move requests
+        while response is not None and not response["finished"]:
+            legal_moves = get_legal_moves(board=response["board"], colour=response["player"])
+
+            # The app passes for a player without moves, so this is only reached if the app
+            # left a turn it should have skipped. The game cannot go on, and is not counted
+            if len(legal_moves) == 0:
+                stats.errors["/move"] += 1
+                response = None
+
+                break
+
+            row, col = rng.choice(legal_moves)
+
+            response = timed_get(
+                get, "/move", {"game_id": game_id, "x": col + 1, "y": row + 1}, stats
+            )
+
+        if response is not None:
+            stats.games_finished += 1
+
+    return stats
+
+def get_percentile(sorted_values: list[float], percentile: float) -> float:
+    """Return a percentile of sorted values, by the nearest-rank method."""
+    return sorted_values[max(math.ceil(percentile / 100 * len(sorted_values)) - 1, 0)]
+
+def run_load(
+    create_client: Callable[[], GET_TYPE],
+    game_mode: str,
+    players: int,
+    games: int,
+    board_size: int,
+    seed: int
+) -> tuple[PlayerStats, float]:
+    """Play games with concurrent virtual players, returning their combined stats and the time."""
+    clients = [create_client() for _ in range(players)]
+    start_time = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=players) as executor:
+        player_stats = list(executor.map(
+            lambda player: play_games(
+                clients[player], game_mode, board_size, games, seed + player
+            ),
+            range(players)
+        ))
+
+    elapsed = time.perf_counter() - start_time
+    stats = PlayerStats()
+
+    for player_stat in player_stats:
+        for path in player_stat.latencies_ms:
+            stats.latencies_ms[path].extend(player_stat.latencies_ms[path])
+            stats.errors[path] += player_stat.errors[path]
+
+        stats.games_finished += player_stat.games_finished
+
+    return stats, elapsed
+
+def print_report(game_mode: str, stats: PlayerStats, elapsed: float) -> None:
+    """Print the throughput and latency percentiles of each endpoint."""
+    print(
+        f"{game_mode}: {stats.games_finished} games finished in {elapsed:.1f} s "
+        f"({stats.games_finished / elapsed:.2f} games/s)"
+    )
+    print(
+        f"{'endpoint':>10}  {'requests':>8}  {'errors':>6}  {'req/s':>8}  "
+        + "  ".join(f"{f'p{percentile} (ms)':>10}" for percentile in PERCENTILES)
+    )
+
+    for path in ENDPOINTS:
+        latencies_ms = sorted(stats.latencies_ms[path])
+
+        if len(latencies_ms) == 0:
+            continue
+
+        print(
+            f"{path:>10}  {len(latencies_ms):>8}  {stats.errors[path]:>6}  "
+            f"{len(latencies_ms) / elapsed:>8.1f}  "
+            + "  ".join(
+                f"{get_percentile(latencies_ms, percentile):>10.1f}"
+                for percentile in PERCENTILES
+            )
+        )
+
+    print()
+
+def main() -> None:
+    """Run the load test for each game mode and print a report for each."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--players", type=int, default=8, help="Concurrent virtual players.")
+    parser.add_argument("--games", type=int, default=2, help="Games played by each player.")
+    parser.add_argument("--modes", nargs="+", choices=["pvp", "ai"], default=["pvp", "ai"])
+    parser.add_argument("--size", type=int, default=8, help="Board size.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--url", default=None, help="Server to test, such as http://127.0.0.1:5000. "
+        "Without one, the app is run in-process."
+    )
+    parser.add_argument(
+        "--ai-deadline-ms", type=float, default=None,
+        help="AI move time in-process. Defaults to the app's AI_DEADLINE_MS."
+    )
+    args = parser.parse_args()
+
+    if args.url is not None:
+        create_client = functools.partial(get_http_client, args.url)
+    else:
+        create_client = get_in_process_client
+        store_directory = tempfile.TemporaryDirectory()
+
+        # Every player's game stays in memory, and games are stored away from the working directory
+        app.config["MAX_GAMES"] = max(app.config["MAX_GAMES"], args.players)
+        app.config["GAME_STORE_PATH"] = f"{store_directory.name}/games.sqlite3"
+
+        if args.ai_deadline_ms is not None:
+            app.config["AI_DEADLINE_MS"] = args.ai_deadline_ms
+
+        # Logging every move would bury the report
+        logging.getLogger("othello_web").setLevel(logging.WARNING)
+
+    for game_mode in args.modes:
+        stats, elapsed = run_load(
+            create_client=create_client, game_mode=game_mode, players=args.players,
+            games=args.games, board_size=args.size, seed=args.seed
+        )
+        print_report(game_mode, stats, elapsed)
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,26 @@
 import copy
+import json
+import os
 import random
 import math
+import time
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field, replace
+from . import metrics
 from .components import (
     COLOUR_TYPE, BOARD_TYPE, MOVE_TYPE,
-    get_legal_moves, make_move, invert_player_colour
+    get_legal_moves, invert_player_colour, get_cell_position_type
 )
+from .bitboard import (
+    BoardMasks, get_board_masks, get_player_bitboards, get_legal_moves_bits,
+    make_move_bits, iterate_bits, bit_to_move, get_stable_discs, get_flips
+)
+from .symmetry import (
+    IDENTITY, INVERSE_TRANSFORMS, canonicalize_bitboards, transform_move, transform_move_bit
+)
+from .perfect_play import PerfectPlayTable, get_perfect_play_table
 
 CORNER_WEIGHT = 30
 EDGE_WEIGHT = 15
@@ -12,6 +28,449 @@ CORNER_ADJ_WEIGHT = 20
 EDGE_ADJ_WEIGHT = 10
 CORNER_ADJ_ADJ_WEIGHT = 6
 EDGE_ADJ_ADJ_WEIGHT = 1
+MOBILITY_WEIGHT = 1
+
+# A weights file written by othello-tune replaces the weights above, if this variable names one
+WEIGHTS_PATH_VARIABLE = "OTHELLO_WEIGHTS"
+
+# Finished games are scored far outside the range of score_board
+WIN_SCORE = 10_000
+
+# Without a deadline the AI looks one move ahead
+DEFAULT_SEARCH_DEPTH = 1
+
+# The clock is only read once every this many nodes
+CLOCK_CHECK_INTERVAL = 8
+
+# Fraction of the deadline at which the search stops, leaving time to send the response
+DEADLINE_SAFETY_FACTOR = 0.9
+
+# A new iteration is not started once this fraction of the deadline has been used,
+# as it would not be able to finish
+ITERATION_START_FACTOR = 0.5
+
+# Maximum number of positions held in the transposition table before it is cleared
+TRANSPOSITION_TABLE_SIZE = 100_000
+
+# Positions with at least this much depth left are stored in the transposition table by
+# their canonical symmetry, so all 8 symmetric equivalents share one entry. Shallower
+# positions are too cheap to search for the canonicalisation to pay off
+SYMMETRY_MIN_DEPTH = 3
+
+# Multi-ProbCut tries shallow searches this much shallower than a node, cheapest first,
+# at nodes with at least the minimum depth left
+PROBCUT_MIN_DEPTH = 3
+PROBCUT_DEPTH_REDUCTIONS = (4, 2)
+
+# A shallow score must predict a cutoff by this many standard deviations before it is trusted
+PROBCUT_THRESHOLD = 1.5
+
+# A file written by othello-probcut replaces the fitted ProbCut lines below, if this variable
+# names one
+PROBCUT_PATH_VARIABLE = "OTHELLO_PROBCUT"
+
+# Below this depth, children are too cheap to search for ordering them by mobility to pay off
+MOBILITY_ORDERING_MIN_DEPTH = 3
+
+# Default number of analysed positions held by an analysis cache
+ANALYSIS_CACHE_SIZE = 1024
+
+# Transposition table score bounds
+EXACT_BOUND = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+BOARD_KEY_TYPE = tuple[tuple[tuple[COLOUR_TYPE | None, ...], ...], COLOUR_TYPE]
+
+# (side to move, other side, whether the AI is to move, board size)
+POSITION_KEY_TYPE = tuple[int, int, bool, int]
+
+# (canonical side to move, canonical other side, board size, depth limit, time limit)
+ANALYSIS_KEY_TYPE = tuple[int, int, int, int | None, float | None]
+
+# (board size, depth, shallow depth, whether the AI is to move)
+PROBCUT_KEY_TYPE = tuple[int, int, int, bool]
+
+@dataclass
+class SearchResult:
+    """Result of a search: the best move found, its score and the depth fully searched.
+
+    The principal variation is the expected line of play, with None for a passed turn.
+    """
+
+    move: MOVE_TYPE | None
+    score: float
+    depth: int
+    nodes: int
+    principal_variation: list[MOVE_TYPE | None] = field(default_factory=list)
+
+@dataclass(frozen=True)
+class EvaluationWeights:
+    """Weights of each score_board feature, with penalties stored as negative weights."""
+
+    corner: int = CORNER_WEIGHT
+    edge: int = EDGE_WEIGHT
+    corner_adj: int = -CORNER_ADJ_WEIGHT
+    edge_adj: int = -EDGE_ADJ_WEIGHT
+    corner_adj_adj: int = CORNER_ADJ_ADJ_WEIGHT
+    edge_adj_adj: int = EDGE_ADJ_ADJ_WEIGHT
+    mobility: int = MOBILITY_WEIGHT
+
+def load_evaluation_weights(path: str) -> EvaluationWeights:
+    """Return the weights in a JSON weights file. Weights missing from the file keep their default.
+
+    Raises ValueError if the file has an unknown or non-integer weight.
+    """
+    with open(path) as weights_file:
+        weights = json.load(weights_file)
+
+    for name, weight in weights.items():
+        if name not in EvaluationWeights.__dataclass_fields__:
+            raise ValueError(f"Unknown weight {name!r}.")
+        if not isinstance(weight, int):
+            raise ValueError(f"Weight {name!r} must be an integer.")
+
+    return EvaluationWeights(**weights)
+
+def get_evaluation_weights() -> EvaluationWeights:
+    """Return the weights used by score_board."""
+    return evaluation_weights
+
+def set_evaluation_weights(weights: EvaluationWeights) -> None:
+    """Set the weights used by score_board. Stored scores are not cleared, so set them first."""
+    global evaluation_weights
+
+    evaluation_weights = weights
+
+# Weights used by score_board, loaded once at startup
+evaluation_weights = (
+    load_evaluation_weights(os.environ[WEIGHTS_PATH_VARIABLE])
+    if os.environ.get(WEIGHTS_PATH_VARIABLE) else EvaluationWeights()
+)
+
+@dataclass(frozen=True)
+class ProbCutLine:
+    """Linear prediction of a position's search score from a shallower search of it."""
+
+    slope: float
+    intercept: float
+    sigma: float
+
+@dataclass(frozen=True)
+class SelectiveSearchOptions:
+    """Selective search features, which prune lines that are unlikely or unable to matter."""
+
+    probcut: bool = False
+    probcut_threshold: float = PROBCUT_THRESHOLD
+    stability_cutoffs: bool = False
+
+# Fitted by othello-probcut on 300 random 8x8 positions, searched without selective search
+DEFAULT_PROBCUT_LINES: dict[PROBCUT_KEY_TYPE, ProbCutLine] = {
+    (8, 3, 1, False): ProbCutLine(slope=0.961, intercept=7.2, sigma=12.7),
+    (8, 3, 1, True): ProbCutLine(slope=0.965, intercept=5.7, sigma=11.5),
+    (8, 4, 2, False): ProbCutLine(slope=1.014, intercept=4.1, sigma=10.7),
+    (8, 4, 2, True): ProbCutLine(slope=0.974, intercept=6.7, sigma=11.6),
+    (8, 5, 1, False): ProbCutLine(slope=0.975, intercept=11.8, sigma=18.4),
+    (8, 5, 1, True): ProbCutLine(slope=0.941, intercept=10.4, sigma=17.0),
+    (8, 5, 3, False): ProbCutLine(slope=1.038, intercept=4.6, sigma=9.9),
+    (8, 5, 3, True): ProbCutLine(slope=0.999, intercept=4.2, sigma=8.8),
+    (8, 6, 2, False): ProbCutLine(slope=1.029, intercept=7.7, sigma=16.3),
+    (8, 6, 2, True): ProbCutLine(slope=0.990, intercept=11.4, sigma=17.9),
+    (8, 6, 4, False): ProbCutLine(slope=1.029, intercept=3.4, sigma=9.7),
+    (8, 6, 4, True): ProbCutLine(slope=1.040, intercept=4.1, sigma=10.0),
+}
+
+def load_probcut_lines(path: str) -> dict[PROBCUT_KEY_TYPE, ProbCutLine]:
+    """Return the ProbCut lines in a JSON file written by othello-probcut.
+
+    Raises ValueError if a line does not have a positive slope and standard deviation.
+    """
+    with open(path) as lines_file:
+        entries = json.load(lines_file)
+
+    probcut_lines = {}
+
+    for entry in entries:
+        probcut_line = ProbCutLine(
+            slope=entry["slope"], intercept=entry["intercept"], sigma=entry["sigma"]
+        )
+
+        if probcut_line.slope <= 0 or probcut_line.sigma <= 0:
+            raise ValueError("ProbCut lines must have a positive slope and standard deviation.")
+
+        key = (entry["board_size"], entry["depth"], entry["shallow_depth"], entry["maximising"])
+        probcut_lines[key] = probcut_line
+
+    return probcut_lines
+
+def get_probcut_lines() -> dict[PROBCUT_KEY_TYPE, ProbCutLine]:
+    """Return the ProbCut lines used by the search."""
+    return probcut_lines
+
+def set_probcut_lines(lines: dict[PROBCUT_KEY_TYPE, ProbCutLine]) -> None:
+    """Set the ProbCut lines used by the search."""
+    global probcut_lines
+
+    probcut_lines = lines
+
+# ProbCut lines used by the search, loaded once at startup
+probcut_lines = (
+    load_probcut_lines(os.environ[PROBCUT_PATH_VARIABLE])
+    if os.environ.get(PROBCUT_PATH_VARIABLE) else DEFAULT_PROBCUT_LINES
+)
+
+class SearchTimeoutError(Exception):
+    """Raised inside the search when the deadline has been reached."""
+
+class TranspositionTable:
+    """Class to store searched scores by position, so they can be reused by later searches."""
+
+    entries: dict[POSITION_KEY_TYPE, tuple[int, float, int, int]]
+    max_entries: int
+
+    def __init__(self, max_entries: int = TRANSPOSITION_TABLE_SIZE) -> None:
+        """Initialise an empty table holding up to a maximum number of positions."""
+        self.entries = {}
+        self.max_entries = max_entries
+
+    def lookup(
+        self,
+        key: POSITION_KEY_TYPE,
+        depth: int,
+        alpha: float,
+        beta: float
+    ) -> float | None:
+        """Return a stored score if it was searched deep enough and is usable in the window."""
+        if metrics.enabled:
+            metrics.TRANSPOSITION_TABLE_LOOKUPS.inc()
+
+        entry = self.entries.get(key)
+
+        if entry is None:
+            return None
+
+        entry_depth, score, bound, _ = entry
+
+        if entry_depth < depth:
+            return None
+
+        if (bound == EXACT_BOUND or
+            (bound == LOWER_BOUND and score >= beta) or
+            (bound == UPPER_BOUND and score <= alpha)):
+            if metrics.enabled:
+                metrics.TRANSPOSITION_TABLE_HITS.inc()
+
+            return score
+
+        return None
+
+    def store(
+        self,
+        key: POSITION_KEY_TYPE,
+        depth: int,
+        score: float,
+        alpha: float,
+        beta: float,
+        best_move_bit: int = 0
+    ) -> None:
+        """Store a score searched with a given window, recording whether it is a bound."""
+        if len(self.entries) >= self.max_entries:
+            self.entries.clear()
+
+        if score <= alpha:
+            bound = UPPER_BOUND
+        elif score >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT_BOUND
+
+        self.entries[key] = (depth, score, bound, best_move_bit)
+
+    def get_best_move(self, key: POSITION_KEY_TYPE) -> int:
+        """Return the bit of the best move stored for a position, or 0 if there is none."""
+        entry = self.entries.get(key)
+
+        return entry[3] if entry is not None else 0
+
+    def clear(self) -> None:
+        """Remove all stored positions."""
+        self.entries.clear()
+
+# Shared by all exact searches, so later searches are warmed by earlier ones
+transposition_table = TranspositionTable()
+
+# Selective searches store pruned scores, so each set of options has its own shared table,
+# and exact searches never read their scores
+transposition_tables: dict[SelectiveSearchOptions, TranspositionTable] = {
+    SelectiveSearchOptions(): transposition_table
+}
+transposition_tables_lock = threading.Lock()
+
+def get_transposition_table(options: SelectiveSearchOptions) -> TranspositionTable:
+    """Return the table shared by searches with the given selective search options."""
+    with transposition_tables_lock:
+        table = transposition_tables.get(options)
+
+        if table is None:
+            table = transposition_tables[options] = TranspositionTable()
+
+        return table
+
+class AnalysisCache:
+    """Class to store analyze_moves results by position and limits, least recently used first.
+
+    Positions are keyed by their canonical symmetry, so a result is reused for all 8
+    symmetric equivalents of a position, with its moves mapped to match.
+    """
+
+    entries: OrderedDict[ANALYSIS_KEY_TYPE, list[SearchResult]]
+    max_entries: int
+
+    def __init__(self, max_entries: int = ANALYSIS_CACHE_SIZE) -> None:
+        """Initialise an empty cache holding up to a maximum number of positions."""
+        self.entries = OrderedDict()
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        board: BOARD_TYPE,
+        colour: COLOUR_TYPE,
+        depth: int | None,
+        time_ms: float | None
+    ) -> list[SearchResult] | None:
+        """Return the stored results for a position analysed with given limits, if there are any."""
+        key, transform = self.get_key(board, colour, depth, time_ms)
+
+        with self._lock:
+            search_results = self.entries.get(key)
+
+            if search_results is not None:
+                self.entries.move_to_end(key)
+
+        if metrics.enabled:
+            metrics.ANALYSIS_CACHE_LOOKUPS.inc()
+
+            if search_results is not None:
+                metrics.ANALYSIS_CACHE_HITS.inc()
+
+        if search_results is None:
+            return None
+
+        # Map the moves from the canonical position back to this one
+        return [
+            transform_search_result(search_result, INVERSE_TRANSFORMS[transform], len(board))
+            for search_result in search_results
+        ]
+
+    def put(
+        self,
+        board: BOARD_TYPE,
+        colour: COLOUR_TYPE,
+        depth: int | None,
+        time_ms: float | None,
+        search_results: list[SearchResult]
+    ) -> None:
+        """Store the results for a position analysed with given limits."""
+        key, transform = self.get_key(board, colour, depth, time_ms)
+        search_results = [
+            transform_search_result(search_result, transform, len(board))
+            for search_result in search_results
+        ]
+
+        with self._lock:
+            self.entries[key] = search_results
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def get_key(
+        self,
+        board: BOARD_TYPE,
+        colour: COLOUR_TYPE,
+        depth: int | None,
+        time_ms: float | None
+    ) -> tuple[ANALYSIS_KEY_TYPE, int]:
+        """Return the key for a position and limits, and the transform to its canonical form."""
+        player, opponent = get_player_bitboards(board=board, colour=colour)
+        player, opponent, transform = canonicalize_bitboards(player, opponent, len(board))
+
+        return (player, opponent, len(board), depth, time_ms), transform
+
+def transform_search_result(
+    search_result: SearchResult,
+    transform: int,
+    size: int
+) -> SearchResult:
+    """Return a search result with its move and principal variation moved by a transform."""
+    if transform == IDENTITY:
+        return search_result
+
+    return replace(
+        search_result,
+        move=transform_move(search_result.move, transform, size)
+        if search_result.move is not None else None,
+        principal_variation=[
+            transform_move(move, transform, size) if move is not None else None
+            for move in search_result.principal_variation
+        ]
+    )
+
+class SearchContext:
+    """Class to store the deadline, stop flag, options, weights and counters of one search."""
+
+    masks: BoardMasks
+    deadline: float | None
+    stop_event: threading.Event | None
+    transposition_table: TranspositionTable
+    options: SelectiveSearchOptions
+    weights: EvaluationWeights
+    nodes: int
+
+    def __init__(
+        self,
+        masks: BoardMasks,
+        deadline: float | None,
+        stop_event: threading.Event | None = None,
+        table: TranspositionTable | None = None,
+        options: SelectiveSearchOptions | None = None,
+        weights: EvaluationWeights | None = None
+    ) -> None:
+        """Initialise the context with an absolute deadline from time.perf_counter.
+
+        Without options the search is exact. Without a table, the table shared by searches
+        with the same options is used. Without weights, the current evaluation weights are used.
+        """
+        if options is None:
+            options = SelectiveSearchOptions()
+
+        self.masks = masks
+        self.deadline = deadline
+        self.stop_event = stop_event
+        self.transposition_table = table if table is not None else get_transposition_table(options)
+        self.options = options
+        self.weights = weights if weights is not None else evaluation_weights
+        self.nodes = 0
+
+    def visit_node(self) -> None:
+        """Count a searched node, and raise SearchTimeoutError if the search should stop."""
+        self.nodes += 1
+
+        # Reading the clock is far more expensive than counting, so only check periodically
+        if self.nodes % CLOCK_CHECK_INTERVAL != 0:
+            return
+
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchTimeoutError
+
+        if self.stop_event is not None and self.stop_event.is_set():
+            raise SearchTimeoutError
+
+def get_board_key(board: BOARD_TYPE, colour: COLOUR_TYPE) -> BOARD_KEY_TYPE:
+    """Return a hashable key for a given board and colour to move."""
+    return (tuple(tuple(row) for row in board), colour)
 
 def get_random_move(board: BOARD_TYPE, colour: COLOUR_TYPE) -> MOVE_TYPE | None:
     """Return a random move for a given board and colour."""
@@ -22,22 +481,761 @@ def get_random_move(board: BOARD_TYPE, colour: COLOUR_TYPE) -> MOVE_TYPE | None:
 
     return random.choice(legal_moves)
 
-def get_ai_move(board: BOARD_TYPE, colour: COLOUR_TYPE) -> MOVE_TYPE | None:
-    """Return a AI generated move for a given board and colour."""
-    potential_board_states = get_potential_board_states(board=board, colour=colour)
+def get_ai_move(
+    board: BOARD_TYPE,
+    colour: COLOUR_TYPE,
+    deadline_ms: float | None = None,
+    max_depth: int | None = None
+) -> MOVE_TYPE | None:
+    """Return a AI generated move for a given board and colour, optionally within a deadline."""
+    search_result = search_move(
+        board=board, colour=colour, deadline_ms=deadline_ms, max_depth=max_depth
+    )
+
+    return search_result.move
+
+def search_move(
+    board: BOARD_TYPE,
+    colour: COLOUR_TYPE,
+    deadline_ms: float | None = None,
+    max_depth: int | None = None,
+    stop_event: threading.Event | None = None,
+    on_iteration: Callable[[SearchResult], None] | None = None,
+    options: SelectiveSearchOptions | None = None,
+    table: TranspositionTable | None = None,
+    weights: EvaluationWeights | None = None
+) -> SearchResult:
+    """Search for the best move with iterative deepening.
+
+    The search stops early at the deadline, or when the stop event is set.
+    The optional callback is given the best move after each completed depth.
+    Selective search options make the search prune, and it is exact without them.
+    Stored scores depend on the weights, so a search with its own weights needs its own table.
+    """
+    start_time = time.perf_counter()
+    deadline, max_depth = get_search_limits(
+        board=board, start_time=start_time, deadline_ms=deadline_ms, max_depth=max_depth
+    )
+
+    masks = get_board_masks(len(board))
+    context = SearchContext(
+        masks=masks, deadline=deadline, stop_event=stop_event,
+        table=table, options=options, weights=weights
+    )
+
+    # The search runs on bitboards, which are far faster to copy and generate moves for
+    player, opponent = get_player_bitboards(board=board, colour=colour)
+    legal_move_bits = iterate_bits(get_legal_moves_bits(player, opponent, masks))
 
-    best_scoring_move = None
-    highest_board_score = -math.inf
+    if len(legal_move_bits) == 0:
+        return SearchResult(move=None, score=-math.inf, depth=0, nodes=0)
 
-    if potential_board_states is not None:
-        for move, potential_board_state in potential_board_states.items():
-            potential_board_score = score_board(board=potential_board_state, colour=colour)
+    # Small boards are answered from their perfect play table, if one has been built
+    perfect_play_table = get_perfect_play_table(masks.size)
 
-            if potential_board_score > highest_board_score:
-                highest_board_score = potential_board_score
-                best_scoring_move = move
+    if perfect_play_table is not None:
+        search_result = get_perfect_play_result(perfect_play_table, player, opponent, masks)
 
-    return best_scoring_move
+        if search_result is not None:
+            return search_result
+
+    # With only one option there is nothing to search
+    if len(legal_move_bits) == 1:
+        child_player, child_opponent = make_move_bits(player, opponent, legal_move_bits[0], masks)
+
+        return SearchResult(
+            move=bit_to_move(legal_move_bits[0], masks.size),
+            score=score_bitboards(child_player, child_opponent, masks, context.weights),
+            depth=0, nodes=0
+        )
+
+    # Always hold a best-so-far move, so there is something to return at any point
+    best_move_bit = legal_move_bits[0]
+    best_score = -math.inf
+    best_depth = 0
+
+    for depth in range(1, max_depth + 1):
+        # Search the previous best move first, so a partial iteration can still be used
+        ordered_move_bits = sorted(legal_move_bits, key=lambda move_bit: move_bit != best_move_bit)
+        root_results: list[tuple[int, float]] = []
+
+        try:
+            search_root(
+                context=context, player=player, opponent=opponent,
+                depth=depth, move_bits=ordered_move_bits, root_results=root_results
+            )
+        except SearchTimeoutError:
+            # The previous best move is searched first, so any completed root move
+            # that beats it is a better choice than the previous iteration's move
+            if len(root_results) > 0:
+                best_move_bit, best_score = max(root_results, key=lambda result: result[1])
+
+            break
+
+        best_move_bit, best_score = max(root_results, key=lambda result: result[1])
+        best_depth = depth
+
+        if on_iteration is not None:
+            on_iteration(SearchResult(
+                move=bit_to_move(best_move_bit, masks.size),
+                score=best_score, depth=best_depth, nodes=context.nodes
+            ))
+
+        # Stop if the next iteration would not be able to finish in time
+        if deadline_ms is not None:
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+
+            if elapsed_ms >= deadline_ms * ITERATION_START_FACTOR:
+                break
+
+    if metrics.enabled:
+        metrics.AI_NODES.inc(context.nodes)
+        metrics.AI_SEARCH_SECONDS.observe(time.perf_counter() - start_time)
+
+    # Follow the best moves stored during the search, after the chosen move
+    child_player, child_opponent = make_move_bits(player, opponent, best_move_bit, masks)
+    principal_variation = get_principal_variation(
+        context=context, player=child_opponent, opponent=child_player,
+        maximising=False, max_length=max(best_depth - 1, 0)
+    )
+
+    return SearchResult(
+        move=bit_to_move(best_move_bit, masks.size),
+        score=best_score,
+        depth=best_depth,
+        nodes=context.nodes,
+        principal_variation=[bit_to_move(best_move_bit, masks.size)] + principal_variation
+    )
+
+def analyze_moves(
+    board: BOARD_TYPE,
+    colour: COLOUR_TYPE,
+    deadline_ms: float | None = None,
+    max_depth: int | None = None,
+    stop_event: threading.Event | None = None
+) -> list[SearchResult]:
+    """Search every legal move with iterative deepening, returning the results best first.
+
+    Unlike search_move, every move is searched with a full window, so each score is exact
+    rather than a bound. This is slower, but allows the moves to be compared with each other.
+    """
+    start_time = time.perf_counter()
+    deadline, max_depth = get_search_limits(
+        board=board, start_time=start_time, deadline_ms=deadline_ms, max_depth=max_depth
+    )
+
+    masks = get_board_masks(len(board))
+    context = SearchContext(masks=masks, deadline=deadline, stop_event=stop_event)
+
+    player, opponent = get_player_bitboards(board=board, colour=colour)
+    legal_move_bits = iterate_bits(get_legal_moves_bits(player, opponent, masks))
+
+    # Start from the static score of each move, so every move has a result even if time runs out
+    move_scores: dict[int, float] = {}
+
+    for move_bit in legal_move_bits:
+        child_player, child_opponent = make_move_bits(player, opponent, move_bit, masks)
+        move_scores[move_bit] = score_bitboards(
+            child_player, child_opponent, masks, context.weights
+        )
+
+    completed_depth = 0
+
+    for depth in range(1, max_depth + 1):
+        # Search the best moves so far first, so they are the most likely to be completed
+        ordered_move_bits = sorted(
+            legal_move_bits, key=lambda move_bit: move_scores[move_bit], reverse=True
+        )
+        root_results: list[tuple[int, float]] = []
+
+        try:
+            search_root(
+                context=context, player=player, opponent=opponent, depth=depth,
+                move_bits=ordered_move_bits, root_results=root_results, full_window=True
+            )
+        except SearchTimeoutError:
+            # Scores from an unfinished iteration cannot be ranked against the moves it did not
+            # reach, so only the last completed iteration's scores are reported
+            break
+
+        move_scores = dict(root_results)
+        completed_depth = depth
+
+        # Stop if the next iteration would not be able to finish in time
+        if deadline_ms is not None:
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+
+            if elapsed_ms >= deadline_ms * ITERATION_START_FACTOR:
+                break
+
+    search_results = []
+
+    for move_bit, score in move_scores.items():
+        child_player, child_opponent = make_move_bits(player, opponent, move_bit, masks)
+        principal_variation = get_principal_variation(
+            context=context, player=child_opponent, opponent=child_player,
+            maximising=False, max_length=max(completed_depth - 1, 0)
+        )
+
+        search_results.append(SearchResult(
+            move=bit_to_move(move_bit, masks.size),
+            score=score,
+            depth=completed_depth,
+            nodes=context.nodes,
+            principal_variation=[bit_to_move(move_bit, masks.size)] + principal_variation
+        ))
+
+    if metrics.enabled:
+        metrics.AI_NODES.inc(context.nodes)
+        metrics.AI_SEARCH_SECONDS.observe(time.perf_counter() - start_time)
+
+    return sorted(search_results, key=lambda search_result: search_result.score, reverse=True)
+
+def get_search_limits(
+    board: BOARD_TYPE,
+    start_time: float,
+    deadline_ms: float | None,
+    max_depth: int | None
+) -> tuple[float | None, int]:
+    """Return the absolute deadline and maximum depth for a search starting at a given time."""
+    deadline = None
+
+    if deadline_ms is not None:
+        deadline = start_time + (deadline_ms / 1000) * DEADLINE_SAFETY_FACTOR
+
+    # Without a deadline, search to a fixed depth. With one, search until time runs out
+    if max_depth is None:
+        if deadline is None:
+            max_depth = DEFAULT_SEARCH_DEPTH
+        else:
+            max_depth = sum(row.count(None) for row in board)
+
+    return deadline, max_depth
+
+def search_root(
+    context: SearchContext,
+    player: int,
+    opponent: int,
+    depth: int,
+    move_bits: list[int],
+    root_results: list[tuple[int, float]],
+    full_window: bool = False
+) -> None:
+    """Search each root move to a given depth, appending each (move bit, score) as it completes.
+
+    With a full window every score is exact. Otherwise, moves that cannot beat the best
+    move so far are only given an upper bound.
+    """
+    alpha = -math.inf
+
+    for move_bit in move_bits:
+        child_player, child_opponent = make_move_bits(player, opponent, move_bit, context.masks)
+
+        score = minimax(
+            context=context, player=child_opponent, opponent=child_player,
+            maximising=False, depth=depth - 1, alpha=alpha, beta=math.inf
+        )
+
+        root_results.append((move_bit, score))
+
+        if not full_window:
+            alpha = max(alpha, score)
+
+def minimax(
+    context: SearchContext,
+    player: int,
+    opponent: int,
+    maximising: bool,
+    depth: int,
+    alpha: float,
+    beta: float
+) -> float:
+    """Return the alpha-beta minimax score for the AI, with the player bitboard to move.
+
+    The AI is the player when maximising, and the opponent otherwise.
+    """
+    context.visit_node()
+
+    if depth == 0:
+        if maximising:
+            return score_bitboards(player, opponent, context.masks, context.weights)
+
+        return score_bitboards(opponent, player, context.masks, context.weights)
+
+    # Positions whose result is already settled by their stable discs need no search
+    if context.options.stability_cutoffs:
+        stability_score = get_stability_cutoff(
+            context=context, player=player, opponent=opponent, maximising=maximising,
+            alpha=alpha, beta=beta
+        )
+
+        if stability_score is not None:
+            return stability_score
+
+    # Reuse the score if this position has already been searched deep enough
+    key, transform = get_position_key(
+        context=context, player=player, opponent=opponent, maximising=maximising, depth=depth
+    )
+    stored_score = context.transposition_table.lookup(key=key, depth=depth, alpha=alpha, beta=beta)
+
+    if stored_score is not None:
+        return stored_score
+
+    if context.options.probcut and depth >= PROBCUT_MIN_DEPTH:
+        probcut_score = get_probcut_cutoff(
+            context=context, player=player, opponent=opponent, maximising=maximising,
+            depth=depth, alpha=alpha, beta=beta
+        )
+
+        if probcut_score is not None:
+            return probcut_score
+
+    # Stored moves are for the keyed position, so are mapped back to this one
+    size = context.masks.size
+    hash_move_bit = transform_move_bit(
+        context.transposition_table.get_best_move(key), INVERSE_TRANSFORMS[transform], size
+    )
+
+    score, best_move_bit = search_children(
+        context=context, player=player, opponent=opponent, maximising=maximising,
+        depth=depth, alpha=alpha, beta=beta, hash_move_bit=hash_move_bit
+    )
+
+    context.transposition_table.store(
+        key=key, depth=depth, score=score, alpha=alpha, beta=beta,
+        best_move_bit=transform_move_bit(best_move_bit, transform, size)
+    )
+
+    return score
+
+def get_stability_cutoff(
+    context: SearchContext,
+    player: int,
+    opponent: int,
+    maximising: bool,
+    alpha: float,
+    beta: float
+) -> float | None:
+    """Return a bound on a position's score if its stable discs put it outside the window.
+
+    Stable discs bound the final disc difference, so once one side has more than half the
+    cells stable the game is decided, and a decided game is scored like a finished one.
+    """
+    cells = context.masks.size * context.masks.size
+
+    # Stable discs only bound scores near the finished game scores, or decide the game once
+    # one side has more than half the cells, so counting them is skipped otherwise
+    if (2 * player.bit_count() <= cells and 2 * opponent.bit_count() <= cells and
+        -WIN_SCORE + cells < alpha and beta < WIN_SCORE - cells):
+        return None
+
+    # The final disc difference for the player lies between these
+    min_difference = 2 * get_stable_discs(player, opponent, context.masks).bit_count() - cells
+    max_difference = cells - 2 * get_stable_discs(opponent, player, context.masks).bit_count()
+
+    # Scores short of a finished game lie strictly between -WIN_SCORE and WIN_SCORE
+    lower_bound = (
+        WIN_SCORE + min_difference if min_difference > 0 else -WIN_SCORE + min_difference
+    )
+    upper_bound = (
+        WIN_SCORE + max_difference if max_difference >= 0 else -WIN_SCORE + max_difference
+    )
+
+    # A draw bounds the result, but not the scores of unfinished lines
+    if min_difference == 0:
+        lower_bound = -WIN_SCORE
+
+    if not maximising:
+        lower_bound, upper_bound = -upper_bound, -lower_bound
+
+    if lower_bound >= beta:
+        return lower_bound
+    if upper_bound <= alpha:
+        return upper_bound
+
+    return None
+
+def get_probcut_line(
+    size: int,
+    depth: int,
+    shallow_depth: int,
+    maximising: bool
+) -> ProbCutLine | None:
+    """Return the ProbCut line predicting a search from a shallower one, or None if not fitted.
+
+    Searches deeper than any fitted line use the deepest line with the same depth reduction
+    and parity.
+    """
+    fitted_depths = [
+        fitted_depth for fitted_size, fitted_depth, fitted_shallow_depth, fitted_maximising
+        in probcut_lines
+        if (fitted_size == size and fitted_maximising == maximising and
+            fitted_depth - fitted_shallow_depth == depth - shallow_depth and
+            fitted_depth <= depth and (depth - fitted_depth) % 2 == 0)
+    ]
+
+    if len(fitted_depths) == 0:
+        return None
+
+    fitted_depth = max(fitted_depths)
+
+    return probcut_lines[(size, fitted_depth, fitted_depth - depth + shallow_depth, maximising)]
+
+def get_probcut_cutoff(
+    context: SearchContext,
+    player: int,
+    opponent: int,
+    maximising: bool,
+    depth: int,
+    alpha: float,
+    beta: float
+) -> float | None:
+    """Return alpha or beta if shallow searches predict the search would fail outside the window.
+
+    Each shallow search is a null window search of whether the predicted score clears the
+    window by the threshold number of standard deviations.
+    """
+    threshold = context.options.probcut_threshold
+
+    # Only unfinished scores are predicted, so windows reaching finished games are not cut
+    check_beta = -WIN_SCORE < beta < WIN_SCORE
+    check_alpha = -WIN_SCORE < alpha < WIN_SCORE
+
+    for reduction in PROBCUT_DEPTH_REDUCTIONS:
+        shallow_depth = depth - reduction
+
+        if shallow_depth < 1:
+            continue
+
+        probcut_line = get_probcut_line(context.masks.size, depth, shallow_depth, maximising)
+
+        if probcut_line is None:
+            continue
+
+        if check_beta:
+            bound = math.ceil(
+                (beta + threshold * probcut_line.sigma - probcut_line.intercept)
+                / probcut_line.slope
+            )
+            score = minimax(
+                context=context, player=player, opponent=opponent, maximising=maximising,
+                depth=shallow_depth, alpha=bound - 1, beta=bound
+            )
+
+            if score >= bound:
+                return beta
+
+        if check_alpha:
+            bound = math.floor(
+                (alpha - threshold * probcut_line.sigma - probcut_line.intercept)
+                / probcut_line.slope
+            )
+            score = minimax(
+                context=context, player=player, opponent=opponent, maximising=maximising,
+                depth=shallow_depth, alpha=bound, beta=bound + 1
+            )
+
+            if score <= bound:
+                return alpha
+
+    return None
+
+def get_position_key(
+    context: SearchContext,
+    player: int,
+    opponent: int,
+    maximising: bool,
+    depth: int
+) -> tuple[POSITION_KEY_TYPE, int]:
+    """Return the transposition table key for a position, and the transform to the keyed position.
+
+    Positions with enough depth left are keyed by their canonical symmetry.
+    """
+    size = context.masks.size
+
+    if depth < SYMMETRY_MIN_DEPTH:
+        return (player, opponent, maximising, size), IDENTITY
+
+    player, opponent, transform = canonicalize_bitboards(player, opponent, size)
+
+    return (player, opponent, maximising, size), transform
+
+def get_stored_best_move(
+    context: SearchContext,
+    player: int,
+    opponent: int,
+    maximising: bool
+) -> int:
+    """Return the stored best move bit for a position, keyed either directly or by symmetry."""
+    size = context.masks.size
+    move_bit = context.transposition_table.get_best_move((player, opponent, maximising, size))
+
+    if move_bit != 0:
+        return move_bit
+
+    player, opponent, transform = canonicalize_bitboards(player, opponent, size)
+    move_bit = context.transposition_table.get_best_move((player, opponent, maximising, size))
+
+    return transform_move_bit(move_bit, INVERSE_TRANSFORMS[transform], size)
+
+def search_children(
+    context: SearchContext,
+    player: int,
+    opponent: int,
+    maximising: bool,
+    depth: int,
+    alpha: float,
+    beta: float,
+    hash_move_bit: int = 0
+) -> tuple[float, int]:
+    """Return the alpha-beta minimax score of a position, and the bit of its best move.
+
+    The hash move, the best move from a previous search, is searched first.
+    The best move bit is 0 if the player has to pass, or no move improved the window.
+    """
+    masks = context.masks
+    legal_moves = get_legal_moves_bits(player, opponent, masks)
+
+    # If the player cannot move, either pass or score the finished game
+    if legal_moves == 0:
+        if get_legal_moves_bits(opponent, player, masks) == 0:
+            if maximising:
+                return score_finished_bitboards(player, opponent), 0
+
+            return score_finished_bitboards(opponent, player), 0
+
+        score = minimax(
+            context=context, player=opponent, opponent=player,
+            maximising=not maximising, depth=depth - 1, alpha=alpha, beta=beta
+        )
+
+        return score, 0
+
+    best_move_bit = 0
+
+    # Children are generated best first and only as they are reached, so a cutoff skips the rest
+    for move_bit, flips in iterate_successors(
+        player=player, opponent=opponent, masks=masks, legal_moves=legal_moves,
+        hash_move_bit=hash_move_bit, order_by_mobility=depth >= MOBILITY_ORDERING_MIN_DEPTH
+    ):
+        child_player = player | move_bit | flips
+        child_opponent = opponent & ~flips
+
+        score = minimax(
+            context=context, player=child_opponent, opponent=child_player,
+            maximising=not maximising, depth=depth - 1, alpha=alpha, beta=beta
+        )
+
+        if maximising and score > alpha:
+            alpha = score
+            best_move_bit = move_bit
+        elif not maximising and score < beta:
+            beta = score
+            best_move_bit = move_bit
+
+        # The other colour will never allow this line, so stop searching it
+        if alpha >= beta:
+            break
+
+    return (alpha if maximising else beta), best_move_bit
+
+def iterate_successors(
+    player: int,
+    opponent: int,
+    masks: BoardMasks,
+    legal_moves: int | None = None,
+    hash_move_bit: int = 0,
+    order_by_mobility: bool = True
+) -> Iterator[tuple[int, int]]:
+    """Yield the (move bit, flips) of each of the player's moves, most promising first.
+
+    The hash move comes first, then corners, then the other moves with the fewest replies for
+    the opponent, then the cells diagonally next to corners. Each group is only ordered once
+    it is reached, so a cutoff on an early move never pays for ordering the later ones.
+    """
+    if legal_moves is None:
+        legal_moves = get_legal_moves_bits(player, opponent, masks)
+
+    # The best move from a previous search is the most likely to cause a cutoff
+    if hash_move_bit & legal_moves:
+        yield hash_move_bit, get_flips(
+            player=player, opponent=opponent, move_bit=hash_move_bit, masks=masks
+        )
+        legal_moves &= ~hash_move_bit
+
+    corners = masks.position_types.get("corner", 0)
+    x_squares = masks.position_types.get("corner_adj", 0)
+
+    for move_bit in iterate_bits(legal_moves & corners):
+        yield move_bit, get_flips(player=player, opponent=opponent, move_bit=move_bit, masks=masks)
+
+    other_moves = iterate_bits(legal_moves & ~corners & ~x_squares)
+
+    if order_by_mobility:
+        successors = []
+
+        for move_bit in other_moves:
+            flips = get_flips(player=player, opponent=opponent, move_bit=move_bit, masks=masks)
+            opponent_mobility = get_legal_moves_bits(
+                opponent & ~flips, player | move_bit | flips, masks
+            ).bit_count()
+
+            successors.append((opponent_mobility, move_bit, flips))
+
+        successors.sort()
+
+        for _, move_bit, flips in successors:
+            yield move_bit, flips
+    else:
+        for move_bit in other_moves:
+            yield move_bit, get_flips(
+                player=player, opponent=opponent, move_bit=move_bit, masks=masks
+            )
+
+    # Cells diagonally next to a corner usually give the corner away
+    for move_bit in iterate_bits(legal_moves & x_squares):
+        yield move_bit, get_flips(player=player, opponent=opponent, move_bit=move_bit, masks=masks)
+
+def get_principal_variation(
+    context: SearchContext,
+    player: int,
+    opponent: int,
+    maximising: bool,
+    max_length: int
+) -> list[MOVE_TYPE | None]:
+    """Return the expected line of play from a position, following the stored best moves."""
+    masks = context.masks
+    principal_variation: list[MOVE_TYPE | None] = []
+
+    while len(principal_variation) < max_length:
+        legal_moves = get_legal_moves_bits(player, opponent, masks)
+
+        # Record a passed turn as None, and stop once the game is finished
+        if legal_moves == 0:
+            if get_legal_moves_bits(opponent, player, masks) == 0:
+                break
+
+            principal_variation.append(None)
+            player, opponent, maximising = opponent, player, not maximising
+
+            continue
+
+        move_bit = get_stored_best_move(
+            context=context, player=player, opponent=opponent, maximising=maximising
+        )
+
+        if not move_bit & legal_moves:
+            break
+
+        principal_variation.append(bit_to_move(move_bit, masks.size))
+
+        player, opponent = make_move_bits(player, opponent, move_bit, masks)
+        player, opponent, maximising = opponent, player, not maximising
+
+    return principal_variation
+
+def get_perfect_play_result(
+    table: PerfectPlayTable,
+    player: int,
+    opponent: int,
+    masks: BoardMasks
+) -> SearchResult | None:
+    """Return the result for a position in a perfect play table, or None if it is not in it.
+
+    The principal variation follows the best moves to the end of the game.
+    """
+    solution = table.lookup(player, opponent)
+
+    if solution is None:
+        return None
+
+    value, best_move_bit = solution
+    principal_variation: list[MOVE_TYPE | None] = []
+    position = (player, opponent)
+
+    while solution is not None:
+        position_player, position_opponent = position
+        _, move_bit = solution
+
+        if move_bit == 0:
+            if get_legal_moves_bits(position_opponent, position_player, masks) == 0:
+                break
+
+            principal_variation.append(None)
+            position = (position_opponent, position_player)
+        else:
+            principal_variation.append(bit_to_move(move_bit, masks.size))
+            child_player, child_opponent = make_move_bits(
+                position_player, position_opponent, move_bit, masks
+            )
+            position = (child_opponent, child_player)
+
+        solution = table.lookup(*position)
+
+    return SearchResult(
+        move=bit_to_move(best_move_bit, masks.size),
+        # Scored like a finished game, as the result with perfect play is known
+        score=(
+            WIN_SCORE + value if value > 0 else -WIN_SCORE + value if value < 0 else 0
+        ),
+        depth=masks.size * masks.size - (player | opponent).bit_count(),
+        nodes=0,
+        principal_variation=principal_variation
+    )
+
+def score_finished_bitboards(player: int, opponent: int) -> int:
+    """Return a score for a finished game, for the player."""
+    cell_difference = player.bit_count() - opponent.bit_count()
+
+    if cell_difference > 0:
+        return WIN_SCORE + cell_difference
+    if cell_difference < 0:
+        return -WIN_SCORE + cell_difference
+
+    return 0
+
+def score_bitboards(
+    player: int,
+    opponent: int,
+    masks: BoardMasks,
+    weights: EvaluationWeights | None = None
+) -> int:
+    """Return the score_board score for the player, calculated on bitboards.
+
+    Without weights, the current evaluation weights are used.
+    """
+    score = 0
+
+    moves_available = get_legal_moves_bits(player, opponent, masks).bit_count()
+    opponent_moves_available = get_legal_moves_bits(opponent, player, masks).bit_count()
+
+    if weights is None:
+        weights = evaluation_weights
+
+    mobility = 0
+
+    if moves_available == 0  and opponent_moves_available == 0:
+        mobility -= 5
+    elif moves_available == 0:
+        mobility -= 10
+    elif opponent_moves_available == 0:
+        mobility += 15
+    else:
+        mobility += max(moves_available - opponent_moves_available, 10)
+
+    position_types = masks.position_types
+
+    score += (
+        mobility * weights.mobility
+        + (player & position_types.get("corner", 0)).bit_count() * weights.corner
+        + (player & position_types.get("edge", 0)).bit_count() * weights.edge
+        + (player & position_types.get("corner_adj", 0)).bit_count() * weights.corner_adj
+        + (player & position_types.get("edge_adj", 0)).bit_count() * weights.edge_adj
+        + (player & position_types.get("corner_adj_adj", 0)).bit_count() * weights.corner_adj_adj
+        + (player & position_types.get("edge_adj_adj", 0)).bit_count() * weights.edge_adj_adj
+    )
+
+    return score
 
 def score_board(board: BOARD_TYPE, colour: COLOUR_TYPE) -> int:
     """Return a score for a given board and colour."""
@@ -47,14 +1245,19 @@ def score_board(board: BOARD_TYPE, colour: COLOUR_TYPE) -> int:
     moves_available = len(get_legal_moves(board=board, colour=colour))
     opponent_moves_available = len(get_legal_moves(board=board, colour=opponent_colour))
 
+    weights = evaluation_weights
+    mobility = 0
+
     if moves_available == 0  and opponent_moves_available == 0:
-        score -= 5
+        mobility -= 5
     elif moves_available == 0:
-        score -= 10
+        mobility -= 10
     elif opponent_moves_available == 0:
-        score += 15
+        mobility += 15
     else:
-        score += max(moves_available - opponent_moves_available, 10)
+        mobility += max(moves_available - opponent_moves_available, 10)
+
+    score += mobility * weights.mobility
 
     board_position_metrics = get_board_position_metrics(board=board)
     player_metrics = board_position_metrics.get(colour)
@@ -63,84 +1266,74 @@ def score_board(board: BOARD_TYPE, colour: COLOUR_TYPE) -> int:
 
     if player_metrics is not None:
         player_score = (
-            player_metrics.get("corner", 0) * CORNER_WEIGHT
-            + player_metrics.get("edge", 0) * EDGE_WEIGHT
-            - player_metrics.get("corner_adj", 0) * CORNER_ADJ_WEIGHT
-            - player_metrics.get("edge_adj", 0) * EDGE_ADJ_WEIGHT
-            + player_metrics.get("corner_adj_adj", 0) * CORNER_ADJ_ADJ_WEIGHT
-            + player_metrics.get("edge_adj_adj", 0) * EDGE_ADJ_ADJ_WEIGHT
+            player_metrics.get("corner", 0) * weights.corner
+            + player_metrics.get("edge", 0) * weights.edge
+            + player_metrics.get("corner_adj", 0) * weights.corner_adj
+            + player_metrics.get("edge_adj", 0) * weights.edge_adj
+            + player_metrics.get("corner_adj_adj", 0) * weights.corner_adj_adj
+            + player_metrics.get("edge_adj_adj", 0) * weights.edge_adj_adj
         )
 
     score += player_score
 
     return score
 
+def iterate_potential_board_states(
+    board: BOARD_TYPE,
+    colour: COLOUR_TYPE
+) -> Iterator[tuple[MOVE_TYPE, BOARD_TYPE]]:
+    """Yield each move for a given colour and the board after it, most promising move first.
+
+    Each board is only built once it is reached.
+    """
+    board_size = len(board)
+    player, opponent = get_player_bitboards(board=board, colour=colour)
+
+    for move_bit, flips in iterate_successors(player, opponent, get_board_masks(board_size)):
+        potential_board_state = [row[:] for row in board]
+
+        for cell_bit in iterate_bits(move_bit | flips):
+            row, col = bit_to_move(cell_bit, board_size)
+            potential_board_state[row][col] = colour
+
+        yield bit_to_move(move_bit, board_size), potential_board_state
+
 def get_potential_board_states(
     board: BOARD_TYPE,
     colour: COLOUR_TYPE
 ) -> dict[MOVE_TYPE, BOARD_TYPE] | None:
     """Return a mapping of moves to board states from a given board state, for a given colour."""
-    legal_moves = get_legal_moves(board=board, colour=colour)
+    potential_board_states = dict(iterate_potential_board_states(board=board, colour=colour))
 
     # If there are no legal moves, return None
-    if len(legal_moves) == 0:
+    if len(potential_board_states) == 0:
         return None
 
-    potential_board_states: dict[MOVE_TYPE, BOARD_TYPE] = {}
-    for legal_move in legal_moves:
-        potential_board_state = copy.deepcopy(board)
-
-        make_move(board=potential_board_state, move=legal_move, colour=colour)
-
-        potential_board_states[legal_move] = potential_board_state
-
     return potential_board_states
 
 def get_board_position_metrics(board: BOARD_TYPE) -> dict[str, dict[str, int]]:
     """Return metrics about the count of cells positioned around the board, by colour."""
     board_size = len(board)
 
-    metrics: dict[str, int] = {
+    empty_metrics: dict[str, int] = {
         "corner": 0, "edge": 0,
         "corner_adj": 0, "edge_adj": 0,
         "corner_adj_adj": 0, "edge_adj_adj": 0
     }
     board_position_metrics: dict[str, dict[str, int]] = {
-        "Dark": copy.deepcopy(metrics),
-        "Light": copy.deepcopy(metrics)
+        "Dark": copy.deepcopy(empty_metrics),
+        "Light": copy.deepcopy(empty_metrics)
     }
 
-    edge_indices = [0, board_size-1]
-    edge_adj_indices = [1, board_size-2]
-    edge_adj_adj_indices = [2, board_size-3]
-
-
     for row in range(board_size):
         for col in range(board_size):
             cell= board[row][col]
 
             if cell is not None:
                 cell_metrics = board_position_metrics.get(cell)
+                position_type = get_cell_position_type(row=row, col=col, board_size=board_size)
 
-                if cell_metrics is not None:
-                    # Check for corner cells
-                    if row in edge_indices and col in edge_indices:
-                        cell_metrics["corner"] += 1
-                    # Check for edge cells
-                    elif (row in edge_indices and col not in edge_adj_indices) or \
-                        (col in edge_indices and row not in edge_adj_indices):
-                        cell_metrics["edge"] += 1
-                    # Check for corner adjacent cells
-                    elif row in edge_adj_indices and col in edge_adj_indices:
-                        cell_metrics["corner_adj"] += 1
-                    # Check for edge adjacent cells
-                    elif row in edge_adj_indices or col in edge_adj_indices:
-                        cell_metrics["edge_adj"] += 1
-                    # Check for corner adjacent adjacent cells
-                    elif row in edge_adj_adj_indices and col in edge_adj_adj_indices:
-                        cell_metrics["corner_adj_adj"] += 1
-                    # Check for edge adjacent adjacent cells
-                    elif row in edge_adj_adj_indices or col in edge_adj_adj_indices:
-                        cell_metrics["edge_adj_adj"] += 1
+                if cell_metrics is not None and position_type is not None:
+                    cell_metrics[position_type] += 1
 
     return board_position_metrics
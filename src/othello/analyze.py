@@ -0,0 +1,202 @@
+import argparse
+import json
+import math
+import sys
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import TextIO
+
+from .components import BOARD_TYPE, COLOUR_TYPE
+from .ai import search_move
+
+# Default time limit per position, used when no depth or time limit is given
+DEFAULT_TIME_MS = 1000
+
+# Each worker process has at most this many positions queued, which bounds memory use
+PENDING_POSITIONS_PER_WORKER = 4
+
+# Compact position characters, e.g. "...OX...<64 cells> X"
+DARK_CHARACTERS = "XxBb*"
+LIGHT_CHARACTERS = "OoWw"
+EMPTY_CHARACTERS = "-._"
+
+POSITION_TYPE = tuple[BOARD_TYPE, COLOUR_TYPE, int | None, float | None]
+ANALYSIS_TYPE = dict[str, object]
+
+def parse_colour(colour_input: str) -> COLOUR_TYPE:
+    """Parse and return a side to move, as a colour name or compact character."""
+    if colour_input in ("Dark", "dark") or colour_input in DARK_CHARACTERS:
+        return "Dark"
+    if colour_input in ("Light", "light") or colour_input in LIGHT_CHARACTERS:
+        return "Light"
+
+    raise ValueError(f"Unknown side to move: {colour_input}.")
+
+def parse_compact_board(cells: str) -> BOARD_TYPE:
+    """Parse and return a board from a string of one character per cell, row by row."""
+    board_size = math.isqrt(len(cells))
+
+    if board_size * board_size != len(cells) or board_size % 2 != 0:
+        raise ValueError("Compact boards must have a square number of cells with an even side.")
+
+    board: BOARD_TYPE = []
+
+    for row in range(board_size):
+        board_row: list[COLOUR_TYPE | None] = []
+
+        for cell in cells[row * board_size:(row + 1) * board_size]:
+            if cell in DARK_CHARACTERS:
+                board_row.append("Dark")
+            elif cell in LIGHT_CHARACTERS:
+                board_row.append("Light")
+            elif cell in EMPTY_CHARACTERS:
+                board_row.append(None)
+            else:
+                raise ValueError(f"Unknown cell character: {cell}.")
+
+        board.append(board_row)
+
+    return board
+
+def parse_position_line(
+    line: str,
+    default_depth: int | None,
+    default_time_ms: float | None
+) -> POSITION_TYPE:
+    """Parse and return a position and its limits from a JSON or compact input line.
+
+    JSON lines use the /download format, and may override the limits with "depth" and "time_ms".
+    Compact lines are the cells followed by the side to move.
+    """
+    line = line.strip()
+
+    if line.startswith("{"):
+        data = json.loads(line)
+
+        return (
+            data["board"],
+            parse_colour(data["current_player_colour"]),
+            data.get("depth", default_depth),
+            data.get("time_ms", default_time_ms)
+        )
+
+    parts = line.split()
+
+    if len(parts) != 2:
+        raise ValueError("Compact positions must be the cells followed by the side to move.")
+
+    return parse_compact_board(parts[0]), parse_colour(parts[1]), default_depth, default_time_ms
+
+def analyze_position(position: POSITION_TYPE) -> ANALYSIS_TYPE:
+    """Return the best move, score and principal variation for a position."""
+    board, colour, depth, time_ms = position
+
+    search_result = search_move(board=board, colour=colour, deadline_ms=time_ms, max_depth=depth)
+
+    return {
+        "best_move": search_result.move,
+        # Positions without a move have no score
+        "score": search_result.score if search_result.move is not None else None,
+        "depth": search_result.depth,
+        "nodes": search_result.nodes,
+        "principal_variation": search_result.principal_variation
+    }
+
+def analyze_line(
+    line_number: int,
+    line: str,
+    default_depth: int | None,
+    default_time_ms: float | None
+) -> str:
+    """Return the JSON analysis of an input line, or the error for an invalid line."""
+    try:
+        position = parse_position_line(
+            line=line, default_depth=default_depth, default_time_ms=default_time_ms
+        )
+        analysis = {"line": line_number} | analyze_position(position)
+    except (ValueError, KeyError, TypeError) as e:
+        analysis = {"line": line_number, "error": str(e)}
+
+    return json.dumps(analysis)
+
+def analyze_lines(
+    lines: Iterable[str],
+    default_depth: int | None,
+    default_time_ms: float | None,
+    workers: int
+) -> Iterator[str]:
+    """Yield the JSON analysis of each non-blank line, in input order.
+
+    Lines are read lazily, and only a fixed number are in flight at once,
+    so memory use does not grow with the input size.
+    """
+    # Line numbers count every input line, so results can be matched back to the input
+    position_lines = (
+        (line_number, line) for line_number, line in enumerate(lines, start=1) if line.strip()
+    )
+
+    if workers <= 1:
+        for line_number, line in position_lines:
+            yield analyze_line(line_number, line, default_depth, default_time_ms)
+
+        return
+
+    max_pending = workers * PENDING_POSITIONS_PER_WORKER
+    pending: deque[Future[str]] = deque()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for line_number, line in position_lines:
+            pending.append(executor.submit(
+                analyze_line, line_number, line, default_depth, default_time_ms
+            ))
+
+            # Results are yielded from the front of the queue, which preserves the input order
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+def write_analysis(lines: Iterable[str], output: TextIO) -> None:
+    """Write each analysis line as soon as it is available."""
+    for line in lines:
+        output.write(line + "\n")
+        output.flush()
+
+def main(argv: list[str] | None = None) -> None:
+    """Analyse positions from a file or stdin, writing one JSON line per position."""
+    parser = argparse.ArgumentParser(
+        prog="othello-analyze",
+        description=(
+            "Analyse Othello positions. Each input line is either the game JSON from "
+            "/download, or a compact board (X for Dark, O for Light, - for empty) "
+            "followed by the side to move."
+        )
+    )
+    parser.add_argument(
+        "input", nargs="?", default="-", help="Input file of positions, or - for stdin."
+    )
+    parser.add_argument("--depth", type=int, default=None, help="Search depth per position.")
+    parser.add_argument(
+        "--time-ms", type=float, default=None,
+        help=f"Search time per position in milliseconds. Defaults to {DEFAULT_TIME_MS}."
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes.")
+    args = parser.parse_args(argv)
+
+    time_ms = args.time_ms
+
+    if args.depth is None and time_ms is None:
+        time_ms = DEFAULT_TIME_MS
+
+    if args.input == "-":
+        write_analysis(analyze_lines(sys.stdin, args.depth, time_ms, args.workers), sys.stdout)
+    else:
+        with open(args.input) as input_file:
+            write_analysis(
+                analyze_lines(input_file, args.depth, time_ms, args.workers), sys.stdout
+            )
+
+if __name__ == "__main__":
+    main()
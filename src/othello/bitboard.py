@@ -0,0 +1,221 @@
+from functools import cache
+
+from .components import BOARD_TYPE, COLOUR_TYPE, MOVE_TYPE, get_cell_position_type
+
+# Boards are stored as a pair of Python ints, one per colour.
+# The cell at (row, col) is stored in bit (row * size + col).
+
+MIN_BITBOARD_SIZE = 4
+MAX_BITBOARD_SIZE = 16
+
+class BoardMasks:
+    """Class to store the precomputed bit masks for one board size."""
+
+    size: int
+    full: int
+    shifts: tuple[tuple[int, int], ...]
+    position_types: dict[str, int]
+    edges: tuple[tuple[int, tuple[int, ...]], ...]
+
+    def __init__(self, size: int) -> None:
+        """Precompute the masks for a given board size."""
+        if not (MIN_BITBOARD_SIZE <= size <= MAX_BITBOARD_SIZE and size % 2 == 0):
+            raise ValueError(
+                f"Bitboard size must be even and between {MIN_BITBOARD_SIZE} "
+                f"and {MAX_BITBOARD_SIZE}."
+            )
+
+        self.size = size
+        self.full = (1 << (size * size)) - 1
+
+        # Masks that remove cells which wrapped around to the other side of the board
+        not_first_col = 0
+        not_last_col = 0
+        for row in range(size):
+            for col in range(size):
+                if col != 0:
+                    not_first_col |= 1 << (row * size + col)
+                if col != size - 1:
+                    not_last_col |= 1 << (row * size + col)
+
+        # (shift, mask) per direction. Positive shifts are left shifts, negative are right
+        self.shifts = (
+            (-size, self.full),                    # N
+            (size, self.full),                     # S
+            (-1, not_last_col),                    # W
+            (1, not_first_col),                    # E
+            (-(size + 1), not_last_col),           # NW
+            (-(size - 1), not_first_col),          # NE
+            (size - 1, not_last_col),              # SW
+            (size + 1, not_first_col),             # SE
+        )
+
+        # Masks of the cells in each of the position categories used by score_board
+        self.position_types = {}
+        for row in range(size):
+            for col in range(size):
+                position_type = get_cell_position_type(row=row, col=col, board_size=size)
+
+                if position_type is not None:
+                    self.position_types[position_type] = (
+                        self.position_types.get(position_type, 0) | 1 << (row * size + col)
+                    )
+
+        # (mask, cells from one corner to the other) of each edge, in both directions
+        last = size - 1
+        edge_cells = (
+            [(0, col) for col in range(size)],
+            [(last, col) for col in range(size)],
+            [(row, 0) for row in range(size)],
+            [(row, last) for row in range(size)],
+        )
+        edges = []
+        for cells in edge_cells:
+            cell_bits = tuple(1 << (row * size + col) for row, col in cells)
+            edge_mask = sum(cell_bits)
+
+            edges.append((edge_mask, cell_bits))
+            edges.append((edge_mask, cell_bits[::-1]))
+
+        self.edges = tuple(edges)
+
+@cache
+def get_board_masks(size: int) -> BoardMasks:
+    """Return the precomputed masks for a given board size."""
+    return BoardMasks(size=size)
+
+def board_to_bitboards(board: BOARD_TYPE) -> tuple[int, int]:
+    """Return the (Dark, Light) bitboards for a given board."""
+    board_size = len(board)
+    dark = 0
+    light = 0
+
+    for row in range(board_size):
+        for col in range(board_size):
+            if board[row][col] == "Dark":
+                dark |= 1 << (row * board_size + col)
+            elif board[row][col] == "Light":
+                light |= 1 << (row * board_size + col)
+
+    return dark, light
+
+def bitboards_to_board(dark: int, light: int, size: int) -> BOARD_TYPE:
+    """Return the board for given (Dark, Light) bitboards."""
+    board: BOARD_TYPE = [[None for _ in range(size)] for _ in range(size)]
+
+    for row in range(size):
+        for col in range(size):
+            bit = 1 << (row * size + col)
+
+            if dark & bit:
+                board[row][col] = "Dark"
+            elif light & bit:
+                board[row][col] = "Light"
+
+    return board
+
+def get_player_bitboards(board: BOARD_TYPE, colour: COLOUR_TYPE) -> tuple[int, int]:
+    """Return the (player, opponent) bitboards for a given board and colour."""
+    dark, light = board_to_bitboards(board=board)
+
+    return (dark, light) if colour == "Dark" else (light, dark)
+
+def move_to_bit(move: MOVE_TYPE, size: int) -> int:
+    """Return the bit for a given move."""
+    row, col = move
+
+    return 1 << (row * size + col)
+
+def bit_to_move(bit: int, size: int) -> MOVE_TYPE:
+    """Return the move for a given single bit."""
+    return divmod(bit.bit_length() - 1, size)
+
+def iterate_bits(bits: int) -> list[int]:
+    """Return each set bit as its own int, from the lowest bit upwards."""
+    single_bits = []
+
+    while bits:
+        lowest_bit = bits & -bits
+        single_bits.append(lowest_bit)
+        bits ^= lowest_bit
+
+    return single_bits
+
+def get_legal_moves_bits(player: int, opponent: int, masks: BoardMasks) -> int:
+    """Return a bitboard of the legal moves for the player."""
+    empty = masks.full & ~(player | opponent)
+    legal_moves = 0
+
+    for shift, mask in masks.shifts:
+        # Fill along the direction through runs of opponent cells that start next to the player
+        if shift > 0:
+            candidates = (player << shift) & mask & opponent
+            for _ in range(masks.size - 3):
+                candidates |= (candidates << shift) & mask & opponent
+            legal_moves |= (candidates << shift) & mask & empty
+        else:
+            candidates = (player >> -shift) & mask & opponent
+            for _ in range(masks.size - 3):
+                candidates |= (candidates >> -shift) & mask & opponent
+            legal_moves |= (candidates >> -shift) & mask & empty
+
+    return legal_moves
+
+def get_flips(player: int, opponent: int, move_bit: int, masks: BoardMasks) -> int:
+    """Return a bitboard of the opponent cells flipped by the player moving on a given bit."""
+    flips = 0
+
+    for shift, mask in masks.shifts:
+        line = 0
+
+        # Walk along the direction until leaving the run of opponent cells
+        if shift > 0:
+            cell = (move_bit << shift) & mask
+            while cell & opponent:
+                line |= cell
+                cell = (cell << shift) & mask
+        else:
+            cell = (move_bit >> -shift) & mask
+            while cell & opponent:
+                line |= cell
+                cell = (cell >> -shift) & mask
+
+        # The run is only captured if it ends at one of the player's cells
+        if cell & player:
+            flips |= line
+
+    return flips
+
+def make_move_bits(
+    player: int,
+    opponent: int,
+    move_bit: int,
+    masks: BoardMasks
+) -> tuple[int, int]:
+    """Return the (player, opponent) bitboards after the player moves on a given bit."""
+    flips = get_flips(player=player, opponent=opponent, move_bit=move_bit, masks=masks)
+
+    return player | move_bit | flips, opponent & ~flips
+
+def get_stable_discs(player: int, opponent: int, masks: BoardMasks) -> int:
+    """Return the bits of the player's discs on the edges that can never be flipped.
+
+    Edge discs can only be flipped along their edge, so discs on a filled edge are stable,
+    as are unbroken lines of the player's discs running along an edge from a corner.
+    """
+    occupied = player | opponent
+    stable = 0
+
+    for edge_mask, cell_bits in masks.edges:
+        if occupied & edge_mask == edge_mask:
+            stable |= player & edge_mask
+
+            continue
+
+        for cell_bit in cell_bits:
+            if not cell_bit & player:
+                break
+
+            stable |= cell_bit
+
+    return stable
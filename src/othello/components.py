@@ -1,10 +1,21 @@
-from typing import Literal
+from typing import Literal, TypedDict
+
+from . import metrics
 
 COLOUR_TYPE = Literal["Dark", "Light"]
 CELL_TYPE = COLOUR_TYPE | None
 BOARD_TYPE = list[list[CELL_TYPE]]
 MOVE_TYPE = tuple[int, int]
 
+class GameRecord(TypedDict):
+    """A game in the /download format."""
+
+    board: BOARD_TYPE
+    current_player_colour: COLOUR_TYPE
+    moves_left: int
+    game_finished: bool
+    game_mode: str
+
 DIRECTIONS: dict[str, MOVE_TYPE] = {
     "N": (-1, 0), "S": (1, 0), "W": (0, -1), "E": (0, 1),
     "NW": (-1, -1), "NE": (-1, 1), "SW": (1, -1), "SE": (1, 1)
@@ -32,6 +43,11 @@ def initialise_board(size: int = 8) -> BOARD_TYPE:
 
     return board
 
+def get_max_moves(size: int) -> int:
+    """Return the maximum number of moves in a game on a given board size."""
+    # Every open cell can be filled once, and the four starting cells are already filled
+    return size * size - 4
+
 def print_board(board: BOARD_TYPE) -> None:
     """Print a representation of the Othello board."""
     # 1-based board size
@@ -191,6 +207,9 @@ def find_winner(board: BOARD_TYPE) -> COLOUR_TYPE | None:
 
 def get_legal_moves(board: BOARD_TYPE, colour: COLOUR_TYPE) -> list[MOVE_TYPE]:
     """Return a list of legal moves for a given board and colour."""
+    if metrics.enabled:
+        metrics.MOVE_GENERATION_CALLS.inc()
+
     board_size = len(board)
 
     open_cell_indices = []
@@ -210,6 +229,34 @@ def get_legal_moves(board: BOARD_TYPE, colour: COLOUR_TYPE) -> list[MOVE_TYPE]:
 
     return legal_moves
 
+def get_cell_position_type(row: int, col: int, board_size: int) -> str | None:
+    """Return the position category of a cell, relative to the corners and edges of the board."""
+    edge_indices = [0, board_size-1]
+    edge_adj_indices = [1, board_size-2]
+    edge_adj_adj_indices = [2, board_size-3]
+
+    # Check for corner cells
+    if row in edge_indices and col in edge_indices:
+        return "corner"
+    # Check for edge cells
+    if (row in edge_indices and col not in edge_adj_indices) or \
+        (col in edge_indices and row not in edge_adj_indices):
+        return "edge"
+    # Check for corner adjacent cells
+    if row in edge_adj_indices and col in edge_adj_indices:
+        return "corner_adj"
+    # Check for edge adjacent cells
+    if row in edge_adj_indices or col in edge_adj_indices:
+        return "edge_adj"
+    # Check for corner adjacent adjacent cells
+    if row in edge_adj_adj_indices and col in edge_adj_adj_indices:
+        return "corner_adj_adj"
+    # Check for edge adjacent adjacent cells
+    if row in edge_adj_adj_indices or col in edge_adj_adj_indices:
+        return "edge_adj_adj"
+
+    return None
+
 def player_can_move(board: BOARD_TYPE, colour: COLOUR_TYPE) -> bool:
     """Return if a given player colour can move for a given board."""
     legal_moves_available_to_player = get_legal_moves(board=board, colour=colour)
@@ -0,0 +1,99 @@
+import json
+import queue
+import threading
+from collections.abc import Mapping
+
+# Events queued for a subscriber that is not reading them, before it is disconnected
+MAX_QUEUED_EVENTS = 256
+
+# Event sent to subscribers when their game is removed
+CLOSED_EVENT = "closed"
+
+EVENT_TYPE = tuple[str, Mapping[str, object]]
+
+class Subscription:
+    """Class to store the queue of events for one subscriber to a game."""
+
+    game_id: str
+    events: queue.Queue[EVENT_TYPE]
+    closed: bool
+
+    def __init__(self, game_id: str, max_queued_events: int = MAX_QUEUED_EVENTS) -> None:
+        """Initialise an open subscription with an empty event queue."""
+        self.game_id = game_id
+        self.events = queue.Queue(maxsize=max_queued_events)
+        self.closed = False
+
+    def get(self, timeout: float) -> EVENT_TYPE | None:
+        """Return the next event, or None if no event arrived within the timeout."""
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+class EventBroker:
+    """Class to publish game events to every subscriber of a game.
+
+    Subscribers are plain queues, so an idle subscriber costs no thread or CPU
+    of its own, only the connection waiting on its queue.
+    """
+
+    subscriptions: dict[str, set[Subscription]]
+
+    def __init__(self) -> None:
+        """Initialise the broker with no subscriptions."""
+        self.subscriptions = {}
+
+        self._lock = threading.Lock()
+
+    def subscribe(self, game_id: str) -> Subscription:
+        """Return a new subscription to a game's events."""
+        subscription = Subscription(game_id=game_id)
+
+        with self._lock:
+            self.subscriptions.setdefault(game_id, set()).add(subscription)
+
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscription, so it receives no further events."""
+        subscription.closed = True
+
+        with self._lock:
+            game_subscriptions = self.subscriptions.get(subscription.game_id)
+
+            if game_subscriptions is not None:
+                game_subscriptions.discard(subscription)
+
+                if len(game_subscriptions) == 0:
+                    del self.subscriptions[subscription.game_id]
+
+    def publish(self, game_id: str, event_type: str, data: Mapping[str, object]) -> None:
+        """Send an event to every subscriber of a game."""
+        with self._lock:
+            game_subscriptions = list(self.subscriptions.get(game_id, ()))
+
+        for subscription in game_subscriptions:
+            try:
+                subscription.events.put_nowait((event_type, data))
+            except queue.Full:
+                # A subscriber that has fallen this far behind is disconnected,
+                # and will receive the full state when it reconnects
+                self.unsubscribe(subscription)
+
+    def close_game(self, game_id: str) -> None:
+        """Tell every subscriber of a game that it has been removed, and unsubscribe them."""
+        with self._lock:
+            game_subscriptions = self.subscriptions.pop(game_id, set())
+
+        for subscription in game_subscriptions:
+            subscription.closed = True
+
+            try:
+                subscription.events.put_nowait((CLOSED_EVENT, {}))
+            except queue.Full:
+                continue
+
+def format_server_sent_event(event_type: str, data: Mapping[str, object]) -> str:
+    """Return an event in the server-sent events wire format."""
+    return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
@@ -1,16 +1,40 @@
+import atexit
+import os
+import secrets
 import tempfile
 import json
 import logging
+import threading
+import time
+import uuid
+import cProfile
+import pstats
+import io
+from collections import OrderedDict
+from collections.abc import Iterator, Mapping
+from concurrent.futures import ProcessPoolExecutor
 
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, Response, g, render_template, request, jsonify, send_file, session
 from flask.typing import ResponseReturnValue
 
 from .components import (
-    COLOUR_TYPE, BOARD_TYPE, initialise_board, make_move,
-    invert_player_colour, player_can_move, find_winner
+    COLOUR_TYPE, BOARD_TYPE, GameRecord, MOVE_TYPE, initialise_board,
+    invert_player_colour, player_can_move, find_winner, get_max_moves
 )
-from .ai import get_ai_move
-from .game_engine import BOARD_SIZE, MAX_MOVES, STARTING_PLAYER
+from .bitboard import (
+    bit_to_move, bitboards_to_board, board_to_bitboards, get_board_masks, get_flips,
+    get_legal_moves_bits, iterate_bits, move_to_bit
+)
+from .ai import (
+    AnalysisCache, SearchResult, SelectiveSearchOptions, analyze_moves, search_move
+)
+from .events import CLOSED_EVENT, EventBroker, format_server_sent_event
+from .ponder import Ponderer
+from .store import DEFAULT_HISTORY_LIMIT, GameStore
+from .tokens import decode_game_token, encode_game_token
+from .review import PLAYED_MOVE_TYPE, REVIEW_PROCESS_CONTEXT, review_game
+from . import metrics
+from .game_engine import BOARD_SIZE, STARTING_PLAYER, parse_board_size
 
 RESPONSE_TYPE = dict[str, str | int | bool | COLOUR_TYPE | BOARD_TYPE]
 
@@ -27,29 +51,153 @@ logger.addHandler(handler)
 
 app = Flask(__name__, template_folder="../../templates")
 
+# Time budget for each AI move, in milliseconds
+app.config["AI_DEADLINE_MS"] = 200
+
+# Maximum number of games held in memory, the least recently used is evicted first
+app.config["MAX_GAMES"] = 256
+
+# Pondering searches the AI's replies while the human is deciding their move
+app.config["PONDER_ENABLED"] = True
+app.config["PONDER_WORKERS"] = 1
+app.config["PONDER_DEADLINE_MS"] = 1000
+
+# Selective search prunes the AI's search: Multi-ProbCut drops lines that shallow searches
+# predict are irrelevant, and stability cutoffs stop at positions whose result is settled
+app.config["PROBCUT_ENABLED"] = False
+app.config["STABILITY_CUTOFFS_ENABLED"] = False
+
+# Metrics are served on /metrics. Switching them off skips all recording
+app.config["METRICS_ENABLED"] = True
+
+# When enabled, requests with an X-Profile header are run under cProfile. Profiles are saved
+# to this directory, which keeps only the most recent ones
+app.config["PROFILING_ENABLED"] = False
+app.config["PROFILE_DIRECTORY"] = os.path.join(tempfile.gettempdir(), "othello_profiles")
+app.config["PROFILE_FILES_KEPT"] = 20
+PROFILE_STATS_LINES = 25
+
+# Games and their moves are saved to this SQLite database, so they survive restarts.
+# Set to None to keep games in memory only
+app.config["GAME_STORE_PATH"] = "othello_games.sqlite3"
+
+def get_secret(variable: str) -> bytes:
+    """Return the secret in an environment variable, or a random one if it is not set."""
+    secret = os.environ.get(variable, "")
+
+    if secret == "":
+        logger.warning(
+            f"{variable} is not set, so a random secret is used. "
+            "It is lost on restart, and is not shared with other workers."
+        )
+        return secrets.token_bytes(32)
+
+    return secret.encode()
+
+# Stateless games carry their state in a token signed with this secret.
+# Every worker behind a load balancer must share it, through OTHELLO_TOKEN_SECRET
+app.config["GAME_TOKEN_SECRET"] = get_secret("OTHELLO_TOKEN_SECRET")
+
+# The session cookie records the games each client started, which only that client may change.
+# It has its own secret, so a leaked session key cannot forge game tokens or the reverse
+app.config["SECRET_KEY"] = get_secret("OTHELLO_SESSION_SECRET")
+
+# Limits for /analyze searches, and the number of analysed positions kept for repeat requests
+app.config["ANALYZE_MAX_DEPTH"] = 8
+app.config["ANALYZE_MAX_TIME_MS"] = 2000
+app.config["ANALYSIS_CACHE_SIZE"] = 1024
+
+# Post-game reviews search each position for this long, in a pool of worker processes
+app.config["REVIEW_TIME_MS"] = 500
+app.config["REVIEW_WORKERS"] = 2
+
+# Idle event streams are sent a comment this often, so proxies do not close them
+app.config["EVENTS_HEARTBEAT_S"] = 15
+
+# Each move log entry is one int: the mover's colour and whether the move used up one of the
+# moves left in the low bits, then the move's cell index plus one (0 for a pass), then the flips
+LOG_LIGHT_BIT = 1
+LOG_COUNTED_BIT = 2
+LOG_CELL_SHIFT = 2
+LOG_CELL_MASK = 0x1FF
+LOG_FLIPS_SHIFT = 11
+
+def decode_log_entry(entry: int, board_size: int) -> PLAYED_MOVE_TYPE:
+    """Return the colour and move of a move log entry, with a move of None for a pass."""
+    colour: COLOUR_TYPE = "Light" if entry & LOG_LIGHT_BIT else "Dark"
+    cell = entry >> LOG_CELL_SHIFT & LOG_CELL_MASK
+
+    return colour, divmod(cell - 1, board_size) if cell != 0 else None
+
 class GameState:
-    """Class to store information about the game state."""
+    """Class to store information about the game state.
 
-    board: BOARD_TYPE
+    The board is packed into a bitboard per colour. Every move and pass is appended to a move
+    log as the placed cell and the cells it flipped, so moves are undone and redone in place.
+    """
+
+    __slots__ = (
+        "dark", "light", "board_size", "current_player_colour", "moves_left",
+        "game_finished", "game_mode", "move_log", "redo_log"
+    )
+
+    dark: int
+    light: int
+    board_size: int
     current_player_colour: COLOUR_TYPE
     moves_left: int
     game_finished: bool
     game_mode: str
+    move_log: list[int]
+    redo_log: list[int]
 
-    def __init__(self, game_mode: str) -> None:
-        """Initalise the game state for a given game mode."""
-        self.board = initialise_board(size=BOARD_SIZE)
+    def __init__(self, game_mode: str, board_size: int = BOARD_SIZE) -> None:
+        """Initalise the game state for a given game mode and board size."""
+        self.move_log = []
+        self.redo_log = []
+        self.board = initialise_board(size=board_size)
         self.current_player_colour = STARTING_PLAYER
-        self.moves_left = MAX_MOVES
+        self.moves_left = get_max_moves(board_size)
         self.game_finished = False
         self.game_mode = game_mode
 
-    def update(self, data: RESPONSE_TYPE) -> None:
-        """Update GameState values in place with given values."""
+    @property
+    def board(self) -> BOARD_TYPE:
+        """Return the board, unpacked from the bitboards."""
+        return bitboards_to_board(dark=self.dark, light=self.light, size=self.board_size)
+
+    @board.setter
+    def board(self, board: BOARD_TYPE) -> None:
+        """Replace the board. Logged moves no longer apply to it, so the logs are cleared."""
+        self.board_size = len(board)
+        self.dark, self.light = board_to_bitboards(board=board)
+        self.move_log.clear()
+        self.redo_log.clear()
+
+    def update(self, data: Mapping[str, object]) -> None:
+        """Update GameState values in place with given values, in the /download format.
+
+        Raises ValueError, before changing anything, if a key is not a game state field.
+        """
+        unknown_keys = data.keys() - GameRecord.__annotations__.keys()
+
+        if len(unknown_keys) > 0:
+            raise ValueError(f"Unknown game state fields: {', '.join(sorted(unknown_keys))}")
+
         for key, value in data.items():
-            logger.info(f"Updating {key} from {getattr(self, key, value)} to {value}")
+            logger.debug(f"Updating {key} from {getattr(self, key, value)} to {value}")
             setattr(self, key, value)
 
+    def to_dict(self) -> GameRecord:
+        """Return the game in the /download format."""
+        return {
+            "board": self.board,
+            "current_player_colour": self.current_player_colour,
+            "moves_left": self.moves_left,
+            "game_finished": self.game_finished,
+            "game_mode": self.game_mode
+        }
+
     def create_response(self, status: str, message: str="") -> RESPONSE_TYPE:
         """Create a response to send to the front-end."""
         return {
@@ -62,54 +210,574 @@ class GameState:
             "game_mode": self.game_mode
         }
 
-game_state = GameState("pvp")
+    def play_move(self, move: MOVE_TYPE, colour: COLOUR_TYPE) -> list[MOVE_TYPE]:
+        """Make a move, using up one of the moves left, and return the cells it flipped.
+
+        Raises ValueError if the move is not legal.
+        """
+        row, col = move
+        masks = get_board_masks(self.board_size)
+        player, opponent = (self.dark, self.light) if colour == "Dark" else (self.light, self.dark)
+
+        if not (0 <= row < self.board_size and 0 <= col < self.board_size):
+            raise ValueError("Move is not legal.")
+
+        move_bit = move_to_bit(move, self.board_size)
+
+        if not get_legal_moves_bits(player, opponent, masks) & move_bit:
+            raise ValueError("Move is not legal.")
+
+        flips = get_flips(player=player, opponent=opponent, move_bit=move_bit, masks=masks)
+        entry = (
+            flips << LOG_FLIPS_SHIFT
+            | move_bit.bit_length() << LOG_CELL_SHIFT
+            | LOG_COUNTED_BIT
+            | (LOG_LIGHT_BIT if colour == "Light" else 0)
+        )
+
+        self.log_entry(entry)
+
+        return [bit_to_move(flip_bit, self.board_size) for flip_bit in iterate_bits(flips)]
+
+    def record_pass(self, colour: COLOUR_TYPE, counted: bool = False) -> None:
+        """Log a passed turn, optionally using up one of the moves left."""
+        entry = (LOG_COUNTED_BIT if counted else 0) | (LOG_LIGHT_BIT if colour == "Light" else 0)
+
+        self.log_entry(entry)
+
+    def log_entry(self, entry: int) -> None:
+        """Apply a new move or pass and append it to the move log. Undone moves are discarded."""
+        self.apply_log_entry(entry)
+        self.move_log.append(entry)
+        self.redo_log.clear()
+
+        if entry & LOG_COUNTED_BIT:
+            self.moves_left -= 1
+
+    def apply_log_entry(self, entry: int) -> None:
+        """Apply a logged move or pass to the board. Applying an entry twice undoes it."""
+        cell = entry >> LOG_CELL_SHIFT & LOG_CELL_MASK
+
+        if cell != 0:
+            flips = entry >> LOG_FLIPS_SHIFT
+            placed = 1 << (cell - 1)
+
+            # The flipped cells change colour, and the placed cell is toggled for the mover
+            if entry & LOG_LIGHT_BIT:
+                self.light ^= placed | flips
+                self.dark ^= flips
+            else:
+                self.dark ^= placed | flips
+                self.light ^= flips
+
+    def starts_turn(self, entry: int) -> bool:
+        """Return if a logged entry is a move chosen by a human, rather than a pass or AI reply."""
+        colour, move = decode_log_entry(entry, self.board_size)
+
+        return move is not None and (self.game_mode != "ai" or colour == STARTING_PLAYER)
+
+    def undo(self) -> int:
+        """Undo the last human move, with any AI reply and passes after it.
+
+        Returns the number of log entries undone, which is 0 if there is nothing to undo.
+        """
+        undone = 0
+
+        while len(self.move_log) > 0:
+            entry = self.move_log.pop()
+
+            self.apply_log_entry(entry)
+            self.redo_log.append(entry)
+            self.current_player_colour, _ = decode_log_entry(entry, self.board_size)
+            undone += 1
+
+            if entry & LOG_COUNTED_BIT:
+                self.moves_left += 1
+
+            if self.starts_turn(entry):
+                break
+
+        if undone > 0:
+            self.game_finished = False
+
+        return undone
+
+    def redo(self) -> int:
+        """Redo the last undone human move, with any AI reply and passes after it.
+
+        Returns the number of log entries redone, which is 0 if there is nothing to redo.
+        """
+        redone = 0
+        last_mover: COLOUR_TYPE | None = None
+
+        while len(self.redo_log) > 0 and (redone == 0 or not self.starts_turn(self.redo_log[-1])):
+            entry = self.redo_log.pop()
+
+            self.apply_log_entry(entry)
+            self.move_log.append(entry)
+            redone += 1
+
+            if entry & LOG_COUNTED_BIT:
+                self.moves_left -= 1
+
+            colour, move = decode_log_entry(entry, self.board_size)
+
+            if move is not None:
+                last_mover = colour
+
+        # The turn passes as it did when the moves were first played
+        if last_mover is not None:
+            board = self.board
+            next_colour = invert_player_colour(last_mover)
+            next_can_move = player_can_move(board=board, colour=next_colour)
+            mover_can_move = player_can_move(board=board, colour=last_mover)
+
+            self.current_player_colour = next_colour if next_can_move else last_mover
+            self.game_finished = self.moves_left <= 0 or not (next_can_move or mover_can_move)
+
+        return redone
+
+# Games by ID, ordered from least to most recently used
+games: OrderedDict[str, GameState] = OrderedDict()
+games_lock = threading.Lock()
+
+# Each client's session cookie lists the games it started, newest last. Only that client may
+# change them, and its requests without a game ID use the newest
+OWNED_GAMES_PER_SESSION = 16
+
+ponderer: Ponderer | None = None
+
+game_store: GameStore | None = None
+
+analysis_cache: AnalysisCache | None = None
+
+review_executor: ProcessPoolExecutor | None = None
+
+def get_review_executor() -> ProcessPoolExecutor:
+    """Return the shared pool of review worker processes, creating it on first use."""
+    global review_executor
+
+    if review_executor is None:
+        review_executor = ProcessPoolExecutor(
+            max_workers=app.config["REVIEW_WORKERS"], mp_context=REVIEW_PROCESS_CONTEXT
+        )
+
+        atexit.register(review_executor.shutdown, cancel_futures=True)
+
+    return review_executor
+
+def get_search_options() -> SelectiveSearchOptions:
+    """Return the configured selective search options for the AI's moves.
+
+    Analysis and reviews compare exact scores, so they are always searched without them.
+    """
+    return SelectiveSearchOptions(
+        probcut=app.config["PROBCUT_ENABLED"],
+        stability_cutoffs=app.config["STABILITY_CUTOFFS_ENABLED"]
+    )
+
+def get_analysis_cache() -> AnalysisCache:
+    """Return the shared cache of analysed positions, creating it from the app config."""
+    global analysis_cache
+
+    if analysis_cache is None:
+        analysis_cache = AnalysisCache(max_entries=app.config["ANALYSIS_CACHE_SIZE"])
+
+    return analysis_cache
+
+def get_game_store() -> GameStore | None:
+    """Return the shared game store, opening it on first use, or None if it is disabled."""
+    global game_store
+
+    if game_store is None and app.config["GAME_STORE_PATH"] is not None:
+        game_store = GameStore(path=app.config["GAME_STORE_PATH"])
+
+        # Commit any queued writes before the process exits
+        atexit.register(game_store.close)
+
+    return game_store
+
+def save_game(game_id: str | None, game_state: GameState) -> None:
+    """Queue a write of a game's state to the game store, if it is enabled.
+
+    Stateless games have no ID, and are not stored.
+    """
+    store = get_game_store()
+
+    if store is None or game_id is None:
+        return
+
+    result = None
+
+    if game_state.game_finished:
+        result = find_winner(board=game_state.board) or "Draw"
+
+    store.save_game(game_id, game_state.to_dict(), result=result)
+
+def record_move(game_id: str | None, colour: COLOUR_TYPE, move: MOVE_TYPE | None) -> None:
+    """Queue a write of a move, or a pass, to the game store, if it is enabled."""
+    store = get_game_store()
+
+    if store is not None and game_id is not None:
+        store.record_move(game_id, colour, move)
+
+def remove_recorded_moves(game_id: str, count: int) -> None:
+    """Queue a removal of a game's last moves and passes from the game store, if it is enabled."""
+    store = get_game_store()
+
+    if store is not None:
+        store.remove_moves(game_id, count)
+
+# Moves, passes and AI progress are published to each game's /events subscribers
+event_broker = EventBroker()
+
+def get_ponderer() -> Ponderer:
+    """Return the shared ponderer, creating it from the app config on first use."""
+    global ponderer
+
+    if ponderer is None:
+        ponderer = Ponderer(max_workers=app.config["PONDER_WORKERS"])
+
+    return ponderer
+
+def add_game(
+    game_state: GameState,
+    replaced_game_id: str | None = None,
+    game_id: str | None = None
+) -> str:
+    """Store a game and return its ID, replacing a game and evicting old games if needed.
+
+    New games are given a new ID, and resumed games keep their stored ID.
+    """
+    if game_id is None:
+        game_id = uuid.uuid4().hex
+
+    removed_game_ids = []
+
+    with games_lock:
+        if replaced_game_id is not None and games.pop(replaced_game_id, None) is not None:
+            removed_game_ids.append(replaced_game_id)
+
+        games[game_id] = game_state
+
+        while len(games) > app.config["MAX_GAMES"]:
+            evicted_game_id, _ = games.popitem(last=False)
+            removed_game_ids.append(evicted_game_id)
+
+    # Pondering for a removed game would be wasted
+    for removed_game_id in removed_game_ids:
+        get_ponderer().stop(removed_game_id)
+        event_broker.close_game(removed_game_id)
+        logger.info(f"Removed game {removed_game_id}.")
+
+    return game_id
+
+def claim_game(game_id: str, replaced_game_id: str | None = None) -> None:
+    """Record in the request's session that its client started a game, and no longer has one."""
+    owned_game_ids = [
+        owned_game_id for owned_game_id in session.get("game_ids", [])
+        if owned_game_id not in (game_id, replaced_game_id)
+    ]
+
+    session["game_ids"] = (owned_game_ids + [game_id])[-OWNED_GAMES_PER_SESSION:]
+
+def owns_game(game_id: str | None) -> bool:
+    """Return if the request's session started the game with the given ID."""
+    return game_id is not None and game_id in session.get("game_ids", [])
+
+def get_requested_game_id(game_id: str | None) -> str | None:
+    """Return a request's game ID, defaulting to the newest game its client started."""
+    if game_id is not None:
+        return game_id
+
+    owned_game_ids = session.get("game_ids", [])
+
+    return owned_game_ids[-1] if len(owned_game_ids) > 0 else None
+
+def get_owned_game(game_id: str | None) -> tuple[str, GameState] | None:
+    """Return a requested game for a route that changes it, or None if another client owns it."""
+    game_id = get_requested_game_id(game_id)
+
+    if not owns_game(game_id):
+        return None
+
+    return get_game(game_id)
+
+def get_game(game_id: str | None) -> tuple[str, GameState] | None:
+    """Return a game ID and its state, or None if no ID is given or the game is unknown.
+
+    Games that are no longer in memory are resumed from the game store.
+    """
+    if game_id is None:
+        return None
+
+    with games_lock:
+        game_state = games.get(game_id)
+
+        if game_state is not None:
+            games.move_to_end(game_id)
+
+            return game_id, game_state
+
+    return resume_game(game_id)
+
+def resume_game(game_id: str) -> tuple[str, GameState] | None:
+    """Load a game from the game store back into memory, or return None if it is unknown."""
+    store = get_game_store()
+    game_record = store.load_game(game_id) if store is not None else None
+
+    if game_record is None:
+        return None
+
+    game_state = GameState(game_record["game_mode"], board_size=len(game_record["board"]))
+    game_state.update(game_record)
+
+    with games_lock:
+        # Another request may have resumed the game first
+        if game_id in games:
+            return game_id, games[game_id]
+
+    add_game(game_state, game_id=game_id)
+    logger.info(f"Resumed game {game_id}.")
+
+    return game_id, game_state
+
+def create_game_response(
+    game_id: str | None,
+    game_state: GameState,
+    status: str,
+    message: str = ""
+) -> RESPONSE_TYPE:
+    """Create a response to send to the front-end, including the game ID.
+
+    Stateless games have no ID, and are sent a new signed token instead.
+    """
+    response = game_state.create_response(status, message)
+
+    if game_id is not None:
+        response["game_id"] = game_id
+    else:
+        response["token"] = encode_game_token(
+            game_state.to_dict(), secret=app.config["GAME_TOKEN_SECRET"]
+        )
+
+    return response
+
+def load_stateless_game(token: str) -> GameState:
+    """Return the game state carried by a signed token."""
+    game_record = decode_game_token(token, secret=app.config["GAME_TOKEN_SECRET"])
+
+    game_state = GameState(game_record["game_mode"], board_size=len(game_record["board"]))
+    game_state.update(game_record)
+
+    return game_state
+
+def get_request_game(changes_game: bool = False) -> tuple[str | None, GameState] | None:
+    """Return the game for a request, from its signed token or its game ID.
+
+    Games held in memory are only returned to routes that change them for the client that
+    started them. Raises ValueError for an invalid token.
+    """
+    token = request.args.get("token")
+
+    if token is not None:
+        return None, load_stateless_game(token)
+
+    if changes_game:
+        return get_owned_game(request.args.get("game_id"))
+
+    return get_game(get_requested_game_id(request.args.get("game_id")))
+
+def game_not_found_response() -> ResponseReturnValue:
+    """Create a failure response for a request with an unknown game, or another client's."""
+    message = "Game not found. Please start a new game."
+    logger.error(message)
+
+    return jsonify({"status": "fail", "message": message})
+
+def get_analysis(
+    board: BOARD_TYPE,
+    colour: COLOUR_TYPE,
+    depth: int | None,
+    time_ms: float
+) -> tuple[list[SearchResult], bool]:
+    """Return every legal move's search result, best first, and whether it came from the cache."""
+    search_results = get_analysis_cache().get(board, colour, depth, time_ms)
+
+    if search_results is not None:
+        return search_results, True
+
+    search_results = analyze_moves(board=board, colour=colour, deadline_ms=time_ms, max_depth=depth)
+    get_analysis_cache().put(board, colour, depth, time_ms, search_results)
+
+    return search_results, False
+
+def publish_event(game_id: str | None, event_type: str, data: dict[str, object]) -> None:
+    """Publish an event to a game's subscribers. Stateless games have none."""
+    if game_id is not None:
+        event_broker.publish(game_id, event_type, data)
+
+def publish_move(
+    game_id: str | None,
+    game_state: GameState,
+    move: MOVE_TYPE,
+    colour: COLOUR_TYPE,
+    flipped: list[MOVE_TYPE]
+) -> None:
+    """Publish a move as the placed cell and the cells it flipped."""
+    publish_event(game_id, "move", {
+        "colour": colour,
+        "move": move,
+        "flipped": flipped,
+        "player": game_state.current_player_colour,
+        "moves_left": game_state.moves_left
+    })
+
+
+def save_profile(profiler: cProfile.Profile) -> str:
+    """Save a request's profile to the profile directory and return its path.
+
+    The oldest profiles are deleted, so the directory holds at most the configured number.
+    """
+    directory = app.config["PROFILE_DIRECTORY"]
+    os.makedirs(directory, exist_ok=True)
+
+    with tempfile.NamedTemporaryFile(suffix=".prof", dir=directory, delete=False) as temp:
+        profile_path = temp.name
+
+    profiler.dump_stats(profile_path)
+
+    profile_paths = sorted(
+        (os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".prof")),
+        key=os.path.getmtime
+    )
+
+    for old_profile_path in profile_paths[:-app.config["PROFILE_FILES_KEPT"]]:
+        try:
+            os.remove(old_profile_path)
+        except FileNotFoundError:
+            # Another request removed it first
+            pass
+
+    return profile_path
+
+@app.before_request
+def start_request_instrumentation() -> None:
+    """Record the request start time, and start profiling if requested."""
+    metrics.set_enabled(app.config["METRICS_ENABLED"])
+
+    if metrics.enabled:
+        g.request_start_time = time.perf_counter()
+
+    if app.config["PROFILING_ENABLED"] and request.headers.get("X-Profile"):
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+@app.after_request
+def finish_request_instrumentation(response: Response) -> Response:
+    """Record the request latency, and save the profile if the request was profiled."""
+    if metrics.enabled and request.endpoint == "move" and "request_start_time" in g:
+        metrics.MOVE_REQUEST_SECONDS.observe(time.perf_counter() - g.request_start_time)
+
+    profiler: cProfile.Profile | None = g.pop("profiler", None)
+
+    if profiler is not None:
+        profiler.disable()
+
+        # Save the full profile for tools like snakeviz, and log the most expensive calls
+        profile_path = save_profile(profiler)
+
+        stats_output = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stats_output)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PROFILE_STATS_LINES)
+
+        logger.info(f"Profiled {request.path}. Saved to {profile_path}.\n{stats_output.getvalue()}")
+
+        response.headers["X-Profile-File"] = profile_path
+
+    return response
+
+@app.route("/metrics", methods=["GET"])
+def get_metrics() -> ResponseReturnValue:
+    """Return the engine and web app metrics in Prometheus text format."""
+    return Response(metrics.render_prometheus(), mimetype="text/plain; version=0.0.4")
 
 @app.route("/", methods=["GET"])
 def index() -> ResponseReturnValue:
-    """Render the website, with a new PvP game."""
-    global game_state
+    """Render the website, with a new PvP game.
+
+    Other clients' games are left in memory, and only evicted once they are least recently used.
+    """
     game_state = GameState("pvp")
+    game_id = add_game(game_state)
+    claim_game(game_id)
 
     logger.info("Rendered page.")
 
-    return render_template("index.html", game_board=game_state.board)
+    return render_template("index.html", game_board=game_state.board, game_id=game_id)
 
 @app.route("/newgame", methods=["GET"])
 def new_game() -> ResponseReturnValue:
-    """Begins a new game, with a game mode argument."""
+    """Begins a new game, with game mode and optional board size arguments.
+
+    Replaces the game with the given ID, if the client started it. Stateless games are not
+    held in memory, and are sent a signed token instead of an ID.
+    """
     game_mode: str = request.args.get('game_mode').lower()
-    status = "success"
-    message = ""
+    replaced_game_id = request.args.get("game_id")
 
-    global game_state
+    # Other clients' games are not removed, even if their ID is known
+    if not owns_game(replaced_game_id):
+        replaced_game_id = None
 
     if game_mode not in ["ai", "pvp"]:
-        status = "fail"
         message = "Failed to start new game. Game mode invalid."
 
         logger.error(message)
+
+        return jsonify({"status": "fail", "message": message})
+
+    try:
+        board_size = parse_board_size(request.args.get("size", BOARD_SIZE))
+    except ValueError as e:
+        message = f"Failed to start new game. {str(e)}"
+
+        logger.error(message)
+
+        return jsonify({"status": "fail", "message": message})
+
+    game_state = GameState(game_mode, board_size=board_size)
+
+    if request.args.get("stateless", "false").lower() == "true":
+        game_id = None
     else:
-        game_state = GameState(game_mode)
+        game_id = add_game(game_state, replaced_game_id=replaced_game_id)
+        claim_game(game_id, replaced_game_id=replaced_game_id)
+        save_game(game_id, game_state)
 
-        logger.info(f"Started new game. Mode: {game_mode}.")
+    logger.info(f"Started new game {game_id}. Mode: {game_mode}. Size: {board_size}.")
 
-    response = game_state.create_response(status, message)
+    response = create_game_response(game_id, game_state, "success")
 
     return jsonify(response)
 
 @app.route("/download", methods=["GET"])
 def download_game() -> ResponseReturnValue:
     """Return the game state as a JSON file."""
-    global game_state
+    game = get_game(get_requested_game_id(request.args.get("game_id")))
+
+    if game is None:
+        return game_not_found_response()
+
+    _, game_state = game
 
     # Use a tempfile
     temp = tempfile.NamedTemporaryFile(
         mode="w", suffix=".json", delete=False
     )
 
-    # Use the builtin __dict__ function to convert the game state object to JSON
     with temp:
-        json.dump(game_state.__dict__, temp)
+        json.dump(game_state.to_dict(), temp)
 
     logger.info("Sent the game state JSON.")
 
@@ -126,28 +794,58 @@ def upload_game() -> ResponseReturnValue:
 
         return jsonify({"status": "fail", "message": message})
 
-    global game_state
+    game = get_owned_game(request.form.get("game_id"))
+
+    if game is None:
+        return game_not_found_response()
+
+    game_id, game_state = game
+
     try:
+        # Pondered replies are for the old position
+        get_ponderer().stop(game_id)
+
         # restore JSON into your GameState
-        game_state.update(json.load(file))
+        game_state.update(json.load(file.stream))
 
         logger.info("Updated game state.")
 
-        response = game_state.create_response(status="success")
+        response = create_game_response(game_id, game_state, status="success")
+
+        save_game(game_id, game_state)
+
+        # The whole position has changed, so subscribers are sent the full state
+        event_broker.publish(game_id, "state", response)
 
         return jsonify(response)
     except Exception as e:
         message = f"Failed to update game state. {str(e)}."
+        logger.error(message)
 
-        return jsonify({"status": "fail", "message": message})
+        return jsonify({"status": "fail", "message": message}), 400
 
 @app.route("/move", methods=["GET"])
 def move() -> ResponseReturnValue:
-    """Make a move on the board and check for a finished game. Optionally make an AI move."""
-    global game_state
+    """Make a move on the board and check for a finished game. Optionally make an AI move.
+
+    Stateless games send their signed token, and are sent back a new one.
+    """
+    try:
+        game = get_request_game(changes_game=True)
+    except ValueError as e:
+        message = f"Failed to make move. {str(e)}"
+        logger.error(message)
+
+        return jsonify({"status": "fail", "message": message})
+
+    if game is None:
+        return game_not_found_response()
+
+    game_id, game_state = game
 
     status = "success"
     message = ""
+    ai_depth = None
 
     if game_state.game_finished:
         message = "Failed to make move. Game finished."
@@ -162,10 +860,11 @@ def move() -> ResponseReturnValue:
         col = int(request.args.get("x")) - 1
         row = int(request.args.get("y")) - 1
 
-        make_move(board=game_state.board, move=(row, col), colour=game_state.current_player_colour)
+        flipped = game_state.play_move(move=(row, col), colour=game_state.current_player_colour)
         logger.info(f"Made move: {(row, col)}.")
 
-        game_state.moves_left -= 1
+        # Stop pondering, keeping any replies that have already been searched
+        ponder_session = get_ponderer().stop(game_id) if game_id is not None else None
 
         # Determine next player after human move
         human_colour = game_state.current_player_colour
@@ -178,6 +877,14 @@ def move() -> ResponseReturnValue:
             message = f"Skipping {next_colour}'s turn."
             logger.info(message)
 
+        publish_move(game_id, game_state, (row, col), human_colour, flipped)
+        record_move(game_id, human_colour, (row, col))
+
+        if game_state.current_player_colour != next_colour:
+            game_state.record_pass(next_colour)
+            publish_event(game_id, "pass", {"colour": next_colour})
+            record_move(game_id, next_colour, None)
+
         # Check if the game mode is AI, and if it's the AI's turn and they have moves left
         if (game_state.game_mode == "ai" and
             game_state.current_player_colour != STARTING_PLAYER and
@@ -185,20 +892,54 @@ def move() -> ResponseReturnValue:
 
             ai_colour = game_state.current_player_colour
 
-            # Generate an AI mode
-            ai_move = get_ai_move(board=game_state.board, colour=ai_colour)
+            # Use the pondered reply to this move if there is one
+            ai_result = None
+
+            if ponder_session is not None:
+                ai_result = ponder_session.lookup(board=game_state.board, colour=ai_colour)
+
+                if metrics.enabled:
+                    metrics.PONDER_LOOKUPS.inc()
+
+                    if ai_result is not None:
+                        metrics.PONDER_HITS.inc()
+
+            # Otherwise generate an AI move within the configured time budget
+            if ai_result is None:
+                def publish_progress(search_result: SearchResult) -> None:
+                    """Publish the AI's best move so far after each completed depth."""
+                    publish_event(game_id, "ai_thinking", {
+                        "depth": search_result.depth,
+                        "move": search_result.move,
+                        "score": search_result.score
+                    })
+
+                ai_result = search_move(
+                    board=game_state.board,
+                    colour=ai_colour,
+                    deadline_ms=app.config["AI_DEADLINE_MS"],
+                    on_iteration=publish_progress,
+                    options=get_search_options()
+                )
+            else:
+                logger.info("Using pondered AI move.")
+
+            ai_move = ai_result.move
+            ai_depth = ai_result.depth
 
             # Check if the AI move is valid
             if ai_move is not None:
-                make_move(board=game_state.board, move=ai_move, colour=ai_colour)
+                flipped = game_state.play_move(move=ai_move, colour=ai_colour)
 
-                logger.info(f"Made AI move: {ai_move}.")
+                logger.info(f"Made AI move: {ai_move}. Searched to depth {ai_depth}.")
             # If no move can be made, skip the AI's turn
             else:
                 message = f"Skipping {ai_colour}'s turn."
                 logger.info(message)
 
-            game_state.moves_left -= 1
+                game_state.record_pass(ai_colour, counted=True)
+                publish_event(game_id, "pass", {"colour": ai_colour})
+                record_move(game_id, ai_colour, None)
 
             # Check if the human can move
             if player_can_move(board=game_state.board, colour=human_colour):
@@ -207,6 +948,15 @@ def move() -> ResponseReturnValue:
                 message = f"Skipping {human_colour}'s turn."
                 logger.info(message)
 
+            if ai_move is not None:
+                publish_move(game_id, game_state, ai_move, ai_colour, flipped)
+                record_move(game_id, ai_colour, ai_move)
+
+            if game_state.current_player_colour != human_colour:
+                game_state.record_pass(human_colour)
+                publish_event(game_id, "pass", {"colour": human_colour})
+                record_move(game_id, human_colour, None)
+
     except Exception as e:
         status = "fail"
         message = f"Failed to make move. {str(e)}"
@@ -239,10 +989,320 @@ def move() -> ResponseReturnValue:
 
         logger.info(message)
 
-    response = game_state.create_response(status, message)
+        publish_event(game_id, "game_over", {"winner": winner, "message": message})
+
+    # Search the AI's replies while the human decides their next move
+    elif (app.config["PONDER_ENABLED"] and
+          game_id is not None and
+          game_state.game_mode == "ai" and
+          game_state.current_player_colour == STARTING_PLAYER):
+        get_ponderer().start(
+            game_id=game_id,
+            board=game_state.board,
+            human_colour=game_state.current_player_colour,
+            deadline_ms=app.config["PONDER_DEADLINE_MS"],
+            options=get_search_options()
+        )
+
+    save_game(game_id, game_state)
+
+    response = create_game_response(game_id, game_state, status, message)
+
+    # Include how deep the AI searched, if it searched at all
+    if ai_depth is not None:
+        response["ai_depth"] = ai_depth
 
     return jsonify(response)
 
+def step_game_history(redo: bool) -> ResponseReturnValue:
+    """Undo or redo the requested game's last turn, and return the new state."""
+    action = "redo" if redo else "undo"
+    game = get_owned_game(request.args.get("game_id"))
+
+    if game is None:
+        return game_not_found_response()
+
+    game_id, game_state = game
+
+    # Pondered replies are for the old position
+    get_ponderer().stop(game_id)
+
+    if redo:
+        changed = game_state.redo()
+
+        for entry in game_state.move_log[len(game_state.move_log) - changed:]:
+            colour, move = decode_log_entry(entry, game_state.board_size)
+            record_move(game_id, colour, move)
+    else:
+        changed = game_state.undo()
+
+        if changed > 0:
+            remove_recorded_moves(game_id, changed)
+
+    if changed == 0:
+        message = f"Failed to {action}. Nothing to {action}."
+        logger.info(message)
+
+        return jsonify({"status": "fail", "message": message})
+
+    logger.info(f"Applied {action} to {changed} moves and passes.")
+
+    save_game(game_id, game_state)
+    response = create_game_response(game_id, game_state, status="success")
+
+    # The whole position has changed, so subscribers are sent the full state
+    event_broker.publish(game_id, "state", response)
+
+    return jsonify(response)
+
+@app.route("/undo", methods=["GET"])
+def undo_move() -> ResponseReturnValue:
+    """Undo the last move, along with the AI's reply in AI mode."""
+    return step_game_history(redo=False)
+
+@app.route("/redo", methods=["GET"])
+def redo_move() -> ResponseReturnValue:
+    """Redo the last undone move, along with the AI's reply in AI mode."""
+    return step_game_history(redo=True)
+
+def parse_search_limits(default_time_ms: float) -> tuple[int | None, float]:
+    """Return the depth and time_ms request arguments, capped by the app config.
+
+    Raises ValueError for limits that are not positive numbers.
+    """
+    depth = request.args.get("depth")
+    time_ms = request.args.get("time_ms")
+
+    if depth is not None:
+        depth = min(int(depth), app.config["ANALYZE_MAX_DEPTH"])
+
+    if time_ms is not None:
+        time_ms = min(float(time_ms), app.config["ANALYZE_MAX_TIME_MS"])
+    else:
+        time_ms = default_time_ms
+
+    if (depth is not None and depth < 1) or time_ms <= 0:
+        raise ValueError("Depth and time must be positive.")
+
+    return depth, time_ms
+
+@app.route("/analyze", methods=["GET"])
+def analyze() -> ResponseReturnValue:
+    """Return every legal move for the side to move with its score, best first.
+
+    Optional depth and time_ms arguments are capped by the app config.
+    """
+    try:
+        game = get_request_game()
+
+        if game is None:
+            return game_not_found_response()
+
+        _, game_state = game
+
+        depth, time_ms = parse_search_limits(default_time_ms=app.config["ANALYZE_MAX_TIME_MS"])
+    except ValueError as e:
+        message = f"Failed to analyse position. {str(e)}"
+        logger.error(message)
+
+        return jsonify({"status": "fail", "message": message})
+
+    search_results, cached = get_analysis(
+        board=game_state.board,
+        colour=game_state.current_player_colour,
+        depth=depth,
+        time_ms=time_ms
+    )
+
+    moves = [
+        {
+            "move": search_result.move,
+            "score": search_result.score,
+            "depth": search_result.depth,
+            "principal_variation": search_result.principal_variation
+        }
+        for search_result in search_results
+    ]
+
+    logger.info(f"Analysed {len(moves)} moves. Cached: {cached}.")
+
+    return jsonify({
+        "status": "success",
+        "player": game_state.current_player_colour,
+        "moves": moves,
+        # The best move's score and line, for an evaluation bar
+        "score": moves[0]["score"] if len(moves) > 0 else None,
+        "principal_variation": moves[0]["principal_variation"] if len(moves) > 0 else [],
+        "cached": cached
+    })
+
+@app.route("/review", methods=["GET", "POST"])
+def review() -> ResponseReturnValue:
+    """Stream a review of every move, comparing it with the best move, as each one is ready.
+
+    GET reviews a stored game by its ID. POST reviews a JSON body with a list of moves,
+    each with a colour and a [row, col] move, or null for a pass, and an optional size.
+    Optional depth and time_ms arguments set the search per position.
+    """
+    try:
+        if request.method == "POST":
+            data = request.get_json()
+            move_records = data["moves"]
+            board_size = parse_board_size(data.get("size", BOARD_SIZE))
+        else:
+            game_id = request.args.get("game_id")
+            store = get_game_store()
+
+            if store is None:
+                return game_store_disabled_response()
+
+            game_record = store.load_game(game_id) if game_id is not None else None
+
+            if game_id is None or game_record is None:
+                return game_not_found_response()
+
+            move_records = store.get_moves(game_id)
+            board_size = len(game_record["board"])
+
+        moves: list[PLAYED_MOVE_TYPE] = [
+            (move_record["colour"], move_record["move"]) for move_record in move_records
+        ]
+        depth, time_ms = parse_search_limits(default_time_ms=app.config["REVIEW_TIME_MS"])
+
+        # Moves are replayed here, so an illegal move fails before the stream starts
+        reviews = review_game(
+            moves=moves, board_size=board_size, depth=depth, time_ms=time_ms,
+            cache=get_analysis_cache(), executor=get_review_executor()
+        )
+    except (ValueError, KeyError, TypeError) as e:
+        message = f"Failed to review game. {str(e)}"
+        logger.error(message)
+
+        return jsonify({"status": "fail", "message": message})
+
+    logger.info(f"Reviewing {len(moves)} moves.")
+
+    def stream() -> Iterator[str]:
+        """Yield each review as a line of JSON."""
+        for move_review in reviews:
+            yield json.dumps(move_review) + "\n"
+
+    return Response(stream(), mimetype="application/x-ndjson")
+
+def game_store_disabled_response() -> ResponseReturnValue:
+    """Create a failure response for a history request when the game store is disabled."""
+    message = "Game history is not available. The game store is disabled."
+    logger.error(message)
+
+    return jsonify({"status": "fail", "message": message})
+
+@app.route("/games", methods=["GET"])
+def list_games() -> ResponseReturnValue:
+    """Return the most recent stored games, optionally filtered by finish and result."""
+    store = get_game_store()
+
+    if store is None:
+        return game_store_disabled_response()
+
+    finished = request.args.get("finished")
+
+    try:
+        games_list = store.list_games(
+            limit=int(request.args.get("limit", DEFAULT_HISTORY_LIMIT)),
+            finished=finished.lower() == "true" if finished is not None else None,
+            result=request.args.get("result")
+        )
+    except ValueError as e:
+        message = f"Failed to list games. {str(e)}"
+        logger.error(message)
+
+        return jsonify({"status": "fail", "message": message})
+
+    return jsonify({"status": "success", "games": games_list})
+
+@app.route("/games/<game_id>", methods=["GET"])
+def game_history(game_id: str) -> ResponseReturnValue:
+    """Return a stored game's state and its moves in the order they were played."""
+    store = get_game_store()
+
+    if store is None:
+        return game_store_disabled_response()
+
+    game_record = store.load_game(game_id)
+
+    if game_record is None:
+        return game_not_found_response()
+
+    return jsonify({
+        "status": "success",
+        "game_id": game_id,
+        "game": game_record,
+        "moves": store.get_moves(game_id)
+    })
+
+@app.route("/stats", methods=["GET"])
+def game_stats() -> ResponseReturnValue:
+    """Return the number of stored games, their results and their average length."""
+    store = get_game_store()
+
+    if store is None:
+        return game_store_disabled_response()
+
+    return jsonify({"status": "success"} | store.get_stats())
+
+@app.route("/events", methods=["GET"])
+def game_events() -> ResponseReturnValue:
+    """Stream a game's moves, passes, AI progress and result as server-sent events.
+
+    The first event is the full game state, and later events are changes to it.
+    """
+    game = get_game(get_requested_game_id(request.args.get("game_id")))
+
+    if game is None:
+        return game_not_found_response()
+
+    game_id, game_state = game
+
+    # Subscribe before reading the state, so no change can fall between the two
+    subscription = event_broker.subscribe(game_id)
+    state_event = format_server_sent_event(
+        "state", create_game_response(game_id, game_state, status="success")
+    )
+    heartbeat_s = app.config["EVENTS_HEARTBEAT_S"]
+
+    def stream() -> Iterator[str]:
+        """Yield events until the game is removed or the client disconnects."""
+        try:
+            yield state_event
+
+            while True:
+                event = subscription.get(timeout=heartbeat_s)
+
+                if event is None:
+                    # A subscriber that fell behind is closed once its queue is drained,
+                    # and the client reconnects to receive the full state
+                    if subscription.closed:
+                        break
+
+                    yield ": heartbeat\n\n"
+                    continue
+
+                event_type, data = event
+                yield format_server_sent_event(event_type, data)
+
+                if event_type == CLOSED_EVENT:
+                    break
+        finally:
+            event_broker.unsubscribe(subscription)
+
+    logger.info(f"Opened event stream for game {game_id}.")
+
+    return Response(
+        stream(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 if __name__ == "__main__":
     app.run()
     logger.info("Started othello-web.")
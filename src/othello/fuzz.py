@@ -0,0 +1,573 @@
+import argparse
+import itertools
+import random
+import sys
+import time
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Protocol
+
+from . import components
+from .components import BOARD_TYPE, COLOUR_TYPE, MOVE_TYPE, invert_player_colour
+from .bitboard import (
+    MAX_BITBOARD_SIZE, MIN_BITBOARD_SIZE, bit_to_move, bitboards_to_board, get_board_masks,
+    get_legal_moves_bits, get_player_bitboards, iterate_bits, make_move_bits, move_to_bit
+)
+
+# Board sizes fuzzed by default: every size initialise_board accepts, up to the largest bitboard
+DEFAULT_BOARD_SIZES = tuple(range(2, MAX_BITBOARD_SIZE + 1, 2))
+
+# Games played by each batch a worker process is given
+DEFAULT_BATCH_GAMES = 20
+
+# Each worker process has at most this many batches queued
+PENDING_BATCHES_PER_WORKER = 2
+
+# The implementation every other one is compared with
+REFERENCE_IMPLEMENTATION = "components"
+
+# (outcome, value), where the outcome is "returned" or the name of the exception raised
+CALL_RESULT_TYPE = tuple[str, object]
+
+class LegalMoveFunction(Protocol):
+    """Return if a move is legal, like components.legal_move."""
+
+    def __call__(self, board: BOARD_TYPE, move: MOVE_TYPE, colour: COLOUR_TYPE) -> bool:
+        """Return if the move is legal for the colour."""
+        ...
+
+class GetLegalMovesFunction(Protocol):
+    """Return a colour's legal moves, like components.get_legal_moves."""
+
+    def __call__(self, board: BOARD_TYPE, colour: COLOUR_TYPE) -> list[MOVE_TYPE]:
+        """Return the legal moves for the colour."""
+        ...
+
+class MakeMoveFunction(Protocol):
+    """Make a move on the board in place, like components.make_move."""
+
+    def __call__(self, board: BOARD_TYPE, move: MOVE_TYPE, colour: COLOUR_TYPE) -> None:
+        """Make the move for the colour, raising ValueError if it is not legal."""
+        ...
+
+class CountCellsFunction(Protocol):
+    """Return the number of cells of each colour, like components.count_cells_for_colour."""
+
+    def __call__(self, board: BOARD_TYPE) -> dict[COLOUR_TYPE, int]:
+        """Return the number of cells of each colour."""
+        ...
+
+class FindWinnerFunction(Protocol):
+    """Return the colour with the most cells, like components.find_winner."""
+
+    def __call__(self, board: BOARD_TYPE) -> COLOUR_TYPE | None:
+        """Return the winner, or None for a draw."""
+        ...
+
+@dataclass(frozen=True)
+class EngineImplementation:
+    """The components game rules functions of one engine implementation.
+
+    Each function takes the same keyword arguments and behaves like its components equivalent.
+    """
+
+    legal_move: LegalMoveFunction
+    get_legal_moves: GetLegalMovesFunction
+    make_move: MakeMoveFunction
+    count_cells_for_colour: CountCellsFunction
+    find_winner: FindWinnerFunction
+    min_board_size: int = 2
+    max_board_size: int | None = None
+
+    def supports(self, board_size: int) -> bool:
+        """Return if the implementation works on a board size."""
+        return self.min_board_size <= board_size and (
+            self.max_board_size is None or board_size <= self.max_board_size
+        )
+
+@dataclass
+class FuzzFailure:
+    """A move sequence from the start on a board size that reaches a mismatch."""
+
+    board_size: int
+    moves: list[MOVE_TYPE]
+    message: str
+
+@dataclass
+class FuzzBatchResult:
+    """Result of fuzzing a batch of games: the positions checked and the first failure."""
+
+    cases: int
+    failure: FuzzFailure | None = None
+
+def bitboard_legal_move(board: BOARD_TYPE, move: MOVE_TYPE, colour: COLOUR_TYPE) -> bool:
+    """Return if a move is legal, using bitboards."""
+    board_size = len(board)
+    row, col = move
+
+    if not (0 <= row < board_size and 0 <= col < board_size):
+        return False
+
+    player, opponent = get_player_bitboards(board=board, colour=colour)
+    move_bits = get_legal_moves_bits(player, opponent, get_board_masks(board_size))
+
+    return move_bits & move_to_bit(move, board_size) != 0
+
+def bitboard_get_legal_moves(board: BOARD_TYPE, colour: COLOUR_TYPE) -> list[MOVE_TYPE]:
+    """Return the legal moves, using bitboards."""
+    board_size = len(board)
+    player, opponent = get_player_bitboards(board=board, colour=colour)
+    move_bits = get_legal_moves_bits(player, opponent, get_board_masks(board_size))
+
+    return [bit_to_move(move_bit, board_size) for move_bit in iterate_bits(move_bits)]
+
+def bitboard_make_move(board: BOARD_TYPE, move: MOVE_TYPE, colour: COLOUR_TYPE) -> None:
+    """Make a move on the board, using bitboards."""
+    if not bitboard_legal_move(board=board, move=move, colour=colour):
+        raise ValueError("Move is not legal.")
+
+    board_size = len(board)
+    player, opponent = get_player_bitboards(board=board, colour=colour)
+    player, opponent = make_move_bits(
+        player, opponent, move_to_bit(move, board_size), get_board_masks(board_size)
+    )
+    dark, light = (player, opponent) if colour == "Dark" else (opponent, player)
+
+    board[:] = bitboards_to_board(dark, light, board_size)
+
+def bitboard_count_cells_for_colour(board: BOARD_TYPE) -> dict[COLOUR_TYPE, int]:
+    """Return the number of cells each colour has, using bitboards."""
+    dark, light = get_player_bitboards(board=board, colour="Dark")
+
+    return {"Dark": dark.bit_count(), "Light": light.bit_count()}
+
+def bitboard_find_winner(board: BOARD_TYPE) -> COLOUR_TYPE | None:
+    """Return the winner, using bitboards."""
+    dark, light = get_player_bitboards(board=board, colour="Dark")
+
+    if dark.bit_count() == light.bit_count():
+        return None
+
+    return "Dark" if dark.bit_count() > light.bit_count() else "Light"
+
+# Implementations that are fuzzed against each other. Faster engines register themselves here
+IMPLEMENTATIONS: dict[str, EngineImplementation] = {
+    REFERENCE_IMPLEMENTATION: EngineImplementation(
+        legal_move=components.legal_move,
+        get_legal_moves=components.get_legal_moves,
+        make_move=components.make_move,
+        count_cells_for_colour=components.count_cells_for_colour,
+        find_winner=components.find_winner
+    ),
+    "bitboard": EngineImplementation(
+        legal_move=bitboard_legal_move,
+        get_legal_moves=bitboard_get_legal_moves,
+        make_move=bitboard_make_move,
+        count_cells_for_colour=bitboard_count_cells_for_colour,
+        find_winner=bitboard_find_winner,
+        min_board_size=MIN_BITBOARD_SIZE,
+        max_board_size=MAX_BITBOARD_SIZE
+    )
+}
+
+def register_implementation(name: str, implementation: EngineImplementation) -> None:
+    """Add an implementation to be fuzzed against the reference.
+
+    Worker processes only see implementations registered when their module is imported.
+    """
+    IMPLEMENTATIONS[name] = implementation
+
+def call_function(function: Callable[..., object], **kwargs: object) -> CALL_RESULT_TYPE:
+    """Return what a function returned, or the type of exception it raised."""
+    try:
+        return "returned", function(**kwargs)
+    except Exception as e:
+        return type(e).__name__, None
+
+def call_make_move(
+    implementation: EngineImplementation,
+    board: BOARD_TYPE,
+    move: MOVE_TYPE,
+    colour: COLOUR_TYPE
+) -> CALL_RESULT_TYPE:
+    """Return the outcome of making a move on a copy of the board, and the board after it."""
+    board = [row[:] for row in board]
+    outcome, _ = call_function(implementation.make_move, board=board, move=move, colour=colour)
+
+    return outcome, board
+
+def call_implementations(
+    implementations: dict[str, EngineImplementation],
+    call: Callable[[EngineImplementation], CALL_RESULT_TYPE]
+) -> dict[str, CALL_RESULT_TYPE]:
+    """Return the result of a call to each implementation."""
+    return {name: call(implementation) for name, implementation in implementations.items()}
+
+def find_mismatch(description: str, results: dict[str, CALL_RESULT_TYPE]) -> str | None:
+    """Return a description of the first implementation to differ from the reference, or None."""
+    reference_result = results[REFERENCE_IMPLEMENTATION]
+
+    for name, result in results.items():
+        if result != reference_result:
+            return (
+                f"{description}: {REFERENCE_IMPLEMENTATION} gave {reference_result}, "
+                f"{name} gave {result}"
+            )
+
+    return None
+
+def check_position(
+    board: BOARD_TYPE,
+    colour: COLOUR_TYPE,
+    implementations: dict[str, EngineImplementation],
+    rng: random.Random | None = None
+) -> str | None:
+    """Return a description of the first difference between implementations on a position.
+
+    With a random generator, legal_move and make_move are checked on a sample of cells.
+    Without one, they are checked on every cell, which is slower but finds every difference.
+    """
+    board_size = len(board)
+    implementations = {
+        name: implementation for name, implementation in implementations.items()
+        if implementation.supports(board_size)
+    }
+
+    mismatch = find_mismatch("count_cells_for_colour", call_implementations(
+        implementations,
+        lambda implementation: call_function(implementation.count_cells_for_colour, board=board)
+    )) or find_mismatch("find_winner", call_implementations(
+        implementations,
+        lambda implementation: call_function(implementation.find_winner, board=board)
+    ))
+
+    if mismatch is not None:
+        return mismatch
+
+    # Cells just off the board are included, which every implementation must reject
+    all_cells = [
+        (row, col) for row in range(-1, board_size + 1) for col in range(-1, board_size + 1)
+    ]
+
+    # Both colours are checked, so positions where one side must pass are covered
+    for checked_colour in (colour, invert_player_colour(colour)):
+        results = call_implementations(
+            implementations,
+            lambda implementation: call_function(
+                implementation.get_legal_moves, board=board, colour=checked_colour
+            )
+        )
+        mismatch = find_mismatch(f"get_legal_moves(colour={checked_colour!r})", results)
+
+        if mismatch is not None:
+            return mismatch
+
+        # Samples are mostly illegal cells, so one legal move is always added if there is one
+        cells = all_cells
+
+        if rng is not None:
+            _, reference_legal_moves = results[REFERENCE_IMPLEMENTATION]
+            legal_moves = reference_legal_moves if isinstance(reference_legal_moves, list) else []
+            cells = rng.sample(all_cells, 2) + rng.sample(legal_moves, min(len(legal_moves), 1))
+
+        for cell in cells:
+            mismatch = find_mismatch(
+                f"legal_move(move={cell}, colour={checked_colour!r})",
+                call_implementations(
+                    implementations,
+                    lambda implementation: call_function(
+                        implementation.legal_move, board=board, move=cell, colour=checked_colour
+                    )
+                )
+            ) or find_mismatch(
+                f"make_move(move={cell}, colour={checked_colour!r})",
+                call_implementations(
+                    implementations,
+                    lambda implementation: call_make_move(
+                        implementation, board, cell, checked_colour
+                    )
+                )
+            )
+
+            if mismatch is not None:
+                return mismatch
+
+    return None
+
+def get_next_colour(
+    board: BOARD_TYPE,
+    colour: COLOUR_TYPE,
+    implementation: EngineImplementation = IMPLEMENTATIONS[REFERENCE_IMPLEMENTATION]
+) -> COLOUR_TYPE:
+    """Return the colour to move after a colour has moved, which moves again if the other passes."""
+    next_colour = invert_player_colour(colour)
+
+    if len(implementation.get_legal_moves(board=board, colour=next_colour)) > 0:
+        return next_colour
+
+    return colour
+
+def replay_moves(
+    moves: list[MOVE_TYPE],
+    board_size: int
+) -> list[tuple[BOARD_TYPE, COLOUR_TYPE]] | None:
+    """Return the positions before and after each move, or None if a move is not legal.
+
+    Passes are not in the move sequence, so a side that cannot move is passed automatically.
+    """
+    board = components.initialise_board(board_size)
+    colour: COLOUR_TYPE = "Dark"
+    positions = [([row[:] for row in board], colour)]
+
+    for move in moves:
+        if not components.legal_move(board=board, move=move, colour=colour):
+            return None
+
+        components.make_move(board=board, move=move, colour=colour)
+        colour = get_next_colour(board=board, colour=colour)
+        positions.append(([row[:] for row in board], colour))
+
+    return positions
+
+def find_first_mismatch(
+    moves: list[MOVE_TYPE],
+    board_size: int,
+    implementations: dict[str, EngineImplementation]
+) -> tuple[int, str] | None:
+    """Return the number of moves before the first mismatch of a sequence, and its description.
+
+    Returns None if the sequence is not legal or has no mismatch.
+    """
+    positions = replay_moves(moves, board_size)
+
+    if positions is None:
+        return None
+
+    for move_count, (board, colour) in enumerate(positions):
+        mismatch = check_position(board, colour, implementations)
+
+        if mismatch is not None:
+            return move_count, mismatch
+
+    return None
+
+def shrink_failure(
+    failure: FuzzFailure,
+    implementations: dict[str, EngineImplementation]
+) -> FuzzFailure:
+    """Return a shorter move sequence with a mismatch, by removing ever smaller runs of moves.
+
+    Only sequences that are still legal are kept, and each is cut off at its first mismatch.
+    """
+    mismatch = find_first_mismatch(failure.moves, failure.board_size, implementations)
+
+    # Failures only found by sampling are found again when every cell is checked
+    if mismatch is None:
+        return failure
+
+    move_count, message = mismatch
+    moves = failure.moves[:move_count]
+    run_length = max(len(moves) // 2, 1)
+
+    while run_length >= 1 and len(moves) > 0:
+        start = 0
+
+        while start < len(moves):
+            candidate = moves[:start] + moves[start + run_length:]
+            mismatch = find_first_mismatch(candidate, failure.board_size, implementations)
+
+            if mismatch is not None:
+                move_count, message = mismatch
+                moves = candidate[:move_count]
+            else:
+                start += run_length
+
+        run_length //= 2
+
+    return FuzzFailure(board_size=failure.board_size, moves=moves, message=message)
+
+def fuzz_batch(
+    seed: int,
+    games: int,
+    board_sizes: tuple[int, ...],
+    implementation_names: tuple[str, ...]
+) -> FuzzBatchResult:
+    """Play seeded random games, checking every position, and return the first failure."""
+    rng = random.Random(seed)
+    implementations = {name: IMPLEMENTATIONS[name] for name in implementation_names}
+    cases = 0
+
+    for _ in range(games):
+        board_size = rng.choice(board_sizes)
+
+        # Every position is checked before it is played on, so games are played with bitboards,
+        # which are faster than the reference, on the sizes they support
+        game_implementation = IMPLEMENTATIONS["bitboard"]
+
+        if not game_implementation.supports(board_size):
+            game_implementation = IMPLEMENTATIONS[REFERENCE_IMPLEMENTATION]
+
+        board = components.initialise_board(board_size)
+        colour: COLOUR_TYPE = "Dark"
+        moves: list[MOVE_TYPE] = []
+
+        # Play until neither side can move, so every game ends in a game over position
+        while True:
+            mismatch = check_position(board, colour, implementations, rng)
+            cases += 1
+
+            if mismatch is not None:
+                return FuzzBatchResult(
+                    cases=cases,
+                    failure=FuzzFailure(board_size=board_size, moves=moves, message=mismatch)
+                )
+
+            legal_moves = game_implementation.get_legal_moves(board=board, colour=colour)
+
+            if len(legal_moves) == 0:
+                break
+
+            move = rng.choice(legal_moves)
+            game_implementation.make_move(board=board, move=move, colour=colour)
+            moves.append(move)
+            colour = get_next_colour(board=board, colour=colour, implementation=game_implementation)
+
+    return FuzzBatchResult(cases=cases)
+
+def run_fuzz(
+    implementation_names: tuple[str, ...],
+    board_sizes: tuple[int, ...] = DEFAULT_BOARD_SIZES,
+    duration_s: float | None = None,
+    max_batches: int | None = None,
+    batch_games: int = DEFAULT_BATCH_GAMES,
+    seed: int = 0,
+    workers: int = 1,
+    on_batch: Callable[[int, int], None] | None = None
+) -> tuple[int, FuzzFailure | None]:
+    """Fuzz implementations against the reference until the time or batches run out.
+
+    Returns the number of positions checked and the shrunk first failure, if there is one.
+    The optional callback is given the batches and positions checked so far after each batch.
+    """
+    if REFERENCE_IMPLEMENTATION not in implementation_names:
+        implementation_names = (REFERENCE_IMPLEMENTATION, *implementation_names)
+
+    deadline = time.perf_counter() + duration_s if duration_s is not None else None
+    batch_seeds = itertools.islice(itertools.count(seed), max_batches)
+    batch_args = (batch_games, board_sizes, implementation_names)
+    batches = 0
+    cases = 0
+    failure = None
+
+    def add_batch(batch_result: FuzzBatchResult) -> None:
+        """Add a batch's result to the totals."""
+        nonlocal batches, cases, failure
+
+        batches += 1
+        cases += batch_result.cases
+
+        if failure is None:
+            failure = batch_result.failure
+
+        if on_batch is not None:
+            on_batch(batches, cases)
+
+    def finished() -> bool:
+        """Return if fuzzing should stop."""
+        return failure is not None or (deadline is not None and time.perf_counter() >= deadline)
+
+    if workers <= 1:
+        for batch_seed in batch_seeds:
+            add_batch(fuzz_batch(batch_seed, *batch_args))
+
+            if finished():
+                break
+    else:
+        max_pending = workers * PENDING_BATCHES_PER_WORKER
+        pending: set[Future[FuzzBatchResult]] = set()
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            try:
+                while not finished():
+                    for batch_seed in batch_seeds:
+                        pending.add(executor.submit(fuzz_batch, batch_seed, *batch_args))
+
+                        if len(pending) >= max_pending:
+                            break
+
+                    if len(pending) == 0:
+                        break
+
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+                    for future in done:
+                        add_batch(future.result())
+            finally:
+                # Drop any queued batches once fuzzing stops
+                for future in pending:
+                    future.cancel()
+
+    implementations = {name: IMPLEMENTATIONS[name] for name in implementation_names}
+
+    if failure is not None:
+        failure = shrink_failure(failure, implementations)
+
+    return cases, failure
+
+def main(argv: list[str] | None = None) -> None:
+    """Fuzz engine implementations against the reference from the command line."""
+    parser = argparse.ArgumentParser(
+        prog="othello-fuzz",
+        description=(
+            "Play random games on each board size and check that every engine implementation "
+            "gives the same legal moves, moves, cell counts and winners as the components "
+            "reference. A mismatch is shrunk to a short move sequence from the start."
+        )
+    )
+    parser.add_argument(
+        "--implementations", nargs="+", choices=sorted(IMPLEMENTATIONS),
+        default=sorted(IMPLEMENTATIONS), help="Implementations to compare."
+    )
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=DEFAULT_BOARD_SIZES, help="Board sizes."
+    )
+    parser.add_argument("--duration", type=float, default=60, help="Seconds to fuzz for.")
+    parser.add_argument(
+        "--batch-games", type=int, default=DEFAULT_BATCH_GAMES, help="Games per worker batch."
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first batch.")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes.")
+    args = parser.parse_args(argv)
+
+    for board_size in args.sizes:
+        # Raises ValueError for sizes the game does not accept
+        components.initialise_board(board_size)
+
+    start_time = time.perf_counter()
+    cases, failure = run_fuzz(
+        implementation_names=tuple(args.implementations), board_sizes=tuple(args.sizes),
+        duration_s=args.duration, batch_games=args.batch_games, seed=args.seed,
+        workers=args.workers,
+        on_batch=lambda batches, cases: print(
+            f"\r{batches} batches, {cases} positions, "
+            f"{cases / (time.perf_counter() - start_time):.0f} positions/s",
+            end="", file=sys.stderr
+        )
+    )
+
+    print(file=sys.stderr)
+
+    if failure is None:
+        print(f"No mismatches in {cases} positions.")
+
+        return
+
+    print(f"Mismatch on a {failure.board_size}x{failure.board_size} board after the moves:")
+    print(failure.moves)
+    print(failure.message)
+
+    sys.exit(1)
+
+if __name__ == "__main__":
+    main()
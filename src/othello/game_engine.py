@@ -1,12 +1,17 @@
+import argparse
+
 from .components import (
     MOVE_TYPE, initialise_board, print_board, make_move,
     find_winner, invert_player_colour, player_can_move,
-    count_cells_for_colour
+    count_cells_for_colour, get_max_moves
 )
 from .ai import get_ai_move
+from .bitboard import MIN_BITBOARD_SIZE, MAX_BITBOARD_SIZE
 
 BOARD_SIZE = 8
-MAX_MOVES = 60
+MIN_BOARD_SIZE = MIN_BITBOARD_SIZE
+MAX_BOARD_SIZE = MAX_BITBOARD_SIZE
+MAX_MOVES = get_max_moves(BOARD_SIZE)
 STARTING_PLAYER = "Dark"
 
 # Game Modes (in order)
@@ -15,7 +20,21 @@ STARTING_PLAYER = "Dark"
 PVP_MODE = 1
 PVAI_MODE = 2
 
-def parse_coords_input(coords_input: str) -> MOVE_TYPE:
+def parse_board_size(size_input: str | int) -> int:
+    """Parse and return a board size, checking that the AI and move generation support it."""
+    try:
+        board_size = int(size_input)
+    except ValueError:
+        raise ValueError("Board size must be an integer.")
+
+    if not (MIN_BOARD_SIZE <= board_size <= MAX_BOARD_SIZE and board_size % 2 == 0):
+        raise ValueError(
+            f"Board size must be an even number between {MIN_BOARD_SIZE} and {MAX_BOARD_SIZE}."
+        )
+
+    return board_size
+
+def parse_coords_input(coords_input: str, board_size: int = BOARD_SIZE) -> MOVE_TYPE:
     """Parse and return input board coordinates."""
     # Input has whitespace removed to allow for user error
     coords_clean_list: list[str] = [coord.strip() for coord in coords_input.strip().split(',')]
@@ -32,12 +51,12 @@ def parse_coords_input(coords_input: str) -> MOVE_TYPE:
         raise ValueError("Coordinates must be integers.")
 
     # Bounds check the input
-    if not (0 <= coord_row < BOARD_SIZE and 0 <= coord_col < BOARD_SIZE):
+    if not (0 <= coord_row < board_size and 0 <= coord_col < board_size):
         raise ValueError("Coordinates are outside the board bounds.")
 
     return (coord_row, coord_col)
 
-def cli_coords_input() -> MOVE_TYPE:
+def cli_coords_input(board_size: int = BOARD_SIZE) -> MOVE_TYPE:
     """Prompt user to input valid board coordinates."""
     valid_input = False
 
@@ -47,14 +66,14 @@ def cli_coords_input() -> MOVE_TYPE:
             # Input should be two integers, comma-seperated
             user_input = input("Enter move: ")
 
-            coords = parse_coords_input(user_input)
+            coords = parse_coords_input(user_input, board_size=board_size)
 
             valid_input = True
 
             continue
         except Exception:
             # Re-prompt the user
-            print(f"Enter your move as two comma-seperated numbers between 1 and {BOARD_SIZE}")
+            print(f"Enter your move as two comma-seperated numbers between 1 and {board_size}")
 
     return coords
 
@@ -86,18 +105,18 @@ def game_mode_input() -> int:
     return game_mode
 
 
-def simple_game_loop() -> None:
-    """Begin the CLI game loop."""
-    print("""
+def simple_game_loop(board_size: int = BOARD_SIZE) -> None:
+    """Begin the CLI game loop, on a given board size."""
+    print(f"""
     Welcome to Othello!
 
-    Please enter your moves as two numbers between 1 and 8, comma-seperated.
+    Please enter your moves as two numbers between 1 and {board_size}, comma-seperated.
     e.g. 3,4 makes a move on row 3 and column 4
     """)
 
     # Initalise game variables
-    move_counter = MAX_MOVES
-    board = initialise_board(BOARD_SIZE)
+    move_counter = get_max_moves(board_size)
+    board = initialise_board(board_size)
     current_player_colour = STARTING_PLAYER
     winner = None
 
@@ -109,8 +128,8 @@ def simple_game_loop() -> None:
         # Find the indices of all open cells
         open_cell_indices = []
 
-        for row in range(0, BOARD_SIZE):
-            for col in range(0, BOARD_SIZE):
+        for row in range(0, board_size):
+            for col in range(0, board_size):
                 if board[row][col] is None:
                     open_cell_indices.append((row, col))
 
@@ -138,10 +157,10 @@ def simple_game_loop() -> None:
             # Continually prompt the user for a valid, legal move
             while not move_made:
                 if game_mode == PVP_MODE:
-                    move = cli_coords_input()
+                    move = cli_coords_input(board_size=board_size)
                 elif game_mode == PVAI_MODE:
                     if current_player_colour == "Dark":
-                        move = cli_coords_input()
+                        move = cli_coords_input(board_size=board_size)
                     else:
                         move = get_ai_move(board=board, colour=current_player_colour)
                         print(f"AI move: {[i + 1 for i in move]}")
@@ -171,4 +190,10 @@ def simple_game_loop() -> None:
     print(f"Dark: {colour_counts.get("Dark")} Light: {colour_counts.get("Light")}")
 
 if __name__ == "__main__":
-    simple_game_loop()
+    parser = argparse.ArgumentParser(description="Play Othello in the console.")
+    parser.add_argument(
+        "--size", type=parse_board_size, default=BOARD_SIZE,
+        help=f"Board size, an even number between {MIN_BOARD_SIZE} and {MAX_BOARD_SIZE}."
+    )
+
+    simple_game_loop(board_size=parser.parse_args().size)
@@ -0,0 +1,435 @@
+import argparse
+import copy
+import math
+import random
+import sys
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+
+from .components import (
+    BOARD_TYPE, COLOUR_TYPE, MOVE_TYPE,
+    initialise_board, get_legal_moves, make_move, invert_player_colour, find_winner
+)
+from .ai import EvaluationWeights, TranspositionTable, load_evaluation_weights, search_move
+from .game_engine import BOARD_SIZE, STARTING_PLAYER, parse_board_size
+from .symmetry import canonicalize_board
+
+# Random moves played from the start position to make each opening of the suite
+DEFAULT_OPENING_PLIES = 6
+DEFAULT_MAX_PAIRS = 500
+
+# SPRT hypotheses, as the Elo difference of the engine over its opponent, and error rates
+DEFAULT_ELO0 = 0.0
+DEFAULT_ELO1 = 20.0
+DEFAULT_ALPHA = 0.05
+DEFAULT_BETA = 0.05
+
+# Each worker process has at most this many pairs queued, so few are wasted when the SPRT stops
+PENDING_PAIRS_PER_WORKER = 2
+
+# Results are counted in half points, so a game scores 0, 1 or 2 and a pair of games 0 to 4
+PAIR_OUTCOMES = 5
+
+# (board, colour to move)
+OPENING_TYPE = tuple[BOARD_TYPE, COLOUR_TYPE]
+
+@dataclass(frozen=True)
+class EngineConfig:
+    """Settings of one engine in a match. A random engine plays uniformly random legal moves."""
+
+    name: str
+    depth: int | None = None
+    time_ms: float | None = None
+    weights: EvaluationWeights = field(default_factory=EvaluationWeights)
+    random_moves: bool = False
+
+@dataclass
+class MatchResult:
+    """Result of a match, from the point of view of the first engine.
+
+    The decision is "H1" if the engine is stronger by at least elo1, "H0" if it is not
+    stronger by more than elo0, or None if the match ended before the SPRT decided.
+    """
+
+    wins: int
+    draws: int
+    losses: int
+    pair_counts: list[int]
+    elo: float
+    elo_error: float
+    llr: float
+    lower_bound: float
+    upper_bound: float
+    decision: str | None
+
+    @property
+    def pairs(self) -> int:
+        """Return the number of game pairs played."""
+        return sum(self.pair_counts)
+
+def parse_engine(spec: str) -> EngineConfig:
+    """Parse an engine from "random", or comma separated depth=, time= and weights= settings."""
+    if spec == "random":
+        return EngineConfig(name=spec, random_moves=True)
+
+    settings = {}
+
+    for setting in spec.split(","):
+        name, separator, value = setting.partition("=")
+
+        if separator == "" or name not in ("depth", "time", "weights"):
+            raise ValueError(f"Unknown engine setting {setting!r}.")
+
+        settings[name] = value
+
+    return EngineConfig(
+        name=spec,
+        depth=int(settings["depth"]) if "depth" in settings else None,
+        time_ms=float(settings["time"]) if "time" in settings else None,
+        weights=(
+            load_evaluation_weights(settings["weights"])
+            if "weights" in settings else EvaluationWeights()
+        )
+    )
+
+def get_openings(
+    count: int,
+    board_size: int = BOARD_SIZE,
+    plies: int = DEFAULT_OPENING_PLIES,
+    seed: int = 0
+) -> list[OPENING_TYPE]:
+    """Return a seeded suite of distinct openings, reached by random moves from the start.
+
+    Openings that are symmetric equivalents of each other are only included once.
+    Raises ValueError if there are not enough distinct openings.
+    """
+    rng = random.Random(seed)
+    openings = []
+    canonical_openings = set()
+
+    for _ in range(count * 100):
+        board = initialise_board(board_size)
+        colour: COLOUR_TYPE = STARTING_PLAYER
+
+        for _ in range(plies):
+            legal_moves = get_legal_moves(board=board, colour=colour)
+
+            if len(legal_moves) > 0:
+                make_move(board=board, move=rng.choice(legal_moves), colour=colour)
+
+            colour = invert_player_colour(colour)
+
+        # Skip finished openings, and give the move to the other side if this one must pass
+        if len(get_legal_moves(board=board, colour=colour)) == 0:
+            colour = invert_player_colour(colour)
+
+            if len(get_legal_moves(board=board, colour=colour)) == 0:
+                continue
+
+        canonical_board, _ = canonicalize_board(board)
+        canonical_key = (tuple(map(tuple, canonical_board)), colour)
+
+        if canonical_key in canonical_openings:
+            continue
+
+        canonical_openings.add(canonical_key)
+        openings.append((board, colour))
+
+        if len(openings) == count:
+            return openings
+
+    raise ValueError(f"Only found {len(openings)} distinct openings of {plies} moves.")
+
+def get_engine_move(
+    engine: EngineConfig,
+    board: BOARD_TYPE,
+    colour: COLOUR_TYPE,
+    rng: random.Random,
+    table: TranspositionTable
+) -> MOVE_TYPE | None:
+    """Return an engine's move for a position, or None if it must pass.
+
+    The table stores the engine's scores, so it must not be shared with other engines.
+    """
+    legal_moves = get_legal_moves(board=board, colour=colour)
+
+    if len(legal_moves) == 0:
+        return None
+    if engine.random_moves:
+        return rng.choice(legal_moves)
+
+    return search_move(
+        board=board, colour=colour, deadline_ms=engine.time_ms, max_depth=engine.depth,
+        table=table, weights=engine.weights
+    ).move
+
+def play_match_game(
+    opening: OPENING_TYPE,
+    engines: dict[COLOUR_TYPE, EngineConfig],
+    rng: random.Random
+) -> COLOUR_TYPE | None:
+    """Play a game from an opening with an engine for each colour, and return the winner."""
+    board, colour = opening
+    board = copy.deepcopy(board)
+    passes = 0
+
+    # Engines do not share stored scores, which depend on their weights
+    tables = {engine_colour: TranspositionTable() for engine_colour in engines}
+
+    while passes < 2:
+        move = get_engine_move(
+            engine=engines[colour], board=board, colour=colour, rng=rng, table=tables[colour]
+        )
+
+        if move is None:
+            passes += 1
+        else:
+            passes = 0
+            make_move(board=board, move=move, colour=colour)
+
+        colour = invert_player_colour(colour)
+
+    return find_winner(board)
+
+def play_game_pair(
+    opening: OPENING_TYPE,
+    engine: EngineConfig,
+    opponent: EngineConfig,
+    seed: int
+) -> tuple[int, int]:
+    """Play an opening twice with colours swapped, returning the engine's half points in each."""
+    rng = random.Random(seed)
+    points = []
+    engine_colours: tuple[COLOUR_TYPE, ...] = ("Dark", "Light")
+
+    for engine_colour in engine_colours:
+        engines = {engine_colour: engine, invert_player_colour(engine_colour): opponent}
+        winner = play_match_game(opening=opening, engines=engines, rng=rng)
+
+        points.append(1 if winner is None else 2 if winner == engine_colour else 0)
+
+    return points[0], points[1]
+
+def elo_to_score(elo: float) -> float:
+    """Return the expected score of a player with a given Elo advantage."""
+    return 1 / (1 + 10 ** (-elo / 400))
+
+def score_to_elo(score: float) -> float:
+    """Return the Elo advantage of a player with a given expected score."""
+    if score <= 0:
+        return -math.inf
+    if score >= 1:
+        return math.inf
+
+    return -400 * math.log10(1 / score - 1)
+
+def get_pair_score_statistics(pair_counts: list[int]) -> tuple[float, float, float]:
+    """Return the count, mean and variance of the pair scores, each scaled to between 0 and 1.
+
+    One drawn pair is added to the results, so a run of identical results still has a
+    variance and a finite Elo.
+    """
+    counts = list(pair_counts)
+    counts[PAIR_OUTCOMES // 2] += 1
+    pairs = sum(counts)
+    scores = [outcome / (PAIR_OUTCOMES - 1) for outcome in range(PAIR_OUTCOMES)]
+
+    mean = sum(count * score for count, score in zip(counts, scores)) / pairs
+    variance = sum(count * (score - mean) ** 2 for count, score in zip(counts, scores)) / pairs
+
+    return pairs, mean, variance
+
+def get_llr(pair_counts: list[int], elo0: float, elo1: float) -> float:
+    """Return the log-likelihood ratio of elo1 over elo0, by the normal approximation."""
+    pairs, mean, variance = get_pair_score_statistics(pair_counts)
+    score0 = elo_to_score(elo0)
+    score1 = elo_to_score(elo1)
+
+    # Before any pair is played there is no information either way
+    if variance == 0:
+        return 0.0
+
+    return pairs * (score1 - score0) * (2 * mean - score0 - score1) / (2 * variance)
+
+def create_match_result(
+    pair_points: list[tuple[int, int]],
+    elo0: float,
+    elo1: float,
+    alpha: float,
+    beta: float
+) -> MatchResult:
+    """Return the match result for the pairs played so far, with the SPRT decision if made."""
+    pair_counts = [0] * PAIR_OUTCOMES
+    game_points = [0, 0, 0]
+
+    for first_points, second_points in pair_points:
+        pair_counts[first_points + second_points] += 1
+        game_points[first_points] += 1
+        game_points[second_points] += 1
+
+    pairs, mean, variance = get_pair_score_statistics(pair_counts)
+    # 95% confidence interval of the mean score, converted to Elo
+    margin = 1.96 * math.sqrt(variance / pairs)
+    elo_error = (score_to_elo(min(mean + margin, 1)) - score_to_elo(max(mean - margin, 0))) / 2
+
+    llr = get_llr(pair_counts, elo0, elo1)
+    lower_bound = math.log(beta / (1 - alpha))
+    upper_bound = math.log((1 - beta) / alpha)
+    decision = None
+
+    if llr >= upper_bound:
+        decision = "H1"
+    elif llr <= lower_bound:
+        decision = "H0"
+
+    return MatchResult(
+        wins=game_points[2],
+        draws=game_points[1],
+        losses=game_points[0],
+        pair_counts=pair_counts,
+        elo=score_to_elo(mean),
+        elo_error=elo_error,
+        llr=llr,
+        lower_bound=lower_bound,
+        upper_bound=upper_bound,
+        decision=decision
+    )
+
+def run_match(
+    engine: EngineConfig,
+    opponent: EngineConfig,
+    max_pairs: int = DEFAULT_MAX_PAIRS,
+    board_size: int = BOARD_SIZE,
+    opening_plies: int = DEFAULT_OPENING_PLIES,
+    seed: int = 0,
+    workers: int = 1,
+    elo0: float = DEFAULT_ELO0,
+    elo1: float = DEFAULT_ELO1,
+    alpha: float = DEFAULT_ALPHA,
+    beta: float = DEFAULT_BETA,
+    on_pair: Callable[[MatchResult], None] | None = None
+) -> MatchResult:
+    """Play pairs of games between two engines until the SPRT decides, or the openings run out.
+
+    Each opening of a seeded suite is played twice, with colours swapped. The optional
+    callback is given the result so far after each pair.
+    """
+    openings = get_openings(count=max_pairs, board_size=board_size, plies=opening_plies, seed=seed)
+    pair_points: list[tuple[int, int]] = []
+    match_result = create_match_result(pair_points, elo0, elo1, alpha, beta)
+
+    def add_pair(points: tuple[int, int]) -> None:
+        """Add a pair's points to the result so far."""
+        nonlocal match_result
+
+        pair_points.append(points)
+        match_result = create_match_result(pair_points, elo0, elo1, alpha, beta)
+
+        if on_pair is not None:
+            on_pair(match_result)
+
+    if workers <= 1:
+        for pair_index, opening in enumerate(openings):
+            add_pair(play_game_pair(opening, engine, opponent, seed + pair_index))
+
+            if match_result.decision is not None:
+                break
+
+        return match_result
+
+    max_pending = workers * PENDING_PAIRS_PER_WORKER
+    pending: set[Future[tuple[int, int]]] = set()
+    opening_iterator = enumerate(openings)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        try:
+            while True:
+                for pair_index, opening in opening_iterator:
+                    pending.add(executor.submit(
+                        play_game_pair, opening, engine, opponent, seed + pair_index
+                    ))
+
+                    if len(pending) >= max_pending:
+                        break
+
+                if len(pending) == 0:
+                    break
+
+                # Pairs are counted as they finish, so the SPRT can stop the match early
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    add_pair(future.result())
+
+                if match_result.decision is not None:
+                    break
+        finally:
+            # Drop any queued pairs once the match is decided
+            for future in pending:
+                future.cancel()
+
+    return match_result
+
+def format_match_result(match_result: MatchResult) -> str:
+    """Return a summary of a match result."""
+    if match_result.decision == "H1":
+        decision = "H1 accepted"
+    elif match_result.decision == "H0":
+        decision = "H0 accepted"
+    else:
+        decision = "undecided"
+
+    return (
+        f"Pairs: {match_result.pairs} (W {match_result.wins}, D {match_result.draws}, "
+        f"L {match_result.losses}), pentanomial {match_result.pair_counts}\n"
+        f"Elo: {match_result.elo:+.1f} ± {match_result.elo_error:.1f} (95%)\n"
+        f"LLR: {match_result.llr:.2f} [{match_result.lower_bound:.2f}, "
+        f"{match_result.upper_bound:.2f}], {decision}"
+    )
+
+def main(argv: list[str] | None = None) -> None:
+    """Run a match between two engines from the command line."""
+    parser = argparse.ArgumentParser(
+        prog="othello-match",
+        description=(
+            "Play two engines against each other in pairs of games from seeded openings, with "
+            "colours swapped, until a sequential probability ratio test decides between elo0 "
+            "and elo1. Engines are \"random\", or comma separated depth=, time= (milliseconds) "
+            "and weights= (weights file) settings, e.g. depth=3,weights=weights.json."
+        )
+    )
+    parser.add_argument("engine", help="Engine being tested.")
+    parser.add_argument("opponent", help="Engine it is compared with.")
+    parser.add_argument(
+        "--max-pairs", type=int, default=DEFAULT_MAX_PAIRS, help="Number of openings in the suite."
+    )
+    parser.add_argument("--size", default=BOARD_SIZE, help="Board size.")
+    parser.add_argument(
+        "--opening-plies", type=int, default=DEFAULT_OPENING_PLIES,
+        help="Random moves in each opening."
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the opening suite.")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes.")
+    parser.add_argument("--elo0", type=float, default=DEFAULT_ELO0, help="Elo of H0.")
+    parser.add_argument("--elo1", type=float, default=DEFAULT_ELO1, help="Elo of H1.")
+    parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA, help="False positive rate.")
+    parser.add_argument("--beta", type=float, default=DEFAULT_BETA, help="False negative rate.")
+    args = parser.parse_args(argv)
+
+    match_result = run_match(
+        engine=parse_engine(args.engine), opponent=parse_engine(args.opponent),
+        max_pairs=args.max_pairs, board_size=parse_board_size(args.size),
+        opening_plies=args.opening_plies, seed=args.seed, workers=args.workers,
+        elo0=args.elo0, elo1=args.elo1, alpha=args.alpha, beta=args.beta,
+        on_pair=lambda result: print(
+            f"\r{result.pairs} pairs, Elo {result.elo:+.1f}, LLR {result.llr:.2f}",
+            end="", file=sys.stderr
+        )
+    )
+
+    print(file=sys.stderr)
+    print(format_match_result(match_result))
+
+if __name__ == "__main__":
+    main()
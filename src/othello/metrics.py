@@ -0,0 +1,159 @@
+import threading
+
+# Upper bounds of the default histogram buckets, in seconds
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.2, 0.5, 1.0, 2.5, 5.0)
+
+# When disabled, instrumented code skips recording entirely
+enabled = False
+
+class Counter:
+    """Class to store a monotonically increasing count."""
+
+    name: str
+    description: str
+    value: float
+
+    def __init__(self, name: str, description: str) -> None:
+        """Initialise the counter at zero."""
+        self.name = name
+        self.description = description
+        self.value = 0
+
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        """Increase the count by a given amount."""
+        with self._lock:
+            self.value += amount
+
+    def render(self) -> list[str]:
+        """Return the counter in Prometheus text format lines."""
+        return [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} counter",
+            f"{self.name} {self.value}"
+        ]
+
+class Histogram:
+    """Class to store the distribution of observed values in cumulative buckets."""
+
+    name: str
+    description: str
+    buckets: tuple[float, ...]
+    bucket_counts: list[int]
+    total: float
+    count: int
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        buckets: tuple[float, ...] = LATENCY_BUCKETS
+    ) -> None:
+        """Initialise an empty histogram with given bucket upper bounds."""
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self.bucket_counts = [0 for _ in buckets]
+        self.total = 0
+        self.count = 0
+
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """Record an observed value."""
+        with self._lock:
+            for bucket_index, upper_bound in enumerate(self.buckets):
+                if value <= upper_bound:
+                    self.bucket_counts[bucket_index] += 1
+                    break
+
+            self.total += value
+            self.count += 1
+
+    def render(self) -> list[str]:
+        """Return the histogram in Prometheus text format lines."""
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} histogram"
+        ]
+
+        # Prometheus buckets are cumulative
+        cumulative_count = 0
+        for upper_bound, bucket_count in zip(self.buckets, self.bucket_counts, strict=True):
+            cumulative_count += bucket_count
+            lines.append(f'{self.name}_bucket{{le="{upper_bound}"}} {cumulative_count}')
+
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{self.name}_sum {self.total}")
+        lines.append(f"{self.name}_count {self.count}")
+
+        return lines
+
+registry: dict[str, Counter | Histogram] = {}
+
+def counter(name: str, description: str) -> Counter:
+    """Return the registered counter with a given name, creating it if needed."""
+    if name not in registry:
+        registry[name] = Counter(name=name, description=description)
+
+    metric = registry[name]
+
+    if not isinstance(metric, Counter):
+        raise ValueError(f"Metric {name} is not a counter.")
+
+    return metric
+
+def histogram(
+    name: str,
+    description: str,
+    buckets: tuple[float, ...] = LATENCY_BUCKETS
+) -> Histogram:
+    """Return the registered histogram with a given name, creating it if needed."""
+    if name not in registry:
+        registry[name] = Histogram(name=name, description=description, buckets=buckets)
+
+    metric = registry[name]
+
+    if not isinstance(metric, Histogram):
+        raise ValueError(f"Metric {name} is not a histogram.")
+
+    return metric
+
+def set_enabled(value: bool) -> None:
+    """Switch recording of all metrics on or off."""
+    global enabled
+    enabled = value
+
+def render_prometheus() -> str:
+    """Return every registered metric in the Prometheus text exposition format."""
+    lines = []
+
+    for metric in registry.values():
+        lines.extend(metric.render())
+
+    return "\n".join(lines) + "\n"
+
+# Metrics recorded by the engine and web app
+MOVE_GENERATION_CALLS = counter(
+    "othello_move_generation_calls_total", "Number of legal move generation calls."
+)
+AI_NODES = counter("othello_ai_nodes_total", "Number of positions searched by the AI.")
+AI_SEARCH_SECONDS = histogram("othello_ai_search_seconds", "Time taken by each AI search.")
+TRANSPOSITION_TABLE_LOOKUPS = counter(
+    "othello_transposition_table_lookups_total", "Number of transposition table lookups."
+)
+TRANSPOSITION_TABLE_HITS = counter(
+    "othello_transposition_table_hits_total", "Number of transposition table lookups used."
+)
+PONDER_LOOKUPS = counter("othello_ponder_lookups_total", "Number of pondered reply lookups.")
+PONDER_HITS = counter("othello_ponder_hits_total", "Number of AI moves served by pondering.")
+ANALYSIS_CACHE_LOOKUPS = counter(
+    "othello_analysis_cache_lookups_total", "Number of analysed position cache lookups."
+)
+ANALYSIS_CACHE_HITS = counter(
+    "othello_analysis_cache_hits_total", "Number of analyses served from the cache."
+)
+MOVE_REQUEST_SECONDS = histogram(
+    "othello_move_request_seconds", "Time taken to handle each /move request."
+)
@@ -0,0 +1,248 @@
+import re
+import sys
+import threading
+import time
+from collections.abc import Callable
+from typing import TextIO
+
+from .components import (
+    BOARD_TYPE, COLOUR_TYPE, MOVE_TYPE, initialise_board, make_move,
+    invert_player_colour, player_can_move
+)
+from .ai import SearchResult, analyze_moves, search_move
+from .analyze import parse_colour, parse_compact_board
+from .bitboard import get_board_masks
+from .game_engine import BOARD_SIZE, STARTING_PLAYER
+
+ENGINE_NAME = "Othello"
+
+# Default search time per move, used when no depth or time limit is set
+DEFAULT_TIME_MS = 1000
+
+# Number of moves given by a hint when no count is sent
+DEFAULT_HINT_COUNT = 1
+
+PASS_NOTATION = "PA"
+
+def move_to_notation(move: MOVE_TYPE | None) -> str:
+    """Return a move in NBoard notation, e.g. (2, 3) -> d3."""
+    if move is None:
+        return PASS_NOTATION
+
+    row, col = move
+
+    return f"{chr(ord('a') + col)}{row + 1}"
+
+def notation_to_move(notation: str) -> MOVE_TYPE | None:
+    """Return the move for NBoard notation, or None for a pass."""
+    # Moves may be followed by an evaluation and time, e.g. d3/1.00/0.5
+    notation = notation.split("/")[0].strip().lower()
+
+    if notation == PASS_NOTATION.lower():
+        return None
+
+    if len(notation) < 2 or not notation[0].isalpha() or not notation[1:].isdigit():
+        raise ValueError(f"Invalid move: {notation}.")
+
+    return (int(notation[1:]) - 1, ord(notation[0]) - ord("a"))
+
+def parse_ggf_game(ggf: str) -> tuple[BOARD_TYPE, COLOUR_TYPE]:
+    """Return the board and colour to move after the moves of a GGF game record."""
+    board_match = re.search(r"BO\[(\d+)\s+([^\]]*)\]", ggf)
+
+    if board_match is None:
+        raise ValueError("Game has no starting board.")
+
+    # The starting board is the cells followed by the side to move, with * for Dark
+    board_text = "".join(board_match.group(2).split())
+    board = parse_compact_board(board_text[:-1])
+    colour = parse_colour(board_text[-1])
+
+    # Moves are B[..] and W[..], but not properties such as PB[..] for player names
+    for move_match in re.finditer(r"(?<![A-Z])([BW])\[([^\]]*)\]", ggf[board_match.end():]):
+        colour = "Dark" if move_match.group(1) == "B" else "Light"
+        move = notation_to_move(move_match.group(2))
+
+        if move is not None:
+            make_move(board=board, move=move, colour=colour)
+
+        colour = invert_player_colour(colour)
+
+    return board, colour
+
+class NBoardEngine:
+    """Class to run a persistent engine that speaks the NBoard protocol.
+
+    The transposition table and board masks live for as long as the process,
+    so they stay warm across moves and games.
+    """
+
+    output: TextIO
+    board: BOARD_TYPE
+    colour: COLOUR_TYPE
+    depth: int | None
+    time_ms: float | None
+
+    def __init__(self, output: TextIO) -> None:
+        """Initialise the engine with a new game, writing responses to a given output."""
+        self.output = output
+        self.board = initialise_board(BOARD_SIZE)
+        self.colour = STARTING_PLAYER
+        self.depth = None
+        self.time_ms = DEFAULT_TIME_MS
+
+        self._search_thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+        self._output_lock = threading.Lock()
+
+        # Precompute the masks for the default board size before the first search
+        get_board_masks(BOARD_SIZE)
+
+    def send(self, line: str) -> None:
+        """Write a response line."""
+        with self._output_lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+    def handle(self, line: str) -> bool:
+        """Handle a command line, returning False once the engine should quit."""
+        parts = line.split()
+
+        if len(parts) == 0:
+            return True
+
+        command, arguments = parts[0], parts[1:]
+
+        # Stop interrupts a running search, every other command waits for it to finish
+        if command == "stop":
+            self._stop_event.set()
+
+        self.wait_for_search()
+
+        try:
+            if command == "quit":
+                return False
+            if command == "nboard":
+                self.send(f"set myname {ENGINE_NAME}")
+            elif command == "set":
+                self.handle_set(arguments, line)
+            elif command == "move":
+                self.play_move(notation_to_move(arguments[0]))
+            elif command == "go":
+                self.start_search(self.go, arguments)
+            elif command == "hint":
+                self.start_search(self.hint, arguments)
+            elif command == "ping":
+                self.send(f"pong {' '.join(arguments)}".strip())
+            elif command == "learn":
+                self.send("learned")
+            elif command != "stop":
+                self.send(f"status Unknown command: {command}")
+        except (ValueError, IndexError) as e:
+            self.send(f"status Error: {str(e)}")
+
+        return True
+
+    def handle_set(self, arguments: list[str], line: str) -> None:
+        """Handle a set command, for the game, position, depth or time limit."""
+        setting = arguments[0]
+
+        if setting == "game":
+            self.board, self.colour = parse_ggf_game(line.split("game", 1)[1])
+        elif setting == "position":
+            # Not part of NBoard: a compact board followed by the side to move
+            self.board = parse_compact_board(arguments[1])
+            self.colour = parse_colour(arguments[2])
+        elif setting == "depth":
+            self.depth = int(arguments[1])
+            self.time_ms = None
+        elif setting == "time":
+            self.time_ms = float(arguments[1])
+            self.depth = None
+
+    def play_move(self, move: MOVE_TYPE | None) -> None:
+        """Play a move, or pass, for the colour to move."""
+        if move is not None:
+            make_move(board=self.board, move=move, colour=self.colour)
+        elif player_can_move(board=self.board, colour=self.colour):
+            raise ValueError("Cannot pass with a legal move available.")
+
+        self.colour = invert_player_colour(self.colour)
+
+    def get_limits(self, arguments: list[str]) -> tuple[int | None, float | None]:
+        """Return the depth and time limits, overridden by "depth N" or "time MS" arguments."""
+        depth, time_ms = self.depth, self.time_ms
+
+        if len(arguments) >= 2 and arguments[0] == "depth":
+            depth, time_ms = int(arguments[1]), None
+        elif len(arguments) >= 2 and arguments[0] == "time":
+            depth, time_ms = None, float(arguments[1])
+
+        return depth, time_ms
+
+    def start_search(self, search: Callable[[list[str]], None], arguments: list[str]) -> None:
+        """Run a search command in the background, so it can be stopped."""
+        self._stop_event.clear()
+
+        self._search_thread = threading.Thread(target=search, args=(arguments,), daemon=True)
+        self._search_thread.start()
+
+    def wait_for_search(self) -> None:
+        """Wait for any running search to finish."""
+        if self._search_thread is not None:
+            self._search_thread.join()
+            self._search_thread = None
+
+    def go(self, arguments: list[str]) -> None:
+        """Search for the best move and send it."""
+        depth, time_ms = self.get_limits(arguments)
+        start_time = time.perf_counter()
+
+        self.send("status Thinking")
+        search_result = search_move(
+            board=self.board, colour=self.colour,
+            deadline_ms=time_ms, max_depth=depth, stop_event=self._stop_event
+        )
+        elapsed_s = time.perf_counter() - start_time
+
+        score = search_result.score if search_result.move is not None else 0
+        self.send(f"=== {move_to_notation(search_result.move)}/{score:.2f}/{elapsed_s:.2f}")
+        self.send("status")
+
+    def hint(self, arguments: list[str]) -> None:
+        """Send the best moves with their scores, up to the requested number of moves."""
+        hint_count = int(arguments[0]) if len(arguments) > 0 else DEFAULT_HINT_COUNT
+        depth, time_ms = self.get_limits(arguments[1:])
+
+        self.send("status Thinking")
+        search_results: list[SearchResult] = analyze_moves(
+            board=self.board, colour=self.colour,
+            deadline_ms=time_ms, max_depth=depth, stop_event=self._stop_event
+        )
+
+        for search_result in search_results[:hint_count]:
+            principal_variation = "".join(
+                move_to_notation(move) for move in search_result.principal_variation
+            )
+            self.send(
+                f"search {principal_variation} {search_result.score:.2f} 0 {search_result.depth}"
+            )
+
+        self.send("status")
+
+def run_engine(input_stream: TextIO, output: TextIO) -> None:
+    """Read commands line by line until quit or the end of the input."""
+    engine = NBoardEngine(output=output)
+
+    for line in input_stream:
+        if not engine.handle(line):
+            break
+
+    engine.wait_for_search()
+
+def main() -> None:
+    """Run the engine over stdin and stdout."""
+    run_engine(input_stream=sys.stdin, output=sys.stdout)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import cache
+
+from .components import initialise_board
+from .bitboard import (
+    BoardMasks, board_to_bitboards, get_board_masks, get_legal_moves_bits, iterate_bits,
+    make_move_bits
+)
+from .symmetry import INVERSE_TRANSFORMS, canonicalize_bitboards, transform_move_bit
+
+# Board sizes that are small enough to solve completely
+SOLVABLE_BOARD_SIZES = (4, 6)
+
+# Tables are read from this directory, or the one named by OTHELLO_PERFECT_PLAY_DIR
+DEFAULT_TABLE_DIRECTORY = "perfect_play"
+TABLE_DIRECTORY_VARIABLE = "OTHELLO_PERFECT_PLAY_DIR"
+
+# A table file is a header, then fixed-size records sorted by position. Each record is the
+# canonical (side to move, other side) bitboards in big-endian bytes, so records sort by
+# their bytes, then the value and the best move's cell in the canonical orientation
+TABLE_MAGIC = b"OTPP"
+TABLE_VERSION = 1
+HEADER_FORMAT = ">4sBB2xQ"
+VALUE_FORMAT = ">bB"
+
+# Best move cell stored for positions where the side to move must pass
+PASS_CELL = 0xFF
+
+# Positions this many moves from the start are solved in parallel, then the moves before them
+DEFAULT_SPLIT_PLIES = 4
+
+# (canonical side to move, canonical other side)
+POSITION_TYPE = tuple[int, int]
+# (disc differential for the side to move with perfect play, best move cell)
+SOLUTION_TYPE = tuple[int, int]
+
+def get_table_path(directory: str, board_size: int) -> str:
+    """Return the path of the table for a board size."""
+    return os.path.join(directory, f"perfect_{board_size}x{board_size}.bin")
+
+def get_bitboard_bytes(board_size: int) -> int:
+    """Return the number of bytes used to store one side's cells."""
+    return (board_size * board_size + 7) // 8
+
+def solve_position(
+    player: int,
+    opponent: int,
+    masks: BoardMasks,
+    solutions: dict[POSITION_TYPE, SOLUTION_TYPE]
+) -> int:
+    """Return the final disc differential for the player to move if both sides play perfectly.
+
+    Every position reachable from this one is solved and added to the solutions, keyed by
+    its canonical orientation. Positions already in the solutions are not solved again.
+    """
+    canonical_player, canonical_opponent, _ = canonicalize_bitboards(player, opponent, masks.size)
+    position = (canonical_player, canonical_opponent)
+    solution = solutions.get(position)
+
+    if solution is not None:
+        return solution[0]
+
+    # Moves are generated on the canonical orientation, so the stored best move is in it
+    player, opponent = position
+    move_bits = get_legal_moves_bits(player, opponent, masks)
+    best_cell = PASS_CELL
+
+    if move_bits == 0:
+        if get_legal_moves_bits(opponent, player, masks) == 0:
+            value = player.bit_count() - opponent.bit_count()
+        else:
+            value = -solve_position(opponent, player, masks, solutions)
+    else:
+        # Any move scores more than losing every cell
+        value = -masks.size * masks.size - 1
+
+        for move_bit in iterate_bits(move_bits):
+            child_player, child_opponent = make_move_bits(player, opponent, move_bit, masks)
+            child_value = -solve_position(child_opponent, child_player, masks, solutions)
+
+            if child_value > value:
+                value = child_value
+                best_cell = move_bit.bit_length() - 1
+
+    solutions[position] = (value, best_cell)
+
+    return value
+
+def get_start_position(board_size: int) -> POSITION_TYPE:
+    """Return the (Dark, Light) bitboards of the start position, with Dark to move."""
+    return board_to_bitboards(board=initialise_board(board_size))
+
+def get_frontier(board_size: int, plies: int) -> list[POSITION_TYPE]:
+    """Return the distinct canonical positions a given number of moves from the start.
+
+    Finished games that end sooner are included as they are.
+    """
+    masks = get_board_masks(board_size)
+    frontier = {get_start_position(board_size)}
+
+    for _ in range(plies):
+        next_frontier = set()
+
+        for player, opponent in frontier:
+            move_bits = get_legal_moves_bits(player, opponent, masks)
+
+            if move_bits == 0:
+                # Passes do not count as a move, and finished games stay in the frontier
+                if get_legal_moves_bits(opponent, player, masks) == 0:
+                    next_frontier.add((player, opponent))
+                else:
+                    next_frontier.add((opponent, player))
+
+                continue
+
+            for move_bit in iterate_bits(move_bits):
+                child_player, child_opponent = make_move_bits(player, opponent, move_bit, masks)
+                canonical_opponent, canonical_player, _ = canonicalize_bitboards(
+                    child_opponent, child_player, board_size
+                )
+                next_frontier.add((canonical_opponent, canonical_player))
+
+        frontier = next_frontier
+
+    return sorted(frontier)
+
+def solve_subtree(
+    player: int,
+    opponent: int,
+    board_size: int
+) -> dict[POSITION_TYPE, SOLUTION_TYPE]:
+    """Return the solutions of every position reachable from one, run in a worker process."""
+    solutions: dict[POSITION_TYPE, SOLUTION_TYPE] = {}
+    solve_position(player, opponent, get_board_masks(board_size), solutions)
+
+    return solutions
+
+def solve_board_size(
+    board_size: int,
+    workers: int = 1,
+    split_plies: int = DEFAULT_SPLIT_PLIES,
+    report_progress: bool = False
+) -> dict[POSITION_TYPE, SOLUTION_TYPE]:
+    """Return the solutions of every position reachable from the start on a board size.
+
+    The positions a few moves from the start are solved in parallel by worker processes,
+    which then leaves only the first few moves to solve.
+    """
+    start_time = time.perf_counter()
+    frontier = get_frontier(board_size, split_plies)
+    solutions: dict[POSITION_TYPE, SOLUTION_TYPE] = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(solve_subtree, player, opponent, board_size)
+            for player, opponent in frontier
+        ]
+
+        for solved_count, future in enumerate(as_completed(futures), start=1):
+            solutions.update(future.result())
+
+            if report_progress:
+                print(
+                    f"{solved_count}/{len(frontier)} subtrees solved, "
+                    f"{len(solutions)} positions, {time.perf_counter() - start_time:.1f} s",
+                    file=sys.stderr
+                )
+
+    dark, light = get_start_position(board_size)
+    solve_position(dark, light, get_board_masks(board_size), solutions)
+
+    return solutions
+
+def write_table(solutions: dict[POSITION_TYPE, SOLUTION_TYPE], board_size: int, path: str) -> None:
+    """Write solutions to a table file, sorted by position."""
+    bitboard_bytes = get_bitboard_bytes(board_size)
+    temporary_path = path + ".tmp"
+
+    with open(temporary_path, "wb") as table_file:
+        table_file.write(
+            struct.pack(HEADER_FORMAT, TABLE_MAGIC, TABLE_VERSION, board_size, len(solutions))
+        )
+
+        for (player, opponent), (value, best_cell) in sorted(solutions.items()):
+            table_file.write(
+                player.to_bytes(bitboard_bytes, "big")
+                + opponent.to_bytes(bitboard_bytes, "big")
+                + struct.pack(VALUE_FORMAT, value, best_cell)
+            )
+
+    # Replace any old table in one step, so running engines never read a partial one
+    os.replace(temporary_path, path)
+
+class PerfectPlayTable:
+    """Class to look up solved positions in a memory-mapped table file.
+
+    Lookups binary search the sorted records, reading only the pages they touch.
+    """
+
+    path: str
+    board_size: int
+    record_count: int
+
+    def __init__(self, path: str) -> None:
+        """Open and check a table file. Raises ValueError if it is not a valid table."""
+        self.path = path
+
+        with open(path, "rb") as table_file:
+            self._map = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._header_size = struct.calcsize(HEADER_FORMAT)
+
+        if len(self._map) < self._header_size:
+            raise ValueError(f"{path} is not a perfect play table.")
+
+        magic, version, self.board_size, self.record_count = struct.unpack_from(
+            HEADER_FORMAT, self._map
+        )
+        self._key_size = 2 * get_bitboard_bytes(self.board_size)
+        self._record_size = self._key_size + struct.calcsize(VALUE_FORMAT)
+
+        if (magic != TABLE_MAGIC or version != TABLE_VERSION or
+            len(self._map) != self._header_size + self.record_count * self._record_size):
+            raise ValueError(f"{path} is not a perfect play table.")
+
+    def lookup(self, player: int, opponent: int) -> SOLUTION_TYPE | None:
+        """Return the perfect play value and best move bit for the player to move, or None.
+
+        The best move bit is 0 if the player must pass.
+        """
+        canonical_player, canonical_opponent, transform = canonicalize_bitboards(
+            player, opponent, self.board_size
+        )
+        bitboard_bytes = self._key_size // 2
+        key = (
+            canonical_player.to_bytes(bitboard_bytes, "big")
+            + canonical_opponent.to_bytes(bitboard_bytes, "big")
+        )
+
+        low = 0
+        high = self.record_count
+
+        while low < high:
+            middle = (low + high) // 2
+            record_start = self._header_size + middle * self._record_size
+
+            if self._map[record_start:record_start + self._key_size] < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        record_start = self._header_size + low * self._record_size
+
+        if low == self.record_count or self._map[record_start:record_start + self._key_size] != key:
+            return None
+
+        value, best_cell = struct.unpack_from(
+            VALUE_FORMAT, self._map, record_start + self._key_size
+        )
+
+        if best_cell == PASS_CELL:
+            return value, 0
+
+        # The stored move is for the canonical orientation, so is mapped back to this one
+        return value, transform_move_bit(
+            1 << best_cell, INVERSE_TRANSFORMS[transform], self.board_size
+        )
+
+@cache
+def get_perfect_play_table(board_size: int) -> PerfectPlayTable | None:
+    """Return the table for a board size, or None if there is no table for it."""
+    if board_size not in SOLVABLE_BOARD_SIZES:
+        return None
+
+    directory = os.environ.get(TABLE_DIRECTORY_VARIABLE) or DEFAULT_TABLE_DIRECTORY
+    path = get_table_path(directory, board_size)
+
+    if not os.path.exists(path):
+        return None
+
+    return PerfectPlayTable(path)
+
+def main(argv: list[str] | None = None) -> None:
+    """Solve a small board size from the command line, and write its table."""
+    parser = argparse.ArgumentParser(
+        prog="othello-solve",
+        description=(
+            "Solve every position reachable from the start on a small board, and write each "
+            "position's perfect play value and best move to a table that the AI looks up."
+        )
+    )
+    parser.add_argument("--size", type=int, choices=SOLVABLE_BOARD_SIZES, default=4)
+    parser.add_argument(
+        "--output", default=DEFAULT_TABLE_DIRECTORY, help="Directory to write the table to."
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes.")
+    parser.add_argument(
+        "--split-plies", type=int, default=DEFAULT_SPLIT_PLIES,
+        help="Moves from the start at which the solve is split between workers."
+    )
+    args = parser.parse_args(argv)
+
+    solutions = solve_board_size(
+        board_size=args.size, workers=args.workers, split_plies=args.split_plies,
+        report_progress=True
+    )
+
+    os.makedirs(args.output, exist_ok=True)
+    path = get_table_path(args.output, args.size)
+    write_table(solutions=solutions, board_size=args.size, path=path)
+
+    dark, light = get_start_position(args.size)
+    start_value, _ = solutions[canonicalize_bitboards(dark, light, args.size)[:2]]
+
+    print(
+        f"Wrote {len(solutions)} positions to {path}. "
+        f"With perfect play, Dark finishes {start_value:+d} discs.",
+        file=sys.stderr
+    )
+
+if __name__ == "__main__":
+    main()
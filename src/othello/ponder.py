@@ -0,0 +1,130 @@
+import queue
+import threading
+
+from .components import COLOUR_TYPE, BOARD_TYPE, invert_player_colour
+from .ai import (
+    BOARD_KEY_TYPE, SearchResult, SelectiveSearchOptions,
+    get_board_key, get_potential_board_states, score_board, search_move
+)
+
+# Default time spent searching each of the human's possible replies
+PONDER_DEADLINE_MS = 1000
+
+class PonderSession:
+    """Class to store the pondered AI replies and stop flag for one game."""
+
+    deadline_ms: float
+    options: SelectiveSearchOptions | None
+    stop_event: threading.Event
+    results: dict[BOARD_KEY_TYPE, SearchResult]
+
+    def __init__(self, deadline_ms: float, options: SelectiveSearchOptions | None = None) -> None:
+        """Initialise an empty session, searching each position for a given time and options."""
+        self.deadline_ms = deadline_ms
+        self.options = options
+        self.stop_event = threading.Event()
+        self.results = {}
+
+    def lookup(self, board: BOARD_TYPE, colour: COLOUR_TYPE) -> SearchResult | None:
+        """Return the pondered search result for a given board and AI colour, if there is one."""
+        return self.results.get(get_board_key(board=board, colour=colour))
+
+class Ponderer:
+    """Class to search the human's likely replies in the background, on the human's turn.
+
+    All games share a fixed number of worker threads, which caps the CPU used by pondering.
+    """
+
+    max_workers: int
+    sessions: dict[str, PonderSession]
+
+    def __init__(self, max_workers: int = 1) -> None:
+        """Initialise the ponderer. Worker threads are only started once they are needed."""
+        self.max_workers = max_workers
+        self.sessions = {}
+
+        self._tasks: queue.Queue[tuple[PonderSession, BOARD_TYPE, COLOUR_TYPE]] = queue.Queue()
+        self._workers: list[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def start(
+        self,
+        game_id: str,
+        board: BOARD_TYPE,
+        human_colour: COLOUR_TYPE,
+        deadline_ms: float = PONDER_DEADLINE_MS,
+        options: SelectiveSearchOptions | None = None
+    ) -> None:
+        """Begin pondering the AI's reply to each of the human's moves, replacing any session.
+
+        The replies are searched with the same selective search options as the AI's moves.
+        """
+        self.stop(game_id)
+
+        # Each reply is searched from the board after the human's move
+        potential_board_states = get_potential_board_states(board=board, colour=human_colour)
+
+        if potential_board_states is None:
+            return
+
+        session = PonderSession(deadline_ms=deadline_ms, options=options)
+        ai_colour = invert_player_colour(human_colour)
+
+        # The moves that look best for the human are the most likely, so ponder them first
+        likely_board_states = sorted(
+            potential_board_states.values(),
+            key=lambda potential_board: score_board(board=potential_board, colour=human_colour),
+            reverse=True
+        )
+
+        with self._lock:
+            self.sessions[game_id] = session
+            self._start_workers()
+
+        for potential_board_state in likely_board_states:
+            self._tasks.put((session, potential_board_state, ai_colour))
+
+    def stop(self, game_id: str) -> PonderSession | None:
+        """Stop pondering for a game, returning its session so results can still be used."""
+        with self._lock:
+            session = self.sessions.pop(game_id, None)
+
+        if session is not None:
+            session.stop_event.set()
+
+        return session
+
+    def stop_all(self) -> None:
+        """Stop pondering for every game."""
+        with self._lock:
+            game_ids = list(self.sessions)
+
+        for game_id in game_ids:
+            self.stop(game_id)
+
+    def _start_workers(self) -> None:
+        """Start worker threads up to the worker limit."""
+        while len(self._workers) < self.max_workers:
+            # Daemon threads, so pondering never delays the server shutting down
+            worker = threading.Thread(target=self._work, name="ponder", daemon=True)
+            worker.start()
+
+            self._workers.append(worker)
+
+    def _work(self) -> None:
+        """Continually search queued positions, skipping those from stopped sessions."""
+        while True:
+            session, board, ai_colour = self._tasks.get()
+
+            if session.stop_event.is_set():
+                continue
+
+            search_result = search_move(
+                board=board, colour=ai_colour,
+                deadline_ms=session.deadline_ms, stop_event=session.stop_event,
+                options=session.options
+            )
+
+            # A stopped search may be incomplete, but it has still warmed the shared tables
+            if not session.stop_event.is_set():
+                session.results[get_board_key(board=board, colour=ai_colour)] = search_result
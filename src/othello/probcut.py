@@ -0,0 +1,188 @@
+import argparse
+import json
+import math
+import random
+import statistics
+import sys
+
+from .components import (
+    BOARD_TYPE, COLOUR_TYPE, get_legal_moves, initialise_board, invert_player_colour, make_move
+)
+from .ai import (
+    PROBCUT_DEPTH_REDUCTIONS, PROBCUT_KEY_TYPE, PROBCUT_MIN_DEPTH, WIN_SCORE, ProbCutLine,
+    SearchContext, SelectiveSearchOptions, TranspositionTable, minimax
+)
+from .bitboard import get_board_masks, get_player_bitboards
+from .game_engine import BOARD_SIZE, parse_board_size
+
+DEFAULT_POSITIONS = 100
+DEFAULT_MAX_DEPTH = 6
+
+# Positions are sampled from random games, after at least this many moves and before the
+# last few empty cells, where searches reach the end of the game
+MIN_SAMPLE_MOVES = 4
+MIN_SAMPLE_EMPTIES = 10
+
+# (shallow score, deep score)
+SAMPLE_TYPE = tuple[float, float]
+
+def get_sample_positions(
+    board_size: int,
+    count: int,
+    seed: int
+) -> list[tuple[BOARD_TYPE, COLOUR_TYPE]]:
+    """Return positions reached by seeded random moves, spread through the game."""
+    rng = random.Random(seed)
+    positions: list[tuple[BOARD_TYPE, COLOUR_TYPE]] = []
+
+    while len(positions) < count:
+        board = initialise_board(board_size)
+        colour: COLOUR_TYPE = "Dark"
+        moves = rng.randint(MIN_SAMPLE_MOVES, board_size * board_size - 4 - MIN_SAMPLE_EMPTIES)
+
+        for _ in range(moves):
+            legal_moves = get_legal_moves(board=board, colour=colour)
+
+            if len(legal_moves) > 0:
+                make_move(board=board, move=rng.choice(legal_moves), colour=colour)
+
+            colour = invert_player_colour(colour)
+
+        if len(get_legal_moves(board=board, colour=colour)) > 0:
+            positions.append((board, colour))
+
+    return positions
+
+def collect_samples(
+    positions: list[tuple[BOARD_TYPE, COLOUR_TYPE]],
+    max_depth: int
+) -> dict[PROBCUT_KEY_TYPE, list[SAMPLE_TYPE]]:
+    """Return the pairs of shallow and deep scores of each position, for each ProbCut depth pair.
+
+    Each position is searched with the AI on either side, without selective search.
+    Scores of finished games are left out, as ProbCut does not predict them.
+    """
+    samples: dict[PROBCUT_KEY_TYPE, list[SAMPLE_TYPE]] = {}
+
+    for board, colour in positions:
+        board_size = len(board)
+        player, opponent = get_player_bitboards(board=board, colour=colour)
+
+        for maximising in (True, False):
+            # Each position has its own table, so scores are not carried between positions
+            context = SearchContext(
+                masks=get_board_masks(board_size), deadline=None, table=TranspositionTable(),
+                options=SelectiveSearchOptions()
+            )
+            scores = {
+                depth: minimax(
+                    context=context, player=player, opponent=opponent, maximising=maximising,
+                    depth=depth, alpha=-math.inf, beta=math.inf
+                )
+                for depth in range(1, max_depth + 1)
+            }
+
+            for depth in range(PROBCUT_MIN_DEPTH, max_depth + 1):
+                for reduction in PROBCUT_DEPTH_REDUCTIONS:
+                    shallow_depth = depth - reduction
+
+                    if shallow_depth < 1:
+                        continue
+
+                    shallow_score = scores[shallow_depth]
+                    deep_score = scores[depth]
+
+                    if abs(shallow_score) >= WIN_SCORE or abs(deep_score) >= WIN_SCORE:
+                        continue
+
+                    key = (board_size, depth, shallow_depth, maximising)
+                    samples.setdefault(key, []).append((shallow_score, deep_score))
+
+    return samples
+
+def fit_probcut_lines(
+    samples: dict[PROBCUT_KEY_TYPE, list[SAMPLE_TYPE]]
+) -> dict[PROBCUT_KEY_TYPE, ProbCutLine]:
+    """Fit a line predicting the deep score from the shallow score, for each depth pair.
+
+    Pairs without enough varied samples, or where the scores are not positively related,
+    are left out, so ProbCut is never used for them.
+    """
+    probcut_lines = {}
+
+    for key, pair_samples in sorted(samples.items()):
+        shallow_scores = [shallow_score for shallow_score, _ in pair_samples]
+        deep_scores = [deep_score for _, deep_score in pair_samples]
+
+        if len(pair_samples) < 3 or len(set(shallow_scores)) < 2:
+            continue
+
+        slope, intercept = statistics.linear_regression(shallow_scores, deep_scores)
+        sigma = statistics.stdev(
+            deep_score - (slope * shallow_score + intercept)
+            for shallow_score, deep_score in pair_samples
+        )
+
+        if slope > 0 and sigma > 0:
+            probcut_lines[key] = ProbCutLine(slope=slope, intercept=intercept, sigma=sigma)
+
+    return probcut_lines
+
+def write_probcut_lines(probcut_lines: dict[PROBCUT_KEY_TYPE, ProbCutLine], path: str) -> None:
+    """Write ProbCut lines to a JSON file that can be loaded through OTHELLO_PROBCUT."""
+    entries = [
+        {
+            "board_size": board_size,
+            "depth": depth,
+            "shallow_depth": shallow_depth,
+            "maximising": maximising,
+            "slope": probcut_line.slope,
+            "intercept": probcut_line.intercept,
+            "sigma": probcut_line.sigma
+        }
+        for (board_size, depth, shallow_depth, maximising), probcut_line
+        in sorted(probcut_lines.items())
+    ]
+
+    with open(path, "w") as lines_file:
+        json.dump(entries, lines_file, indent=4)
+        lines_file.write("\n")
+
+def main(argv: list[str] | None = None) -> None:
+    """Fit the ProbCut lines from the command line, and write them to a file."""
+    parser = argparse.ArgumentParser(
+        prog="othello-probcut",
+        description=(
+            "Search random positions to each depth, and fit the lines that predict a search's "
+            "score from a shallower search, which Multi-ProbCut uses to prune."
+        )
+    )
+    parser.add_argument("--size", default=BOARD_SIZE, help="Board size.")
+    parser.add_argument(
+        "--positions", type=int, default=DEFAULT_POSITIONS, help="Positions to search."
+    )
+    parser.add_argument(
+        "--max-depth", type=int, default=DEFAULT_MAX_DEPTH, help="Deepest search to fit."
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the positions.")
+    parser.add_argument("--output", "-o", default="probcut.json", help="File to write.")
+    args = parser.parse_args(argv)
+
+    positions = get_sample_positions(
+        board_size=parse_board_size(args.size), count=args.positions, seed=args.seed
+    )
+    probcut_lines = fit_probcut_lines(collect_samples(positions, max_depth=args.max_depth))
+
+    write_probcut_lines(probcut_lines, path=args.output)
+
+    for (_, depth, shallow_depth, maximising), probcut_line in sorted(probcut_lines.items()):
+        side = "AI" if maximising else "opponent"
+        print(
+            f"depth {depth} from {shallow_depth}, {side:>8} to move: "
+            f"{probcut_line.slope:.3f} x + {probcut_line.intercept:.1f}, "
+            f"sigma {probcut_line.sigma:.1f}",
+            file=sys.stderr
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import copy
+import multiprocessing
+from collections.abc import Iterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, as_completed
+
+from .components import (
+    BOARD_TYPE, COLOUR_TYPE, MOVE_TYPE, initialise_board, make_move, get_legal_moves
+)
+from .ai import AnalysisCache, SearchResult, analyze_moves
+from .game_engine import BOARD_SIZE
+
+# Default search time per reviewed position
+DEFAULT_REVIEW_TIME_MS = 500
+
+# Review workers are started fresh rather than forked, as forking a process running other
+# threads, such as the web app's ponder and store writer threads, can deadlock
+REVIEW_PROCESS_CONTEXT = multiprocessing.get_context("spawn")
+
+# (colour, move), with a move of None for a pass
+PLAYED_MOVE_TYPE = tuple[COLOUR_TYPE, MOVE_TYPE | None]
+# (ply, board before the move, colour to move, move played)
+REVIEW_POSITION_TYPE = tuple[int, BOARD_TYPE, COLOUR_TYPE, MOVE_TYPE]
+REVIEW_TYPE = dict[str, object]
+
+def get_review_positions(
+    moves: list[PLAYED_MOVE_TYPE],
+    board_size: int = BOARD_SIZE
+) -> list[REVIEW_POSITION_TYPE]:
+    """Replay a game's moves, returning the position before each move that was not a pass.
+
+    Raises ValueError if a move is not legal.
+    """
+    board = initialise_board(board_size)
+    positions = []
+
+    for ply, (colour, move) in enumerate(moves, start=1):
+        if move is None:
+            continue
+
+        move = tuple(move)
+        positions.append((ply, copy.deepcopy(board), colour, move))
+
+        try:
+            make_move(board=board, move=move, colour=colour)
+        except ValueError as e:
+            raise ValueError(f"Move {ply} by {colour} at {move} is not legal.") from e
+
+    return positions
+
+def analyze_review_position(
+    board: BOARD_TYPE,
+    colour: COLOUR_TYPE,
+    depth: int | None,
+    time_ms: float | None
+) -> list[SearchResult]:
+    """Return every legal move's search result for a position, run in a worker process."""
+    return analyze_moves(board=board, colour=colour, deadline_ms=time_ms, max_depth=depth)
+
+def create_review(
+    position: REVIEW_POSITION_TYPE,
+    search_results: list[SearchResult]
+) -> REVIEW_TYPE:
+    """Return the comparison of the best move with the played move for a position."""
+    ply, _, colour, played_move = position
+    best_result = search_results[0]
+    played_result = next(
+        search_result for search_result in search_results if search_result.move == played_move
+    )
+
+    return {
+        "ply": ply,
+        "colour": colour,
+        "played_move": played_move,
+        "played_score": played_result.score,
+        "best_move": best_result.move,
+        "best_score": best_result.score,
+        # How many points the played move gave away, from the mover's point of view
+        "loss": max(best_result.score - played_result.score, 0),
+        "depth": best_result.depth,
+        "principal_variation": best_result.principal_variation
+    }
+
+def review_game(
+    moves: list[PLAYED_MOVE_TYPE],
+    board_size: int = BOARD_SIZE,
+    depth: int | None = None,
+    time_ms: float | None = DEFAULT_REVIEW_TIME_MS,
+    workers: int = 1,
+    cache: AnalysisCache | None = None,
+    executor: Executor | None = None
+) -> Iterator[REVIEW_TYPE]:
+    """Return an iterator of the review of each move, comparing it with the best move.
+
+    Raises ValueError straight away if a move is not legal, before any searching.
+    """
+    positions = get_review_positions(moves=moves, board_size=board_size)
+
+    return review_positions(
+        positions=positions, depth=depth, time_ms=time_ms,
+        workers=workers, cache=cache, executor=executor
+    )
+
+def review_positions(
+    positions: list[REVIEW_POSITION_TYPE],
+    depth: int | None,
+    time_ms: float | None,
+    workers: int = 1,
+    cache: AnalysisCache | None = None,
+    executor: Executor | None = None
+) -> Iterator[REVIEW_TYPE]:
+    """Yield the review of each position as soon as it is ready, so not in ply order.
+
+    Positions already in the cache are reviewed first without searching. The rest are
+    searched in parallel on the given executor, or a new pool of worker processes,
+    and added to the cache.
+    """
+    pending_positions = []
+
+    for position in positions:
+        _, board, colour, _ = position
+        search_results = cache.get(board, colour, depth, time_ms) if cache is not None else None
+
+        if search_results is not None:
+            yield create_review(position, search_results)
+        # Positions with a single legal move cost nothing to review
+        elif len(get_legal_moves(board=board, colour=colour)) == 1:
+            yield create_review(position, analyze_moves(board=board, colour=colour, max_depth=0))
+        else:
+            pending_positions.append(position)
+
+    if workers <= 1 and executor is None:
+        for position in pending_positions:
+            _, board, colour, _ = position
+            search_results = analyze_review_position(board, colour, depth, time_ms)
+
+            if cache is not None:
+                cache.put(board, colour, depth, time_ms, search_results)
+
+            yield create_review(position, search_results)
+
+        return
+
+    owned_executor = None
+
+    if executor is None:
+        owned_executor = ProcessPoolExecutor(max_workers=workers, mp_context=REVIEW_PROCESS_CONTEXT)
+        executor = owned_executor
+
+    futures: dict[Future[list[SearchResult]], REVIEW_POSITION_TYPE] = {}
+
+    try:
+        for position in pending_positions:
+            _, board, colour, _ = position
+            future = executor.submit(analyze_review_position, board, colour, depth, time_ms)
+            futures[future] = position
+
+        for future in as_completed(futures):
+            position = futures[future]
+            _, board, colour, _ = position
+            search_results = future.result()
+
+            if cache is not None:
+                cache.put(board, colour, depth, time_ms, search_results)
+
+            yield create_review(position, search_results)
+    finally:
+        # Drop any queued searches if the caller stops reading reviews early
+        for future in futures:
+            future.cancel()
+
+        if owned_executor is not None:
+            owned_executor.shutdown()
@@ -0,0 +1,390 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import TypedDict
+
+import numpy as np
+
+from .components import (
+    COLOUR_TYPE, initialise_board, get_legal_moves, make_move, invert_player_colour
+)
+from .ai import search_move
+from .bitboard import board_to_bitboards
+from .game_engine import BOARD_SIZE, STARTING_PLAYER, parse_board_size
+from .symmetry import canonicalize_bitboards
+
+# Records per chunk file. Each chunk is a fixed-size .npy file, filled in place through a memmap
+CHUNK_RECORDS = 1 << 16
+
+# Random moves at the start of each game, so games do not repeat, then searched moves
+DEFAULT_RANDOM_MOVES = 8
+DEFAULT_SEARCH_DEPTH = 2
+
+# Each worker process has at most this many games queued, which bounds memory use
+PENDING_GAMES_PER_WORKER = 4
+
+MANIFEST_NAME = "manifest.json"
+
+# (position hash, Dark cells, Light cells, side to move, final disc differential for the side)
+RECORD_TYPE = tuple[int, bytes, bytes, int, int]
+
+SIDE_TO_MOVE = {"Dark": 0, "Light": 1}
+
+class DatasetManifest(TypedDict):
+    """The manifest of a dataset directory, written after each flush."""
+
+    board_size: int
+    chunk_records: int
+    games_played: int
+    chunk_counts: list[int]
+
+def get_record_dtype(board_size: int) -> np.dtype:
+    """Return the fixed-width record type for positions on a given board size."""
+    board_bytes = (board_size * board_size + 7) // 8
+
+    return np.dtype([
+        ("hash", "<u8"),
+        ("dark", "u1", (board_bytes,)),
+        ("light", "u1", (board_bytes,)),
+        ("side", "u1"),
+        ("label", "<i2"),
+    ])
+
+def get_chunk_path(directory: str, chunk_index: int) -> str:
+    """Return the path of a dataset's chunk file."""
+    return os.path.join(directory, f"chunk_{chunk_index:05d}.npy")
+
+def get_position_hash(dark: int, light: int, side: int, board_size: int) -> int:
+    """Return a 64 bit hash of a position in its canonical orientation.
+
+    All symmetric equivalents of a position have the same canonical orientation, so the same hash.
+    """
+    board_bytes = (board_size * board_size + 7) // 8
+
+    digest = hashlib.blake2b(
+        dark.to_bytes(board_bytes, "little") + light.to_bytes(board_bytes, "little")
+        + bytes((side,)),
+        digest_size=8
+    ).digest()
+
+    return int.from_bytes(digest, "little")
+
+def play_selfplay_game(
+    seed: int,
+    board_size: int,
+    random_moves: int,
+    depth: int
+) -> list[RECORD_TYPE]:
+    """Play a game from a seeded random opening, returning a record of every position.
+
+    Each position is labelled with the final disc differential for the side to move.
+    Positions are stored in their canonical orientation.
+    """
+    rng = random.Random(seed)
+    board = initialise_board(board_size)
+    colour: COLOUR_TYPE = STARTING_PLAYER
+    positions: list[tuple[int, int, COLOUR_TYPE]] = []
+    passes = 0
+    ply = 0
+
+    # Play until neither side can move
+    while passes < 2:
+        legal_moves = get_legal_moves(board=board, colour=colour)
+
+        if len(legal_moves) == 0:
+            passes += 1
+            colour = invert_player_colour(colour)
+
+            continue
+
+        passes = 0
+        dark, light = board_to_bitboards(board=board)
+        positions.append((dark, light, colour))
+
+        move = None
+
+        if ply >= random_moves:
+            move = search_move(board=board, colour=colour, max_depth=depth).move
+
+        if move is None:
+            move = rng.choice(legal_moves)
+
+        make_move(board=board, move=move, colour=colour)
+        colour = invert_player_colour(colour)
+        ply += 1
+
+    final_dark, final_light = board_to_bitboards(board=board)
+    dark_differential = final_dark.bit_count() - final_light.bit_count()
+    board_bytes = (board_size * board_size + 7) // 8
+    records = []
+
+    for dark, light, colour in positions:
+        side = SIDE_TO_MOVE[colour]
+        canonical_dark, canonical_light, _ = canonicalize_bitboards(dark, light, board_size)
+
+        records.append((
+            get_position_hash(canonical_dark, canonical_light, side, board_size),
+            canonical_dark.to_bytes(board_bytes, "little"),
+            canonical_light.to_bytes(board_bytes, "little"),
+            side,
+            dark_differential if colour == "Dark" else -dark_differential
+        ))
+
+    return records
+
+class SelfPlayDataset:
+    """Class to append deduplicated positions to chunked .npy files in a directory.
+
+    A manifest records the number of records in each chunk and the games played,
+    so an interrupted run is resumed from the last flush.
+    Hashes of flushed records are kept in a sorted array, which holds millions of positions
+    in a fraction of the memory of a set, and later hashes are merged into it at each flush.
+    """
+
+    directory: str
+    board_size: int
+    chunk_records: int
+    games_played: int
+    chunk_counts: list[int]
+    hashes: np.ndarray
+    dtype: np.dtype
+
+    def __init__(
+        self,
+        directory: str,
+        board_size: int = BOARD_SIZE,
+        chunk_records: int = CHUNK_RECORDS
+    ) -> None:
+        """Open a dataset directory, resuming from its manifest if there is one."""
+        self.directory = directory
+        self.board_size = board_size
+        self.chunk_records = chunk_records
+        self.games_played = 0
+        self.chunk_counts = []
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self._new_hashes: set[int] = set()
+
+        os.makedirs(directory, exist_ok=True)
+
+        if os.path.exists(os.path.join(directory, MANIFEST_NAME)):
+            manifest = read_manifest(directory)
+
+            if manifest["board_size"] != board_size:
+                raise ValueError(
+                    f"Dataset is for {manifest['board_size']}x{manifest['board_size']} boards."
+                )
+
+            self.chunk_records = manifest["chunk_records"]
+            self.games_played = manifest["games_played"]
+            self.chunk_counts = manifest["chunk_counts"]
+
+            # Records past a chunk's count were written after the last flush, and are ignored
+            chunk_hashes = [records["hash"] for records in iterate_chunks(directory)]
+
+            if len(chunk_hashes) > 0:
+                self.hashes = np.unique(np.concatenate(chunk_hashes))
+
+        self.dtype = get_record_dtype(board_size)
+        self._chunk: np.memmap | None = None
+
+    def _open_last_chunk(self) -> np.memmap:
+        """Return the memmap of the chunk being filled, creating a new chunk once it is full."""
+        if len(self.chunk_counts) == 0 or self.chunk_counts[-1] >= self.chunk_records:
+            self.chunk_counts.append(0)
+            self._chunk = np.lib.format.open_memmap(
+                get_chunk_path(self.directory, len(self.chunk_counts) - 1),
+                mode="w+", dtype=self.dtype, shape=(self.chunk_records,)
+            )
+        elif self._chunk is None:
+            self._chunk = np.lib.format.open_memmap(
+                get_chunk_path(self.directory, len(self.chunk_counts) - 1), mode="r+"
+            )
+
+        return self._chunk
+
+    def add_records(self, records: list[RECORD_TYPE]) -> int:
+        """Append the records of positions not already in the dataset, returning how many."""
+        added = 0
+
+        # Look up every record in the sorted hashes at once
+        record_hashes = np.fromiter(
+            (record[0] for record in records), dtype=np.uint64, count=len(records)
+        )
+        hash_indices = np.searchsorted(self.hashes, record_hashes)
+        in_range = hash_indices < len(self.hashes)
+        known = np.zeros(len(records), dtype=bool)
+        known[in_range] = self.hashes[hash_indices[in_range]] == record_hashes[in_range]
+
+        for (position_hash, dark, light, side, label), is_known in zip(records, known):
+            if is_known or position_hash in self._new_hashes:
+                continue
+
+            chunk = self._open_last_chunk()
+            record_index = self.chunk_counts[-1]
+
+            chunk[record_index] = (
+                position_hash, np.frombuffer(dark, "u1"), np.frombuffer(light, "u1"), side, label
+            )
+
+            self.chunk_counts[-1] += 1
+            self._new_hashes.add(position_hash)
+            added += 1
+
+            # Full chunks are flushed and closed, and the next record starts a new chunk
+            if self.chunk_counts[-1] >= self.chunk_records:
+                chunk.flush()
+                self._chunk = None
+
+        return added
+
+    def flush(self) -> None:
+        """Write the records to disk, then the manifest, so a restart resumes from here."""
+        if self._chunk is not None:
+            self._chunk.flush()
+
+        if len(self._new_hashes) > 0:
+            new_hashes = np.fromiter(self._new_hashes, dtype=np.uint64, count=len(self._new_hashes))
+            self.hashes = np.union1d(self.hashes, new_hashes)
+            self._new_hashes.clear()
+
+        manifest: DatasetManifest = {
+            "board_size": self.board_size,
+            "chunk_records": self.chunk_records,
+            "games_played": self.games_played,
+            "chunk_counts": self.chunk_counts
+        }
+
+        # Replace the manifest in one step, so it is never left half written
+        manifest_path = os.path.join(self.directory, MANIFEST_NAME)
+        with open(manifest_path + ".tmp", "w") as manifest_file:
+            json.dump(manifest, manifest_file)
+
+        os.replace(manifest_path + ".tmp", manifest_path)
+
+    @property
+    def record_count(self) -> int:
+        """Return the number of records in the dataset."""
+        return sum(self.chunk_counts)
+
+def read_manifest(directory: str) -> DatasetManifest:
+    """Return the manifest of a dataset directory."""
+    with open(os.path.join(directory, MANIFEST_NAME)) as manifest_file:
+        return json.load(manifest_file)
+
+def iterate_chunks(directory: str) -> Iterator[np.ndarray]:
+    """Yield the records of each chunk of a dataset, read only and memory-mapped."""
+    manifest = read_manifest(directory)
+
+    for chunk_index, count in enumerate(manifest["chunk_counts"]):
+        chunk = np.load(get_chunk_path(directory, chunk_index), mmap_mode="r")
+
+        yield chunk[:count]
+
+def iterate_games(
+    first_game: int,
+    games: int,
+    seed: int,
+    board_size: int,
+    random_moves: int,
+    depth: int,
+    workers: int
+) -> Iterator[list[RECORD_TYPE]]:
+    """Yield the records of each game in order, played in parallel by worker processes."""
+    game_seeds = (seed + game_index for game_index in range(first_game, games))
+
+    if workers <= 1:
+        for game_seed in game_seeds:
+            yield play_selfplay_game(game_seed, board_size, random_moves, depth)
+
+        return
+
+    max_pending = workers * PENDING_GAMES_PER_WORKER
+    pending: deque[Future[list[RECORD_TYPE]]] = deque()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for game_seed in game_seeds:
+            pending.append(
+                executor.submit(play_selfplay_game, game_seed, board_size, random_moves, depth)
+            )
+
+            # Games are collected in order, so the games played count is always a whole prefix
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+def generate_dataset(
+    directory: str,
+    games: int,
+    board_size: int = BOARD_SIZE,
+    random_moves: int = DEFAULT_RANDOM_MOVES,
+    depth: int = DEFAULT_SEARCH_DEPTH,
+    seed: int = 0,
+    workers: int = 1,
+    flush_every: int = 100
+) -> SelfPlayDataset:
+    """Play games until the dataset holds a given number, and return the dataset.
+
+    Game n is always played from the same seed, so a resumed run carries on exactly
+    where an interrupted one stopped.
+    """
+    dataset = SelfPlayDataset(directory=directory, board_size=board_size)
+
+    for records in iterate_games(
+        first_game=dataset.games_played, games=games, seed=seed, board_size=board_size,
+        random_moves=random_moves, depth=depth, workers=workers
+    ):
+        dataset.add_records(records)
+        dataset.games_played += 1
+
+        if dataset.games_played % flush_every == 0:
+            dataset.flush()
+            print(
+                f"{dataset.games_played}/{games} games, {dataset.record_count} positions",
+                file=sys.stderr
+            )
+
+    dataset.flush()
+
+    return dataset
+
+def main(argv: list[str] | None = None) -> None:
+    """Generate or extend a self-play dataset from the command line."""
+    parser = argparse.ArgumentParser(
+        prog="othello-selfplay",
+        description=(
+            "Play games from random openings and record every position, labelled with the "
+            "final disc differential, to chunked .npy files. Rerunning with the same "
+            "directory resumes the run."
+        )
+    )
+    parser.add_argument("directory", help="Dataset directory.")
+    parser.add_argument("--games", type=int, required=True, help="Total number of games.")
+    parser.add_argument("--size", default=BOARD_SIZE, help="Board size.")
+    parser.add_argument(
+        "--random-moves", type=int, default=DEFAULT_RANDOM_MOVES,
+        help="Random moves at the start of each game."
+    )
+    parser.add_argument(
+        "--depth", type=int, default=DEFAULT_SEARCH_DEPTH, help="Search depth after the opening."
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first game.")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes.")
+    args = parser.parse_args(argv)
+
+    dataset = generate_dataset(
+        directory=args.directory, games=args.games, board_size=parse_board_size(args.size),
+        random_moves=args.random_moves, depth=args.depth, seed=args.seed, workers=args.workers
+    )
+
+    print(f"{dataset.games_played} games, {dataset.record_count} positions", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
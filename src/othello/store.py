@@ -0,0 +1,302 @@
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import TypedDict
+
+from .components import COLOUR_TYPE, MOVE_TYPE, GameRecord
+
+# Writes are committed in one transaction once this many are queued,
+# or once the oldest queued write has waited this long
+WRITE_BATCH_SIZE = 100
+WRITE_BATCH_INTERVAL_S = 0.5
+
+DEFAULT_HISTORY_LIMIT = 20
+
+OPERATION_TYPE = tuple[str, tuple[object, ...]]
+
+class MoveRecord(TypedDict):
+    """A stored move, with a move of None for a pass."""
+
+    colour: COLOUR_TYPE
+    move: MOVE_TYPE | None
+    played_at: float
+
+logger = logging.getLogger("othello_store")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    game_id TEXT PRIMARY KEY,
+    game_mode TEXT NOT NULL,
+    board_size INTEGER NOT NULL,
+    board TEXT NOT NULL,
+    current_player_colour TEXT NOT NULL,
+    moves_left INTEGER NOT NULL,
+    game_finished INTEGER NOT NULL,
+    result TEXT,
+    started_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS moves (
+    move_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    game_id TEXT NOT NULL,
+    colour TEXT NOT NULL,
+    row INTEGER,
+    col INTEGER,
+    played_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS moves_game_id ON moves (game_id, move_id);
+CREATE INDEX IF NOT EXISTS games_finished_at ON games (finished_at);
+CREATE INDEX IF NOT EXISTS games_result ON games (result);
+"""
+
+SAVE_GAME_SQL = """
+INSERT INTO games (
+    game_id, game_mode, board_size, board, current_player_colour, moves_left,
+    game_finished, result, started_at, updated_at, finished_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (game_id) DO UPDATE SET
+    game_mode = excluded.game_mode,
+    board_size = excluded.board_size,
+    board = excluded.board,
+    current_player_colour = excluded.current_player_colour,
+    moves_left = excluded.moves_left,
+    game_finished = excluded.game_finished,
+    result = excluded.result,
+    updated_at = excluded.updated_at,
+    finished_at = CASE
+        WHEN excluded.game_finished THEN COALESCE(games.finished_at, excluded.finished_at)
+    END
+"""
+
+RECORD_MOVE_SQL = "INSERT INTO moves (game_id, colour, row, col, played_at) VALUES (?, ?, ?, ?, ?)"
+
+REMOVE_MOVES_SQL = """
+DELETE FROM moves WHERE move_id IN (
+    SELECT move_id FROM moves WHERE game_id = ? ORDER BY move_id DESC LIMIT ?
+)
+"""
+
+class GameStore:
+    """Class to store games and their moves in a SQLite database.
+
+    Writes are queued and committed in batches by a background thread,
+    so callers never wait on the disk. Reads see every write queued before them.
+    """
+
+    path: str
+    batch_size: int
+    batch_interval_s: float
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = WRITE_BATCH_SIZE,
+        batch_interval_s: float = WRITE_BATCH_INTERVAL_S
+    ) -> None:
+        """Open the database at a given path, creating its tables, and start the writer."""
+        self.path = path
+        self.batch_size = batch_size
+        self.batch_interval_s = batch_interval_s
+
+        # Write-ahead logging lets reads run while a batch is being written
+        with closing(self._connect()) as connection:
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.executescript(SCHEMA)
+
+        # Queued writes, flush markers, and None to stop the writer
+        self._writes: queue.Queue[OPERATION_TYPE | threading.Event | None] = queue.Queue()
+        self._writer = threading.Thread(target=self._write, daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return a new connection, which returns rows as dictionaries."""
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.row_factory = sqlite3.Row
+
+        return connection
+
+    def _write(self) -> None:
+        """Commit queued writes in batches until the store is closed."""
+        connection = self._connect()
+        connection.execute("PRAGMA synchronous = NORMAL")
+        stopping = False
+
+        while not stopping:
+            batch = [self._writes.get()]
+            batch_deadline = time.monotonic() + self.batch_interval_s
+
+            # Gather writes until the batch is full or has waited long enough.
+            # Flushes and closing commit the batch straight away
+            while len(batch) < self.batch_size and isinstance(batch[-1], tuple):
+                try:
+                    batch.append(
+                        self._writes.get(timeout=max(batch_deadline - time.monotonic(), 0))
+                    )
+                except queue.Empty:
+                    break
+
+            operations = [operation for operation in batch if isinstance(operation, tuple)]
+
+            try:
+                with connection:
+                    for sql, parameters in operations:
+                        connection.execute(sql, parameters)
+            except sqlite3.Error as e:
+                logger.error(f"Failed to write {len(operations)} game store operations. {str(e)}")
+
+            for operation in batch:
+                if isinstance(operation, threading.Event):
+                    operation.set()
+                elif operation is None:
+                    stopping = True
+
+        connection.close()
+
+    def save_game(self, game_id: str, game: GameRecord, result: str | None = None) -> None:
+        """Queue a write of a game's current state, with its result once it has finished.
+
+        The game is given in the /download format.
+        """
+        now = time.time()
+        board = game["board"]
+
+        self._writes.put((SAVE_GAME_SQL, (
+            game_id,
+            game["game_mode"],
+            len(board),
+            json.dumps(board),
+            game["current_player_colour"],
+            game["moves_left"],
+            int(game["game_finished"]),
+            result,
+            now,
+            now,
+            now if game["game_finished"] else None
+        )))
+
+    def record_move(self, game_id: str, colour: COLOUR_TYPE, move: MOVE_TYPE | None) -> None:
+        """Queue a write of a move, where a move of None is a pass."""
+        row, col = move if move is not None else (None, None)
+
+        self._writes.put((RECORD_MOVE_SQL, (game_id, colour, row, col, time.time())))
+
+    def remove_moves(self, game_id: str, count: int) -> None:
+        """Queue a removal of a game's last moves, when they are undone."""
+        self._writes.put((REMOVE_MOVES_SQL, (game_id, count)))
+
+    def flush(self) -> None:
+        """Wait until every write queued so far has been committed."""
+        flushed = threading.Event()
+        self._writes.put(flushed)
+
+        # A closed store has nothing left to commit
+        if self._writer.is_alive():
+            flushed.wait()
+
+    def close(self) -> None:
+        """Commit every queued write and stop the writer."""
+        if self._writer.is_alive():
+            self._writes.put(None)
+            self._writer.join()
+
+    def load_game(self, game_id: str) -> GameRecord | None:
+        """Return a stored game in the /download format, to resume it, or None if unknown."""
+        self.flush()
+
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                "SELECT * FROM games WHERE game_id = ?", (game_id,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return {
+            "board": json.loads(row["board"]),
+            "current_player_colour": row["current_player_colour"],
+            "moves_left": row["moves_left"],
+            "game_finished": bool(row["game_finished"]),
+            "game_mode": row["game_mode"]
+        }
+
+    def get_moves(self, game_id: str) -> list[MoveRecord]:
+        """Return a game's moves in the order they were played, with None moves for passes."""
+        self.flush()
+
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                "SELECT colour, row, col, played_at FROM moves WHERE game_id = ? ORDER BY move_id",
+                (game_id,)
+            ).fetchall()
+
+        return [
+            {
+                "colour": row["colour"],
+                "move": (row["row"], row["col"]) if row["row"] is not None else None,
+                "played_at": row["played_at"]
+            }
+            for row in rows
+        ]
+
+    def list_games(
+        self,
+        limit: int = DEFAULT_HISTORY_LIMIT,
+        finished: bool | None = None,
+        result: str | None = None
+    ) -> list[dict[str, object]]:
+        """Return a summary of the most recent games, optionally filtered.
+
+        Finished games are ordered by finish time, and unfinished games by their last update.
+        """
+        self.flush()
+
+        conditions = []
+        parameters: list[object] = []
+
+        if finished is not None:
+            conditions.append("game_finished = ?")
+            parameters.append(int(finished))
+        if result is not None:
+            conditions.append("result = ?")
+            parameters.append(result)
+
+        where = f"WHERE {' AND '.join(conditions)}" if len(conditions) > 0 else ""
+        order = "finished_at DESC" if finished else "updated_at DESC"
+
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                "SELECT game_id, game_mode, board_size, moves_left, game_finished, result, "
+                f"started_at, updated_at, finished_at FROM games {where} ORDER BY {order} LIMIT ?",
+                (*parameters, limit)
+            ).fetchall()
+
+        return [dict(row) | {"game_finished": bool(row["game_finished"])} for row in rows]
+
+    def get_stats(self) -> dict[str, object]:
+        """Return the number of games, finished games and each result, and the average length."""
+        self.flush()
+
+        with closing(self._connect()) as connection:
+            games, finished_games = connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(game_finished), 0) FROM games"
+            ).fetchone()
+            results = connection.execute(
+                "SELECT result, COUNT(*) FROM games WHERE result IS NOT NULL GROUP BY result"
+            ).fetchall()
+            average_moves = connection.execute(
+                "SELECT AVG(move_count) FROM ("
+                "SELECT COUNT(*) AS move_count FROM moves JOIN games USING (game_id) "
+                "WHERE games.game_finished = 1 GROUP BY game_id)"
+            ).fetchone()[0]
+
+        return {
+            "games": games,
+            "finished_games": finished_games,
+            "results": {result: count for result, count in results},
+            "average_moves": average_moves
+        }
@@ -0,0 +1,154 @@
+from functools import cache
+
+from .components import BOARD_TYPE, MOVE_TYPE
+from .bitboard import bitboards_to_board, board_to_bitboards
+
+# The 8 symmetries of a square board. Each maps a cell (row, col) to a new cell
+IDENTITY = 0
+ROTATE_90 = 1
+ROTATE_180 = 2
+ROTATE_270 = 3
+FLIP_HORIZONTAL = 4
+FLIP_VERTICAL = 5
+TRANSPOSE = 6
+ANTI_TRANSPOSE = 7
+TRANSFORM_COUNT = 8
+
+# The transform that undoes each transform. Reflections and the half turn undo themselves
+INVERSE_TRANSFORMS = (
+    IDENTITY, ROTATE_270, ROTATE_180, ROTATE_90,
+    FLIP_HORIZONTAL, FLIP_VERTICAL, TRANSPOSE, ANTI_TRANSPOSE
+)
+
+def transform_cell(row: int, col: int, transform: int, size: int) -> MOVE_TYPE:
+    """Return the cell that a given cell is moved to by a transform."""
+    last = size - 1
+
+    return (
+        (row, col),
+        (col, last - row),
+        (last - row, last - col),
+        (last - col, row),
+        (row, last - col),
+        (last - row, col),
+        (col, row),
+        (last - col, last - row),
+    )[transform]
+
+class SymmetryTables:
+    """Class to store the precomputed cell permutations for each transform of one board size."""
+
+    size: int
+    cell_maps: tuple[tuple[int, ...], ...]
+    byte_tables: tuple[tuple[tuple[int, ...], ...], ...]
+
+    def __init__(self, size: int) -> None:
+        """Precompute the permutation tables for a given board size."""
+        self.size = size
+        cell_count = size * size
+
+        # cell_maps[transform][bit index] is the bit index the cell is moved to
+        cell_maps = []
+        for transform in range(TRANSFORM_COUNT):
+            cell_map = []
+
+            for index in range(cell_count):
+                row, col = transform_cell(index // size, index % size, transform, size)
+                cell_map.append(row * size + col)
+
+            cell_maps.append(tuple(cell_map))
+
+        self.cell_maps = tuple(cell_maps)
+
+        # byte_tables[transform][byte index][byte value] is the transformed bits of that byte,
+        # so a whole bitboard is transformed with one lookup per byte
+        byte_tables = []
+        for cell_map in self.cell_maps:
+            transform_tables = []
+
+            for byte_index in range((cell_count + 7) // 8):
+                byte_table = []
+
+                for byte_value in range(256):
+                    bits = 0
+
+                    for bit in range(8):
+                        index = byte_index * 8 + bit
+
+                        if byte_value >> bit & 1 and index < cell_count:
+                            bits |= 1 << cell_map[index]
+
+                    byte_table.append(bits)
+
+                transform_tables.append(tuple(byte_table))
+
+            byte_tables.append(tuple(transform_tables))
+
+        self.byte_tables = tuple(byte_tables)
+
+@cache
+def get_symmetry_tables(size: int) -> SymmetryTables:
+    """Return the precomputed permutation tables for a given board size."""
+    return SymmetryTables(size=size)
+
+def transform_bits(bits: int, transform: int, size: int) -> int:
+    """Return a bitboard with every cell moved by a transform."""
+    if transform == IDENTITY:
+        return bits
+
+    byte_tables = get_symmetry_tables(size).byte_tables[transform]
+    transformed_bits = 0
+    byte_index = 0
+
+    while bits:
+        transformed_bits |= byte_tables[byte_index][bits & 0xFF]
+        bits >>= 8
+        byte_index += 1
+
+    return transformed_bits
+
+def transform_move_bit(move_bit: int, transform: int, size: int) -> int:
+    """Return the single bit that a move's bit is moved to by a transform, keeping 0 as 0."""
+    if move_bit == 0 or transform == IDENTITY:
+        return move_bit
+
+    return 1 << get_symmetry_tables(size).cell_maps[transform][move_bit.bit_length() - 1]
+
+def transform_move(move: MOVE_TYPE, transform: int, size: int) -> MOVE_TYPE:
+    """Return the cell that a move is moved to by a transform."""
+    row, col = move
+
+    return transform_cell(row, col, transform, size)
+
+def canonicalize_bitboards(player: int, opponent: int, size: int) -> tuple[int, int, int]:
+    """Return the canonical (player, opponent) bitboards of a position, and the transform to them.
+
+    The canonical form is the smallest of the 8 symmetric equivalents, so every equivalent
+    position has the same one. Moves found on the canonical form are mapped back to the
+    original position with the inverse transform.
+    """
+    canonical = (player, opponent)
+    canonical_transform = IDENTITY
+
+    for transform in range(1, TRANSFORM_COUNT):
+        transformed_player = transform_bits(player, transform, size)
+
+        # The opponent bitboard only breaks ties, so it is only transformed when needed
+        if transformed_player > canonical[0]:
+            continue
+
+        transformed = (transformed_player, transform_bits(opponent, transform, size))
+
+        if transformed < canonical:
+            canonical = transformed
+            canonical_transform = transform
+
+    return canonical[0], canonical[1], canonical_transform
+
+def canonicalize_board(board: BOARD_TYPE) -> tuple[BOARD_TYPE, int]:
+    """Return the canonical form of a board, and the transform to it."""
+    size = len(board)
+    dark, light = board_to_bitboards(board=board)
+    canonical_dark, canonical_light, transform = canonicalize_bitboards(dark, light, size)
+
+    return bitboards_to_board(dark=canonical_dark, light=canonical_light, size=size), transform
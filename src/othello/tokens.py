@@ -0,0 +1,81 @@
+import base64
+import hashlib
+import hmac
+import struct
+
+from .components import GameRecord
+from .bitboard import MAX_BITBOARD_SIZE, MIN_BITBOARD_SIZE, bitboards_to_board, board_to_bitboards
+
+# Tokens are the packed state followed by a truncated HMAC-SHA256 of it, in URL-safe base64.
+# The state is a header of version, board size, flags and moves left, then one bitboard per colour
+TOKEN_VERSION = 1
+HEADER_FORMAT = ">BBBH"
+SIGNATURE_BYTES = 16
+
+LIGHT_TO_MOVE_FLAG = 1
+GAME_FINISHED_FLAG = 2
+AI_MODE_FLAG = 4
+
+def get_bitboard_bytes(board_size: int) -> int:
+    """Return the number of bytes used to pack one colour's cells."""
+    return (board_size * board_size + 7) // 8
+
+def sign(payload: bytes, secret: bytes) -> bytes:
+    """Return the signature of a packed state."""
+    return hmac.digest(secret, payload, hashlib.sha256)[:SIGNATURE_BYTES]
+
+def encode_game_token(game: GameRecord, secret: bytes) -> str:
+    """Return a signed token carrying a game, given in the /download format."""
+    board = game["board"]
+    board_size = len(board)
+    dark, light = board_to_bitboards(board=board)
+
+    flags = 0
+    if game["current_player_colour"] == "Light":
+        flags |= LIGHT_TO_MOVE_FLAG
+    if game["game_finished"]:
+        flags |= GAME_FINISHED_FLAG
+    if game["game_mode"] == "ai":
+        flags |= AI_MODE_FLAG
+
+    bitboard_bytes = get_bitboard_bytes(board_size)
+    payload = (
+        struct.pack(HEADER_FORMAT, TOKEN_VERSION, board_size, flags, game["moves_left"])
+        + dark.to_bytes(bitboard_bytes, "big")
+        + light.to_bytes(bitboard_bytes, "big")
+    )
+
+    return base64.urlsafe_b64encode(payload + sign(payload, secret)).rstrip(b"=").decode()
+
+def decode_game_token(token: str, secret: bytes) -> GameRecord:
+    """Verify a signed token and return the game it carries, in the /download format."""
+    try:
+        # Padding is stripped from tokens, so add back as much as base64 needs
+        data = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    except ValueError as e:
+        raise ValueError("Invalid game token.") from e
+
+    payload, signature = data[:-SIGNATURE_BYTES], data[-SIGNATURE_BYTES:]
+    header_bytes = struct.calcsize(HEADER_FORMAT)
+
+    if len(payload) < header_bytes or not hmac.compare_digest(signature, sign(payload, secret)):
+        raise ValueError("Invalid game token.")
+
+    version, board_size, flags, moves_left = struct.unpack_from(HEADER_FORMAT, payload)
+    bitboard_bytes = get_bitboard_bytes(board_size)
+
+    if (version != TOKEN_VERSION or
+        not MIN_BITBOARD_SIZE <= board_size <= MAX_BITBOARD_SIZE or
+        len(payload) != header_bytes + 2 * bitboard_bytes):
+        raise ValueError("Unsupported game token.")
+
+    dark = int.from_bytes(payload[header_bytes:header_bytes + bitboard_bytes], "big")
+    light = int.from_bytes(payload[header_bytes + bitboard_bytes:], "big")
+
+    return {
+        "board": bitboards_to_board(dark=dark, light=light, size=board_size),
+        "current_player_colour": "Light" if flags & LIGHT_TO_MOVE_FLAG else "Dark",
+        "moves_left": moves_left,
+        "game_finished": bool(flags & GAME_FINISHED_FLAG),
+        "game_mode": "ai" if flags & AI_MODE_FLAG else "pvp"
+    }
@@ -0,0 +1,249 @@
+import argparse
+import dataclasses
+import json
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+
+from .components import DIRECTIONS, get_cell_position_type
+from .ai import EvaluationWeights
+from .selfplay import iterate_chunks, read_manifest
+
+# Features in the order of the EvaluationWeights fields: the six position categories, then mobility
+FEATURE_NAMES = tuple(weight_field.name for weight_field in dataclasses.fields(EvaluationWeights))
+POSITION_TYPES = FEATURE_NAMES[:-1]
+
+# Newton's method stops once no coefficient changes by more than this
+CONVERGENCE_TOLERANCE = 1e-9
+MAX_ITERATIONS = 50
+
+# Keeps the fit well defined if a feature never varies in the dataset
+REGULARISATION = 1e-6
+
+@dataclass
+class TuningResult:
+    """Result of tuning: the fitted weights, the score scale and the loss before and after."""
+
+    weights: EvaluationWeights
+    scale: float
+    default_loss: float
+    tuned_loss: float
+    positions: int
+
+def get_position_type_matrix(board_size: int) -> np.ndarray:
+    """Return a matrix mapping each cell to a one-hot row of its position category."""
+    matrix = np.zeros((board_size * board_size, len(POSITION_TYPES)))
+
+    for row in range(board_size):
+        for col in range(board_size):
+            position_type = get_cell_position_type(row=row, col=col, board_size=board_size)
+
+            if position_type is not None:
+                matrix[row * board_size + col, POSITION_TYPES.index(position_type)] = 1
+
+    return matrix
+
+def unpack_cells(packed: np.ndarray, board_size: int) -> np.ndarray:
+    """Return the boolean (position, row, col) cells of an array of packed bitboards."""
+    cells = np.unpackbits(packed, axis=1, bitorder="little")[:, :board_size * board_size]
+
+    return cells.reshape(-1, board_size, board_size).astype(bool)
+
+def shift_cells(cells: np.ndarray, row_step: int, col_step: int) -> np.ndarray:
+    """Return cells moved one step in a direction, with cells moved off the board dropped."""
+    board_size = cells.shape[1]
+    shifted = np.zeros_like(cells)
+
+    shifted[
+        :,
+        max(row_step, 0):board_size + min(row_step, 0),
+        max(col_step, 0):board_size + min(col_step, 0)
+    ] = cells[
+        :,
+        max(-row_step, 0):board_size + min(-row_step, 0),
+        max(-col_step, 0):board_size + min(-col_step, 0)
+    ]
+
+    return shifted
+
+def count_legal_moves(player: np.ndarray, opponent: np.ndarray) -> np.ndarray:
+    """Return the number of legal moves for the player in each position."""
+    board_size = player.shape[1]
+    empty = ~(player | opponent)
+    moves = np.zeros_like(player)
+
+    # A move is legal if it is empty and flanks a line of opponent cells ending in a player cell
+    for row_step, col_step in DIRECTIONS.values():
+        flanked = shift_cells(player, row_step, col_step) & opponent
+
+        for _ in range(board_size - 3):
+            flanked |= shift_cells(flanked, row_step, col_step) & opponent
+
+        moves |= shift_cells(flanked, row_step, col_step) & empty
+
+    return moves.sum(axis=(1, 2))
+
+def get_mobility_feature(moves: np.ndarray, opponent_moves: np.ndarray) -> np.ndarray:
+    """Return the score_board mobility term for each position."""
+    return np.where(
+        moves == 0,
+        np.where(opponent_moves == 0, -5, -10),
+        np.where(opponent_moves == 0, 15, np.maximum(moves - opponent_moves, 10))
+    )
+
+def get_features(records: np.ndarray, board_size: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return the feature vectors and results of a chunk of dataset records.
+
+    score_board scores a position for either colour, whoever is to move, so each record gives
+    one sample for each colour. Results are 1 for a win, 0.5 for a draw and 0 for a loss.
+    """
+    dark = unpack_cells(records["dark"], board_size)
+    light = unpack_cells(records["light"], board_size)
+    dark_moves = count_legal_moves(dark, light)
+    light_moves = count_legal_moves(light, dark)
+    position_type_matrix = get_position_type_matrix(board_size)
+
+    # Labels are for the side to move, so are turned round to be for Dark
+    dark_label = np.where(records["side"] == 0, records["label"], -records["label"])
+    dark_result = (np.sign(dark_label) + 1) / 2
+
+    features = np.concatenate([
+        np.column_stack([
+            dark.reshape(len(records), -1) @ position_type_matrix,
+            get_mobility_feature(dark_moves, light_moves)
+        ]),
+        np.column_stack([
+            light.reshape(len(records), -1) @ position_type_matrix,
+            get_mobility_feature(light_moves, dark_moves)
+        ])
+    ])
+
+    return features, np.concatenate([dark_result, 1 - dark_result])
+
+def load_features(
+    directory: str,
+    max_positions: int | None = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the feature vectors and results of every position in a self-play dataset."""
+    board_size = read_manifest(directory)["board_size"]
+    feature_chunks = []
+    result_chunks = []
+    positions = 0
+
+    for records in iterate_chunks(directory):
+        if max_positions is not None:
+            records = records[:max_positions - positions]
+
+        features, results = get_features(records, board_size)
+        feature_chunks.append(features)
+        result_chunks.append(results)
+        positions += len(records)
+
+        if max_positions is not None and positions >= max_positions:
+            break
+
+    if positions == 0:
+        raise ValueError("Dataset has no positions.")
+
+    return np.concatenate(feature_chunks), np.concatenate(result_chunks)
+
+def get_win_probabilities(features: np.ndarray, coefficients: np.ndarray) -> np.ndarray:
+    """Return the logistic win probability predicted for each sample."""
+    # tanh does not overflow for large scores, unlike exp
+    return 0.5 * (1 + np.tanh(features @ coefficients / 2))
+
+def get_loss(features: np.ndarray, results: np.ndarray, coefficients: np.ndarray) -> float:
+    """Return the mean cross-entropy of the predicted win probabilities."""
+    probabilities = np.clip(get_win_probabilities(features, coefficients), 1e-12, 1 - 1e-12)
+
+    return float(-np.mean(
+        results * np.log(probabilities) + (1 - results) * np.log(1 - probabilities)
+    ))
+
+def fit_logistic(features: np.ndarray, results: np.ndarray) -> np.ndarray:
+    """Return the logistic regression coefficients best predicting results, by Newton's method."""
+    sample_count, feature_count = features.shape
+    coefficients = np.zeros(feature_count)
+    regularisation = REGULARISATION * np.eye(feature_count)
+
+    for _ in range(MAX_ITERATIONS):
+        probabilities = get_win_probabilities(features, coefficients)
+        gradient = features.T @ (probabilities - results) / sample_count
+        gradient += regularisation @ coefficients
+        curvature = probabilities * (1 - probabilities)
+        hessian = (features * curvature[:, None]).T @ features / sample_count + regularisation
+
+        step = np.linalg.solve(hessian, gradient)
+        coefficients -= step
+
+        if np.abs(step).max() < CONVERGENCE_TOLERANCE:
+            break
+
+    return coefficients
+
+def tune_weights(
+    features: np.ndarray,
+    results: np.ndarray,
+    default_weights: EvaluationWeights | None = None
+) -> TuningResult:
+    """Fit the score_board weights that best predict game results.
+
+    As in Texel tuning, the scale mapping scores to win probabilities is fitted to the default
+    weights first, so the tuned weights stay in the same units and round to integers.
+    """
+    default_weights = default_weights if default_weights is not None else EvaluationWeights()
+    default_coefficients = np.array(dataclasses.astuple(default_weights), dtype=float)
+
+    scale = fit_logistic((features @ default_coefficients)[:, None], results)[0]
+
+    if scale <= 0:
+        raise ValueError("Default weights do not predict results, so cannot set the score scale.")
+
+    tuned_coefficients = np.rint(fit_logistic(features, results) / scale)
+
+    return TuningResult(
+        weights=EvaluationWeights(*(int(weight) for weight in tuned_coefficients)),
+        scale=float(scale),
+        default_loss=get_loss(features, results, default_coefficients * scale),
+        tuned_loss=get_loss(features, results, tuned_coefficients * scale),
+        positions=len(results) // 2
+    )
+
+def write_weights(weights: EvaluationWeights, path: str) -> None:
+    """Write weights to a JSON file that can be loaded through OTHELLO_WEIGHTS."""
+    with open(path, "w") as weights_file:
+        json.dump(dataclasses.asdict(weights), weights_file, indent=4)
+        weights_file.write("\n")
+
+def main(argv: list[str] | None = None) -> None:
+    """Tune the evaluation weights on a self-play dataset from the command line."""
+    parser = argparse.ArgumentParser(
+        prog="othello-tune",
+        description=(
+            "Fit the score_board weights to the results of the positions in an othello-selfplay "
+            "dataset, and write them to a weights file."
+        )
+    )
+    parser.add_argument("directory", help="Dataset directory.")
+    parser.add_argument("--output", "-o", default="weights.json", help="Weights file to write.")
+    parser.add_argument(
+        "--max-positions", type=int, default=None, help="Only use the first positions."
+    )
+    args = parser.parse_args(argv)
+
+    features, results = load_features(directory=args.directory, max_positions=args.max_positions)
+    tuning_result = tune_weights(features=features, results=results)
+
+    write_weights(weights=tuning_result.weights, path=args.output)
+
+    print(
+        f"{tuning_result.positions} positions, loss {tuning_result.default_loss:.4f} with the "
+        f"default weights and {tuning_result.tuned_loss:.4f} when tuned",
+        file=sys.stderr
+    )
+    for name in FEATURE_NAMES:
+        print(f"{name:>15} {getattr(tuning_result.weights, name):>5}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,220 @@
-from testing_utils import ai_game_loop
+import time
 
-# Test that the AI will outperform a random opponent at a statistically significant level
+import pytest
+
+from othello.ai import (
+    AnalysisCache, EvaluationWeights, ProbCutLine, SelectiveSearchOptions, analyze_moves,
+    get_ai_move, get_transposition_table, iterate_potential_board_states, iterate_successors,
+    load_evaluation_weights, load_probcut_lines, score_board, search_move, set_evaluation_weights,
+    transposition_table
+)
+from othello.bitboard import (
+    get_board_masks, get_legal_moves_bits, get_player_bitboards, make_move_bits, move_to_bit
+)
+from othello.components import get_legal_moves, initialise_board, make_move
+from othello.match import EngineConfig, parse_engine, run_match
+from othello.probcut import write_probcut_lines
+from testing_utils import get_midgame_board
+
+# Test that the AI outperforms a random opponent, decided by an SPRT over seeded openings
 def test_ai_outperforms_random_moves():
-    ai_win_rate = 0
-    games = 75
+    match_result = run_match(
+        engine=EngineConfig(name="ai"), opponent=parse_engine("random"), elo0=0, elo1=150
+    )
+
+    assert match_result.decision == "H1"
+    assert match_result.wins > match_result.losses
+
+# Test that a deadline-limited search returns a legal move close to the deadline
+@pytest.mark.parametrize("deadline_ms", [20, 100])
+def test_search_respects_deadline(deadline_ms: int):
+    board, colour = get_midgame_board()
+
+    start_time = time.perf_counter()
+    search_result = search_move(board=board, colour=colour, deadline_ms=deadline_ms)
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+
+    assert search_result.move in get_legal_moves(board=board, colour=colour)
+    assert search_result.depth >= 1
+    # Allow some slack for slow machines
+    assert elapsed_ms < deadline_ms + 50
+
+def test_deeper_search_returns_legal_move():
+    board, colour = get_midgame_board()
+
+    assert get_ai_move(board=board, colour=colour, max_depth=3) in get_legal_moves(board, colour)
+
+def test_no_legal_moves_returns_none():
+    board = initialise_board()
+    board[3][4] = "Light"
+    board[4][3] = "Light"
+
+    assert get_ai_move(board=board, colour="Dark", deadline_ms=50) is None
+
+def test_search_reports_each_completed_depth():
+    board, colour = get_midgame_board()
+    iterations = []
+
+    search_result = search_move(
+        board=board, colour=colour, max_depth=3, on_iteration=iterations.append
+    )
+
+    assert [iteration.depth for iteration in iterations] == [1, 2, 3]
+    assert iterations[-1].move == search_result.move
+
+# Test that an analysis interrupted by its deadline only reports one completed depth
+@pytest.mark.parametrize("deadline_ms", [1, 5, 20, 50])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_timed_analysis_reports_a_single_depth(deadline_ms: int, seed: int):
+    board, colour = get_midgame_board(seed=seed)
+
+    search_results = analyze_moves(board=board, colour=colour, deadline_ms=deadline_ms)
+
+    assert len(search_results) == len(get_legal_moves(board=board, colour=colour))
+    assert len({search_result.depth for search_result in search_results}) == 1
+
+def test_analysis_cache_reuses_symmetric_positions():
+    board, colour = get_midgame_board()
+    cache = AnalysisCache()
+    search_results = analyze_moves(board=board, colour=colour, max_depth=2)
+
+    cache.put(board, colour, 2, None, search_results)
+
+    # The board mirrored left to right has the same analysis, with mirrored moves
+    mirrored_board = [list(reversed(row)) for row in board]
+    mirrored_results = cache.get(mirrored_board, colour, 2, None)
+
+    assert [(result.move[0], 7 - result.move[1]) for result in mirrored_results] == [
+        result.move for result in search_results
+    ]
+    assert [result.score for result in mirrored_results] == [
+        result.score for result in search_results
+    ]
+
+def test_evaluation_weights_are_loaded_from_file(tmp_path):
+    weights_path = tmp_path / "weights.json"
+    weights_path.write_text('{"corner": 100, "mobility": 0}')
+    weights = load_evaluation_weights(str(weights_path))
+
+    assert weights == EvaluationWeights(corner=100, mobility=0)
+
+    board = initialise_board(8)
+    board[0][0] = "Dark"
+    default_score = score_board(board, "Dark")
+
+    set_evaluation_weights(weights)
+    try:
+        assert score_board(board, "Dark") == 100
+    finally:
+        set_evaluation_weights(EvaluationWeights())
+
+    assert score_board(board, "Dark") == default_score
+
+    weights_path.write_text('{"corners": 100}')
+    with pytest.raises(ValueError, match="Unknown weight"):
+        load_evaluation_weights(str(weights_path))
+
+def search_with_options(options, board, colour, max_depth):
+    """Search a position from a cold start with selective search options."""
+    get_transposition_table(options).clear()
+
+    return search_move(board=board, colour=colour, max_depth=max_depth, options=options)
+
+def test_stability_cutoffs_keep_exact_endgame_scores():
+    board, colour = get_midgame_board(moves=54, seed=3)
+
+    exact_result = search_with_options(SelectiveSearchOptions(), board, colour, max_depth=20)
+    stability_result = search_with_options(
+        SelectiveSearchOptions(stability_cutoffs=True), board, colour, max_depth=20
+    )
+
+    assert abs(exact_result.score) > 10_000
+    assert stability_result.score == exact_result.score
+    assert stability_result.nodes <= exact_result.nodes
+
+def test_probcut_prunes_search():
+    board, colour = get_midgame_board()
+
+    full_result = search_with_options(SelectiveSearchOptions(), board, colour, max_depth=5)
+    probcut_result = search_with_options(
+        SelectiveSearchOptions(probcut=True), board, colour, max_depth=5
+    )
+
+    assert probcut_result.move in get_legal_moves(board=board, colour=colour)
+    assert probcut_result.nodes < full_result.nodes
+
+def test_selective_search_scores_are_not_reused_by_exact_searches():
+    board, colour = get_midgame_board()
+    transposition_table.clear()
+
+    search_with_options(
+        SelectiveSearchOptions(probcut=True, stability_cutoffs=True), board, colour, max_depth=5
+    )
+
+    assert len(transposition_table.entries) == 0
+    assert get_transposition_table(SelectiveSearchOptions()) is transposition_table
+
+def test_probcut_lines_are_loaded_from_file(tmp_path):
+    lines_path = tmp_path / "probcut.json"
+    probcut_lines = {(8, 4, 2, True): ProbCutLine(slope=1.0, intercept=2.0, sigma=3.0)}
+    write_probcut_lines(probcut_lines, str(lines_path))
+
+    assert load_probcut_lines(str(lines_path)) == probcut_lines
+
+    write_probcut_lines(
+        {(8, 4, 2, True): ProbCutLine(slope=-1.0, intercept=2.0, sigma=3.0)}, str(lines_path)
+    )
+    with pytest.raises(ValueError, match="positive slope"):
+        load_probcut_lines(str(lines_path))
+
+@pytest.mark.parametrize("order_by_mobility", [True, False])
+def test_successors_are_ordered_and_complete(order_by_mobility: bool):
+    board, colour = get_midgame_board(moves=30, seed=4)
+    player, opponent = get_player_bitboards(board=board, colour=colour)
+    masks = get_board_masks(8)
+    legal_moves = get_legal_moves(board=board, colour=colour)
+    hash_move_bit = move_to_bit(legal_moves[-1], 8)
+
+    successors = list(iterate_successors(
+        player, opponent, masks, hash_move_bit=hash_move_bit, order_by_mobility=order_by_mobility
+    ))
+    move_bits = [move_bit for move_bit, _ in successors]
+
+    assert sorted(move_bits) == sorted(move_to_bit(move, 8) for move in legal_moves)
+    assert move_bits[0] == hash_move_bit
+
+    for move_bit, flips in successors:
+        assert (player | move_bit | flips, opponent & ~flips) == make_move_bits(
+            player, opponent, move_bit, masks
+        )
+
+    # After the hash move come corners, then the other moves, then cells next to corners
+    def get_group(move_bit):
+        if move_bit & masks.position_types["corner"]:
+            return 0
+        if move_bit & masks.position_types["corner_adj"]:
+            return 2
+        return 1
+
+    groups = [get_group(move_bit) for move_bit in move_bits[1:]]
+    assert groups == sorted(groups)
+
+    if order_by_mobility:
+        mobilities = [
+            get_legal_moves_bits(opponent & ~flips, player | move_bit | flips, masks).bit_count()
+            for move_bit, flips in successors[1:] if get_group(move_bit) == 1
+        ]
+        assert mobilities == sorted(mobilities)
+
+def test_potential_board_states_are_built_lazily():
+    board, colour = get_midgame_board(moves=30, seed=4)
+    potential_board_states = iterate_potential_board_states(board=board, colour=colour)
+    move, potential_board_state = next(potential_board_states)
 
-    for _ in range(games):
-        if ai_game_loop(random_moves=True) == "Light":
-            ai_win_rate += 1
+    expected_board = [row[:] for row in board]
+    make_move(board=expected_board, move=move, colour=colour)
 
-    ai_win_percentage = (ai_win_rate / games)
-    assert ai_win_percentage >= 0.7
+    assert potential_board_state == expected_board
+    assert {move for move, _ in potential_board_states} | {move} == set(
+        get_legal_moves(board=board, colour=colour)
+    )
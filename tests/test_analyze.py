@@ -0,0 +1,47 @@
+import io
+import json
+
+import pytest
+
+from othello.analyze import analyze_lines, parse_position_line, write_analysis
+from othello.components import initialise_board
+
+STARTING_COMPACT_POSITION = "-" * 27 + "OX------XO" + "-" * 27 + " X"
+
+def test_compact_position_matches_starting_board():
+    board, colour, depth, time_ms = parse_position_line(
+        STARTING_COMPACT_POSITION, default_depth=2, default_time_ms=None
+    )
+
+    assert board == initialise_board()
+    assert colour == "Dark"
+    assert (depth, time_ms) == (2, None)
+
+def test_json_position_overrides_limits():
+    line = json.dumps({
+        "board": initialise_board(6), "current_player_colour": "Light", "depth": 3
+    })
+
+    board, colour, depth, time_ms = parse_position_line(
+        line, default_depth=1, default_time_ms=100
+    )
+
+    assert board == initialise_board(6)
+    assert colour == "Light"
+    assert (depth, time_ms) == (3, 100)
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_analysis_is_streamed_in_input_order(workers: int):
+    lines = [STARTING_COMPACT_POSITION, "", "not a position", STARTING_COMPACT_POSITION] * 3
+
+    output = io.StringIO()
+    write_analysis(
+        analyze_lines(lines, default_depth=2, default_time_ms=None, workers=workers), output
+    )
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+
+    assert [result["line"] for result in results] == [1, 3, 4, 5, 7, 8, 9, 11, 12]
+    assert "error" in results[1]
+    assert results[0]["best_move"] in [[2, 3], [3, 2], [4, 5], [5, 4]]
+    assert results[0]["depth"] == 2
+    assert results[0]["principal_variation"][0] == results[0]["best_move"]
@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+from othello.ai import score_board, score_bitboards
+from othello.bitboard import (
+    get_board_masks, get_player_bitboards, get_legal_moves_bits, make_move_bits,
+    iterate_bits, bit_to_move, move_to_bit, bitboards_to_board, get_stable_discs
+)
+from othello.components import initialise_board, get_legal_moves, make_move, invert_player_colour
+from testing_utils import get_board_with_assignments
+
+# Test that the bitboard engine matches the list-based components over random games
+@pytest.mark.parametrize("board_size", [4, 6, 8, 10, 12, 16])
+def test_bitboards_match_components(board_size: int):
+    rng = random.Random(board_size)
+    masks = get_board_masks(board_size)
+
+    for _ in range(5):
+        board = initialise_board(board_size)
+        colour = "Dark"
+
+        for _ in range(board_size * board_size):
+            player, opponent = get_player_bitboards(board=board, colour=colour)
+            legal_moves = get_legal_moves(board=board, colour=colour)
+            legal_move_bits = iterate_bits(get_legal_moves_bits(player, opponent, masks))
+
+            assert [bit_to_move(bit, board_size) for bit in legal_move_bits] == legal_moves
+            assert score_bitboards(player, opponent, masks) == score_board(board, colour)
+
+            if len(legal_moves) > 0:
+                move = rng.choice(legal_moves)
+                make_move(board=board, move=move, colour=colour)
+
+                player, opponent = make_move_bits(
+                    player, opponent, move_to_bit(move, board_size), masks
+                )
+                dark, light = (player, opponent) if colour == "Dark" else (opponent, player)
+
+                assert bitboards_to_board(dark, light, board_size) == board
+
+            colour = invert_player_colour(colour)
+
+@pytest.mark.parametrize("board_size", [2, 7, 18])
+def test_unsupported_board_size_error(board_size: int):
+    with pytest.raises(ValueError, match="Bitboard size must be even"):
+        get_board_masks(board_size)
+
+def test_stable_discs_on_corners_and_filled_edges():
+    # Dark runs along the top edge from a corner, then Light breaks the run.
+    # The left edge is filled with alternating colours, so every disc on it is stable
+    board = get_board_with_assignments(
+        [(0, 0, "Dark"), (0, 1, "Dark"), (0, 2, "Dark"), (0, 3, "Light"), (7, 7, "Light")]
+        + [(row, 0, "Dark" if row % 2 == 0 else "Light") for row in range(1, 8)]
+    )
+    dark, light = get_player_bitboards(board=board, colour="Dark")
+    masks = get_board_masks(8)
+
+    assert get_stable_discs(dark, light, masks) == sum(
+        move_to_bit(move, 8) for move in [(0, 0), (0, 1), (0, 2), (2, 0), (4, 0), (6, 0)]
+    )
+    assert get_stable_discs(light, dark, masks) == sum(
+        move_to_bit(move, 8) for move in [(7, 7), (1, 0), (3, 0), (5, 0), (7, 0)]
+    )
@@ -0,0 +1,50 @@
+import json
+
+from othello.events import CLOSED_EVENT, EventBroker, format_server_sent_event
+
+def test_publish_reaches_only_the_games_subscribers():
+    broker = EventBroker()
+    subscription = broker.subscribe("game")
+    other_subscription = broker.subscribe("other game")
+
+    broker.publish("game", "move", {"move": (2, 3)})
+
+    assert subscription.get(timeout=0) == ("move", {"move": (2, 3)})
+    assert other_subscription.get(timeout=0) is None
+
+def test_unsubscribe_stops_events():
+    broker = EventBroker()
+    subscription = broker.subscribe("game")
+
+    broker.unsubscribe(subscription)
+    broker.publish("game", "move", {})
+
+    assert subscription.closed
+    assert subscription.get(timeout=0) is None
+    assert "game" not in broker.subscriptions
+
+def test_slow_subscriber_is_disconnected():
+    broker = EventBroker()
+    subscription = broker.subscribe("game")
+
+    for _ in range(subscription.events.maxsize + 1):
+        broker.publish("game", "move", {})
+
+    assert subscription.closed
+    assert "game" not in broker.subscriptions
+
+def test_close_game_sends_closed_event():
+    broker = EventBroker()
+    subscription = broker.subscribe("game")
+
+    broker.close_game("game")
+
+    assert subscription.closed
+    assert subscription.get(timeout=0) == (CLOSED_EVENT, {})
+
+def test_format_server_sent_event():
+    event = format_server_sent_event("pass", {"colour": "Dark"})
+
+    assert event.startswith("event: pass\ndata: ")
+    assert event.endswith("\n\n")
+    assert json.loads(event.split("data: ")[1]) == {"colour": "Dark"}
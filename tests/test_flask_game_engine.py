@@ -1,9 +1,21 @@
+import io
+import json
+import time
+
 import pytest
 
-from othello.components import initialise_board
-from othello.flask_game_engine import GameState
+from othello.ai import SelectiveSearchOptions, get_transposition_table, transposition_table
+from othello.components import initialise_board, get_legal_moves, get_max_moves, make_move
+from othello.flask_game_engine import (
+    GameState, app, add_game, games, get_game, get_ponderer, get_secret
+)
 from othello.game_engine import BOARD_SIZE, MAX_MOVES, STARTING_PLAYER
-from testing_utils import get_board_with_assignments
+from testing_utils import get_board_with_assignments, get_random_game_moves
+
+# Store games in a temporary database rather than the working directory
+@pytest.fixture(autouse=True, scope="module")
+def game_store_path(tmp_path_factory):
+    app.config["GAME_STORE_PATH"] = str(tmp_path_factory.mktemp("store") / "games.sqlite3")
 
 @pytest.mark.parametrize("game_mode", ["pvp", "ai"])
 def test_game_state_initialises_defaults(game_mode: str):
@@ -15,6 +27,12 @@ def test_game_state_initialises_defaults(game_mode: str):
     assert game_state.game_finished is False
     assert game_state.game_mode == game_mode
 
+def test_game_state_board_size():
+    game_state = GameState("ai", board_size=12)
+
+    assert game_state.board == initialise_board(12)
+    assert game_state.moves_left == 140
+
 def test_update_overrides_state_values():
     game_state = GameState("pvp")
     updated_board = get_board_with_assignments(
@@ -34,9 +52,28 @@ def test_update_overrides_state_values():
     assert game_state.current_player_colour == "Light"
     assert game_state.moves_left == 12
     assert game_state.game_finished is True
-    assert game_state.board is updated_board
+    assert game_state.board == updated_board
     assert game_state.game_mode == "ai"
 
+def test_update_rejects_unknown_fields_without_changes():
+    game_state = GameState("pvp")
+
+    with pytest.raises(ValueError, match="move_history"):
+        game_state.update({"moves_left": 12, "move_history": []})
+
+    assert game_state.moves_left == MAX_MOVES
+
+def test_upload_rejects_invalid_game_state():
+    client = app.test_client()
+
+    game_id = client.get("/newgame?game_mode=pvp").get_json()["game_id"]
+    game_file = (io.BytesIO(json.dumps({"moves_left": 12, "score": 3}).encode()), "game.json")
+    response = client.post("/upload", data={"game_id": game_id, "game_file": game_file})
+
+    assert response.status_code == 400
+    assert response.get_json()["status"] == "fail"
+    assert get_game(game_id)[1].moves_left == MAX_MOVES
+
 def test_create_response_includes_current_state():
     game_state = GameState("ai")
     game_state.board = get_board_with_assignments([(3, 3, "Dark")], board_size=BOARD_SIZE)
@@ -55,3 +92,313 @@ def test_create_response_includes_current_state():
         "moves_left": 3,
         "game_mode": "ai",
     }
+
+# Test that the move log undoes and redoes every move and pass of a game in place
+def test_game_state_move_log_round_trips():
+    game_state = GameState("pvp", board_size=6)
+    board = initialise_board(6)
+    boards = [game_state.board]
+
+    for colour, move in get_random_game_moves(moves=40, board_size=6, seed=3):
+        if move is None:
+            game_state.record_pass(colour)
+        else:
+            flipped = game_state.play_move(move=move, colour=colour)
+            make_move(board=board, move=move, colour=colour)
+
+            assert len(flipped) > 0
+
+        assert game_state.board == board
+        boards.append(game_state.board)
+
+    played_moves_left = game_state.moves_left
+
+    while game_state.undo() > 0:
+        assert game_state.board in boards
+
+    assert game_state.board == initialise_board(6)
+    assert game_state.moves_left == get_max_moves(6)
+    assert game_state.current_player_colour == STARTING_PLAYER
+
+    while game_state.redo() > 0:
+        pass
+
+    assert game_state.board == boards[-1]
+    assert game_state.moves_left == played_moves_left
+
+    with pytest.raises(ValueError, match="not legal"):
+        game_state.play_move(move=(0, 6), colour="Dark")
+
+def test_undo_and_redo_routes():
+    client = app.test_client()
+
+    game_id = client.get("/newgame?game_mode=ai").get_json()["game_id"]
+    start = client.get(f"/undo?game_id={game_id}").get_json()
+
+    assert start["status"] == "fail"
+
+    played = client.get(f"/move?x=4&y=3&game_id={game_id}").get_json()
+    undone = client.get(f"/undo?game_id={game_id}").get_json()
+
+    # The AI's reply is undone along with the human's move
+    assert undone["board"] == initialise_board(BOARD_SIZE)
+    assert undone["player"] == STARTING_PLAYER
+    assert undone["moves_left"] == MAX_MOVES
+    assert client.get(f"/games/{game_id}").get_json()["moves"] == []
+
+    redone = client.get(f"/redo?game_id={game_id}").get_json()
+
+    assert redone["board"] == played["board"]
+    assert redone["player"] == played["player"]
+    assert len(client.get(f"/games/{game_id}").get_json()["moves"]) == 2
+
+    # A new move clears the moves that could be redone
+    client.get(f"/undo?game_id={game_id}")
+    client.get(f"/move?x=3&y=4&game_id={game_id}")
+
+    assert client.get(f"/redo?game_id={game_id}").get_json()["status"] == "fail"
+
+def test_add_game_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setitem(app.config, "MAX_GAMES", 2)
+
+    first_game_id = add_game(GameState("pvp"))
+    second_game_id = add_game(GameState("pvp"))
+
+    # Using the first game makes the second the least recently used
+    assert get_game(first_game_id) is not None
+
+    third_game_id = add_game(GameState("pvp"))
+
+    assert get_game(second_game_id) is None
+    assert get_game(first_game_id) is not None
+    assert get_game(third_game_id) is not None
+    assert get_game(None) is None
+
+def test_clients_cannot_replace_each_others_games():
+    first_client = app.test_client()
+    second_client = app.test_client()
+    third_client = app.test_client()
+
+    game_id = first_client.get("/newgame?game_mode=pvp").get_json()["game_id"]
+
+    # Another client loading the page, or sending the game's ID, leaves the game alone
+    second_client.get("/")
+    second_client.get(f"/newgame?game_mode=pvp&game_id={game_id}")
+
+    assert first_client.get(f"/move?x=4&y=3&game_id={game_id}").get_json()["status"] == "success"
+
+    # Other clients cannot change the game with its ID, and without one they use their own game
+    assert second_client.get(f"/undo?game_id={game_id}").get_json()["status"] == "fail"
+    assert second_client.get(f"/move?x=3&y=3&game_id={game_id}").get_json()["status"] == "fail"
+    assert second_client.get("/move?x=4&y=3").get_json()["game_id"] != game_id
+    assert third_client.get("/move?x=4&y=3").get_json()["status"] == "fail"
+    assert third_client.get("/undo").get_json()["status"] == "fail"
+    assert games[game_id].moves_left == MAX_MOVES - 1
+
+    # The client that started the game can replace it
+    first_client.get(f"/newgame?game_mode=pvp&game_id={game_id}")
+
+    assert game_id not in games
+
+def test_ai_move_uses_pondered_reply(monkeypatch, caplog):
+    monkeypatch.setitem(app.config, "AI_DEADLINE_MS", 20)
+    monkeypatch.setitem(app.config, "PONDER_DEADLINE_MS", 20)
+    client = app.test_client()
+
+    game_id = client.get("/newgame?game_mode=ai").get_json()["game_id"]
+    response = client.get(f"/move?x=4&y=3&game_id={game_id}").get_json()
+
+    assert response["status"] == "success"
+    assert response["player"] == STARTING_PLAYER
+    assert "ai_depth" in response
+
+    # Wait for pondering to finish, then reply
+    ponder_session = get_ponderer().sessions[game_id]
+    time.sleep(0.5)
+    assert len(ponder_session.results) > 0
+
+    row, col = get_legal_moves(board=response["board"], colour=STARTING_PLAYER)[0]
+    response = client.get(f"/move?x={col + 1}&y={row + 1}&game_id={game_id}").get_json()
+
+    assert response["status"] == "success"
+    assert "Using pondered AI move." in caplog.text
+
+def test_ai_moves_use_configured_selective_search(monkeypatch):
+    monkeypatch.setitem(app.config, "PROBCUT_ENABLED", True)
+    monkeypatch.setitem(app.config, "STABILITY_CUTOFFS_ENABLED", True)
+    monkeypatch.setitem(app.config, "PONDER_ENABLED", False)
+    monkeypatch.setitem(app.config, "AI_DEADLINE_MS", 20)
+    client = app.test_client()
+    selective_table = get_transposition_table(
+        SelectiveSearchOptions(probcut=True, stability_cutoffs=True)
+    )
+    selective_table.clear()
+
+    game_id = client.get("/newgame?game_mode=ai").get_json()["game_id"]
+    response = client.get(f"/move?x=4&y=3&game_id={game_id}").get_json()
+
+    # The AI's search stores its scores in the selective search table, not the exact one
+    assert response["ai_depth"] > 0
+    assert len(selective_table.entries) > 0
+    assert selective_table is not transposition_table
+
+def test_metrics_endpoint_reports_move_latency():
+    client = app.test_client()
+
+    client.get("/newgame?game_mode=pvp")
+    client.get("/move?x=4&y=3")
+    response = client.get("/metrics")
+
+    assert response.mimetype == "text/plain"
+    assert "# TYPE othello_move_request_seconds histogram" in response.text
+    assert "othello_move_request_seconds_count 0" not in response.text
+
+def test_profiles_are_saved_and_old_ones_removed(monkeypatch, tmp_path):
+    monkeypatch.setitem(app.config, "PROFILING_ENABLED", True)
+    monkeypatch.setitem(app.config, "PROFILE_DIRECTORY", str(tmp_path))
+    monkeypatch.setitem(app.config, "PROFILE_FILES_KEPT", 2)
+    client = app.test_client()
+
+    profile_paths = [
+        client.get("/metrics", headers={"X-Profile": "1"}).headers["X-Profile-File"]
+        for _ in range(3)
+    ]
+
+    assert all(path.startswith(str(tmp_path)) for path in profile_paths)
+    assert len(list(tmp_path.glob("*.prof"))) == 2
+
+def test_events_stream_moves_and_closes_with_game():
+    client = app.test_client()
+
+    game_id = client.get("/newgame?game_mode=pvp").get_json()["game_id"]
+    stream = client.get(f"/events?game_id={game_id}", buffered=False)
+    events = (event.decode() for event in stream.response)
+
+    assert stream.mimetype == "text/event-stream"
+    assert next(events).startswith("event: state\n")
+
+    client.get(f"/move?x=4&y=3&game_id={game_id}")
+    move_event = next(events)
+
+    assert move_event.startswith("event: move\n")
+    assert json.loads(move_event.split("data: ")[1]) == {
+        "colour": "Dark",
+        "move": [2, 3],
+        "flipped": [[3, 3]],
+        "player": "Light",
+        "moves_left": MAX_MOVES - 1
+    }
+
+    # Replacing the game closes its stream
+    client.get(f"/newgame?game_mode=pvp&game_id={game_id}")
+
+    assert next(events).startswith("event: closed\n")
+    stream.close()
+
+def test_game_is_resumed_from_store():
+    client = app.test_client()
+
+    game_id = client.get("/newgame?game_mode=pvp").get_json()["game_id"]
+    board = client.get(f"/move?x=4&y=3&game_id={game_id}").get_json()["board"]
+
+    # Simulate a restart by dropping the game from memory
+    del games[game_id]
+
+    response = client.get(f"/move?x=3&y=3&game_id={game_id}").get_json()
+
+    assert response["status"] == "success"
+    assert response["game_id"] == game_id
+    assert response["board"] != board
+
+    history = client.get(f"/games/{game_id}").get_json()
+
+    assert [move["move"] for move in history["moves"]] == [[2, 3], [2, 2]]
+    assert history["game"]["current_player_colour"] == "Dark"
+
+    stats = client.get("/stats").get_json()
+
+    assert stats["games"] >= 1
+    assert game_id in [game["game_id"] for game in client.get("/games").get_json()["games"]]
+
+def test_stateless_game_round_trips_token():
+    client = app.test_client()
+    game_count = len(games)
+
+    response = client.get("/newgame?game_mode=ai&stateless=true").get_json()
+
+    assert "game_id" not in response
+    assert len(games) == game_count
+
+    response = client.get(f"/move?x=4&y=3&token={response['token']}").get_json()
+
+    assert response["status"] == "success"
+    assert response["player"] == STARTING_PLAYER
+    assert response["moves_left"] == MAX_MOVES - 2
+    assert len(games) == game_count
+
+    # A tampered token is rejected
+    response = client.get(f"/move?x=4&y=3&token={response['token'][:-2]}AA").get_json()
+
+    assert response["status"] == "fail"
+
+def test_session_and_token_secrets_differ():
+    assert app.config["SECRET_KEY"] != app.config["GAME_TOKEN_SECRET"]
+
+def test_generated_secrets_log_a_warning(monkeypatch, caplog):
+    monkeypatch.setenv("OTHELLO_TOKEN_SECRET", "configured")
+
+    assert get_secret("OTHELLO_TOKEN_SECRET") == b"configured"
+    assert "OTHELLO_TOKEN_SECRET is not set" not in caplog.text
+
+    monkeypatch.delenv("OTHELLO_TOKEN_SECRET")
+
+    assert len(get_secret("OTHELLO_TOKEN_SECRET")) == 32
+    assert "OTHELLO_TOKEN_SECRET is not set" in caplog.text
+
+def test_analyze_scores_every_move_and_caches_position():
+    client = app.test_client()
+
+    game_id = client.get("/newgame?game_mode=pvp").get_json()["game_id"]
+    response = client.get(f"/analyze?game_id={game_id}&depth=2").get_json()
+
+    assert response["status"] == "success"
+    assert response["cached"] is False
+    assert sorted(tuple(move["move"]) for move in response["moves"]) == sorted(
+        get_legal_moves(board=initialise_board(BOARD_SIZE), colour=STARTING_PLAYER)
+    )
+
+    scores = [move["score"] for move in response["moves"]]
+    assert scores == sorted(scores, reverse=True)
+    assert response["score"] == scores[0]
+    assert response["principal_variation"][0] == response["moves"][0]["move"]
+
+    repeated_response = client.get(f"/analyze?game_id={game_id}&depth=2").get_json()
+
+    assert repeated_response["cached"] is True
+    assert repeated_response["moves"] == response["moves"]
+
+def test_analyze_rejects_invalid_limits():
+    client = app.test_client()
+
+    game_id = client.get("/newgame?game_mode=pvp").get_json()["game_id"]
+    response = client.get(f"/analyze?game_id={game_id}&depth=0").get_json()
+
+    assert response["status"] == "fail"
+
+def test_review_streams_every_move(monkeypatch):
+    monkeypatch.setitem(app.config, "REVIEW_TIME_MS", 50)
+    client = app.test_client()
+
+    game_id = client.get("/newgame?game_mode=pvp").get_json()["game_id"]
+    client.get(f"/move?x=4&y=3&game_id={game_id}")
+    client.get(f"/move?x=3&y=3&game_id={game_id}")
+
+    response = client.get(f"/review?game_id={game_id}&depth=2")
+    reviews = [json.loads(line) for line in response.text.splitlines()]
+
+    assert response.mimetype == "application/x-ndjson"
+    assert sorted(review["ply"] for review in reviews) == [1, 2]
+
+    response = client.post("/review", json={"moves": [{"colour": "Dark", "move": [0, 0]}]})
+
+    assert response.get_json()["status"] == "fail"
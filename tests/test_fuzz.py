@@ -0,0 +1,49 @@
+import dataclasses
+
+import pytest
+
+from othello.fuzz import (
+    IMPLEMENTATIONS, REFERENCE_IMPLEMENTATION, find_first_mismatch, replay_moves, run_fuzz
+)
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_bitboards_match_reference(workers: int):
+    cases, failure = run_fuzz(
+        implementation_names=("bitboard",), board_sizes=(2, 4, 6, 8), max_batches=4,
+        batch_games=3, workers=workers
+    )
+
+    assert failure is None
+    assert cases > 0
+
+def test_mismatch_is_shrunk(monkeypatch):
+    bitboard = IMPLEMENTATIONS["bitboard"]
+
+    def get_legal_moves_without_corners(board, colour):
+        last = len(board) - 1
+        corners = {(0, 0), (0, last), (last, 0), (last, last)}
+
+        return [
+            move for move in bitboard.get_legal_moves(board=board, colour=colour)
+            if move not in corners
+        ]
+
+    monkeypatch.setitem(
+        IMPLEMENTATIONS, "broken",
+        dataclasses.replace(bitboard, get_legal_moves=get_legal_moves_without_corners)
+    )
+
+    _, failure = run_fuzz(implementation_names=("broken",), board_sizes=(8,), max_batches=20)
+
+    assert failure is not None
+    assert "get_legal_moves" in failure.message
+
+    # The shrunk sequence is legal, and only its final position has a mismatch
+    implementations = {
+        name: IMPLEMENTATIONS[name] for name in (REFERENCE_IMPLEMENTATION, "broken")
+    }
+    assert replay_moves(failure.moves, board_size=8) is not None
+    assert find_first_mismatch(failure.moves, 8, implementations) == (
+        len(failure.moves), failure.message
+    )
+    assert len(failure.moves) < 20
@@ -1,6 +1,6 @@
 import pytest
 import re
-from othello.game_engine import parse_coords_input
+from othello.game_engine import parse_coords_input, parse_board_size
 
 @pytest.mark.parametrize(("mock_input", "expected"), [("2,1", (1,0)), ("8,8", (7,7))])
 def test_coords_input(mock_input: str, expected: tuple[int]):
@@ -19,3 +19,20 @@ def test_coords_input_error(mock_input: str, expected_error_regex: str):
         match=re.compile(expected_error_regex, re.IGNORECASE)
     ):
         parse_coords_input(mock_input)
+
+def test_coords_input_on_large_board():
+    assert parse_coords_input("10,9", board_size=10) == (9, 8)
+
+    with pytest.raises(ValueError, match="outside the board bounds"):
+        parse_coords_input("10,9")
+
+@pytest.mark.parametrize(
+    ("size_input", "expected"), [("4", 4), ("16", 16), (10, 10)]
+)
+def test_board_size_input(size_input: str | int, expected: int):
+    assert parse_board_size(size_input) == expected
+
+@pytest.mark.parametrize("size_input", ["2", "9", "18", "abc"])
+def test_board_size_input_error(size_input: str):
+    with pytest.raises(ValueError, match="Board size must be"):
+        parse_board_size(size_input)
@@ -0,0 +1,38 @@
+import pytest
+
+from load_test import get_in_process_client, play_games, run_load
+from othello.flask_game_engine import app
+
+@pytest.fixture(autouse=True)
+def game_store_path(monkeypatch, tmp_path):
+    monkeypatch.setitem(app.config, "GAME_STORE_PATH", str(tmp_path / "games.sqlite3"))
+    monkeypatch.setitem(app.config, "AI_DEADLINE_MS", 5)
+    monkeypatch.setitem(app.config, "PONDER_ENABLED", False)
+
+@pytest.mark.parametrize("game_mode", ["pvp", "ai"])
+def test_players_finish_every_game(game_mode: str):
+    stats, elapsed = run_load(
+        create_client=get_in_process_client, game_mode=game_mode, players=2, games=2,
+        board_size=4, seed=0
+    )
+
+    assert stats.games_finished == 4
+    assert sum(stats.errors.values()) == 0
+    assert len(stats.latencies_ms["/newgame"]) == 4
+    assert len(stats.latencies_ms["/move"]) > 0
+    assert elapsed > 0
+
+def test_stuck_game_is_not_counted():
+    # A response for an unfinished game where the player has no legal moves
+    stuck_board = [["Dark"] * 4 for _ in range(4)]
+
+    def get(path, args):
+        return {
+            "status": "success", "game_id": "stuck", "board": stuck_board, "player": "Light",
+            "finished": False
+        }
+
+    stats = play_games(get, game_mode="pvp", board_size=4, games=1, seed=0)
+
+    assert stats.games_finished == 0
+    assert stats.errors["/move"] == 1
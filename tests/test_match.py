@@ -0,0 +1,87 @@
+import math
+
+import pytest
+
+from othello.ai import EvaluationWeights, get_evaluation_weights
+from othello.match import (
+    EngineConfig, create_match_result, elo_to_score, get_llr, get_openings, parse_engine,
+    play_game_pair, run_match, score_to_elo
+)
+from othello.symmetry import canonicalize_board
+
+def test_openings_are_seeded_and_distinct():
+    openings = get_openings(count=30, board_size=8, plies=4, seed=3)
+
+    assert openings == get_openings(count=30, board_size=8, plies=4, seed=3)
+    assert openings != get_openings(count=30, board_size=8, plies=4, seed=4)
+
+    canonical_boards = {
+        (str(canonicalize_board(board)[0]), colour) for board, colour in openings
+    }
+    assert len(canonical_boards) == 30
+
+    # There are only a few distinct openings after one move
+    with pytest.raises(ValueError, match="distinct openings"):
+        get_openings(count=5, board_size=8, plies=1)
+
+def test_engines_are_parsed(tmp_path):
+    assert parse_engine("random").random_moves
+    assert parse_engine("depth=3,time=50") == EngineConfig(
+        name="depth=3,time=50", depth=3, time_ms=50
+    )
+
+    weights_path = tmp_path / "weights.json"
+    weights_path.write_text('{"corner": 50}')
+    assert parse_engine(f"weights={weights_path}").weights == EvaluationWeights(corner=50)
+
+    with pytest.raises(ValueError, match="Unknown engine setting"):
+        parse_engine("depth3")
+
+def test_elo_conversions():
+    assert elo_to_score(0) == 0.5
+    assert score_to_elo(elo_to_score(150)) == pytest.approx(150)
+    assert score_to_elo(1) == math.inf
+
+def test_sprt_decides_on_clear_results():
+    # Won and lost pairs give positive and negative evidence
+    assert get_llr([0, 0, 0, 1, 9], elo0=0, elo1=20) > 0
+    assert get_llr([9, 1, 0, 0, 0], elo0=0, elo1=20) < 0
+    assert get_llr([0, 0, 0, 0, 0], elo0=0, elo1=20) == 0
+
+    winning_result = create_match_result([(2, 2)] * 10, elo0=0, elo1=100, alpha=0.05, beta=0.05)
+    assert winning_result.decision == "H1"
+    assert (winning_result.wins, winning_result.draws, winning_result.losses) == (20, 0, 0)
+
+    even_result = create_match_result(
+        [(2, 2), (0, 0), (2, 0)] * 100, elo0=0, elo1=100, alpha=0.05, beta=0.05
+    )
+    assert even_result.decision == "H0"
+    assert even_result.elo == pytest.approx(0)
+    assert even_result.elo_error > 0
+
+def test_game_pairs_swap_colours():
+    opening = get_openings(count=1, board_size=6, plies=2)[0]
+    engine = EngineConfig(name="depth=2", depth=2)
+
+    # The same deterministic engine on both sides wins one game of the pair for each colour
+    first_points, second_points = play_game_pair(opening, engine, engine, seed=0)
+    assert first_points + second_points == 2
+
+def test_engine_weights_do_not_change_global_weights():
+    opening = get_openings(count=1, board_size=6, plies=2)[0]
+    engine = EngineConfig(name="corners", depth=2, weights=EvaluationWeights(corner=1000))
+    opponent = EngineConfig(name="depth=2", depth=2)
+    original_weights = get_evaluation_weights()
+
+    play_game_pair(opening, engine, opponent, seed=0)
+
+    assert get_evaluation_weights() is original_weights
+
+def test_parallel_match_stops_early():
+    match_result = run_match(
+        engine=EngineConfig(name="ai"), opponent=parse_engine("random"), max_pairs=50,
+        board_size=6, seed=1, workers=2, elo0=0, elo1=150
+    )
+
+    assert match_result.decision == "H1"
+    assert match_result.pairs < 50
@@ -0,0 +1,32 @@
+import pytest
+
+from othello import metrics
+from othello.components import get_legal_moves, initialise_board
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = metrics.Histogram("test_seconds", "Test histogram.", buckets=(0.1, 1.0))
+
+    for value in [0.05, 0.5, 0.7, 5.0]:
+        histogram.observe(value)
+
+    lines = histogram.render()
+
+    assert 'test_seconds_bucket{le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{le="1.0"} 3' in lines
+    assert 'test_seconds_bucket{le="+Inf"} 4' in lines
+    assert "test_seconds_count 4" in lines
+
+def test_registry_rejects_mismatched_metric_type():
+    metrics.counter("test_metric_total", "Test counter.")
+
+    with pytest.raises(ValueError, match="not a histogram"):
+        metrics.histogram("test_metric_total", "Test histogram.")
+
+@pytest.mark.parametrize(("enabled", "expected_increase"), [(True, 1), (False, 0)])
+def test_move_generation_is_only_counted_when_enabled(monkeypatch, enabled, expected_increase):
+    monkeypatch.setattr(metrics, "enabled", enabled)
+    calls_before = metrics.MOVE_GENERATION_CALLS.value
+
+    get_legal_moves(board=initialise_board(), colour="Dark")
+
+    assert metrics.MOVE_GENERATION_CALLS.value - calls_before == expected_increase
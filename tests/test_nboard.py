@@ -0,0 +1,61 @@
+import io
+
+import pytest
+
+from othello.components import initialise_board, make_move
+from othello.nboard import move_to_notation, notation_to_move, parse_ggf_game, run_engine
+
+STARTING_GGF = (
+    "(;GM[Othello]PC[NBoard]PB[Dark]PW[Light]RE[?]TI[5:00]TY[8]"
+    "BO[8 --------\n---------------------------O*------*O--------------------------- *]"
+    "B[D3//1.2]W[C3];)"
+)
+
+def run_commands(commands: list[str]) -> list[str]:
+    output = io.StringIO()
+    run_engine(input_stream=io.StringIO("\n".join(commands) + "\n"), output=output)
+
+    return output.getvalue().splitlines()
+
+@pytest.mark.parametrize(("move", "notation"), [((2, 3), "d3"), ((7, 0), "a8"), (None, "PA")])
+def test_move_notation_round_trip(move, notation):
+    assert move_to_notation(move) == notation
+    assert notation_to_move(notation) == move
+
+def test_parse_ggf_game_plays_moves():
+    board, colour = parse_ggf_game(STARTING_GGF.replace("--------\n", ""))
+
+    expected_board = initialise_board()
+    make_move(board=expected_board, move=(2, 3), colour="Dark")
+    make_move(board=expected_board, move=(2, 2), colour="Light")
+
+    assert board == expected_board
+    assert colour == "Dark"
+
+def test_engine_session():
+    output = run_commands([
+        "nboard 2",
+        "set depth 3",
+        "set game " + STARTING_GGF.replace("--------\n", ""),
+        "hint 3",
+        "go",
+        "move d3",
+        "ping 7",
+        "quit",
+    ])
+
+    assert output[0] == "set myname Othello"
+    assert len([line for line in output if line.startswith("search ")]) == 3
+    assert any(line.startswith("=== ") for line in output)
+    assert output[-1] == "pong 7"
+
+def test_stop_interrupts_search():
+    output = run_commands([
+        "set position " + "-" * 27 + "OX------XO" + "-" * 27 + " X",
+        "go time 60000",
+        "stop",
+        "quit",
+    ])
+
+    best_move = [line for line in output if line.startswith("=== ")][0].split()[1].split("/")[0]
+    assert best_move in ["d3", "c4", "f5", "e6"]
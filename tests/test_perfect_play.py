@@ -0,0 +1,96 @@
+import pytest
+
+from othello.ai import WIN_SCORE, search_move
+from othello.bitboard import (
+    board_to_bitboards, get_board_masks, get_legal_moves_bits, make_move_bits, move_to_bit
+)
+from othello.components import initialise_board, invert_player_colour, make_move
+from othello.perfect_play import (
+    TABLE_DIRECTORY_VARIABLE, PerfectPlayTable, get_perfect_play_table, get_start_position,
+    get_table_path, solve_board_size, solve_position, write_table
+)
+from othello.symmetry import TRANSFORM_COUNT, transform_bits
+
+@pytest.fixture(scope="module")
+def solutions():
+    return solve_board_size(board_size=4, workers=1, split_plies=2)
+
+@pytest.fixture
+def table_directory(tmp_path, solutions, monkeypatch):
+    write_table(solutions=solutions, board_size=4, path=get_table_path(str(tmp_path), 4))
+    monkeypatch.setenv(TABLE_DIRECTORY_VARIABLE, str(tmp_path))
+    get_perfect_play_table.cache_clear()
+
+    yield tmp_path
+
+    get_perfect_play_table.cache_clear()
+
+def test_small_board_is_solved(solutions):
+    serial_solutions = {}
+    dark, light = get_start_position(4)
+
+    # Light wins 4x4 Othello 11-3 with perfect play
+    assert solve_position(dark, light, get_board_masks(4), serial_solutions) == -8
+    assert solutions == serial_solutions
+
+def test_table_lookups_match_solutions(tmp_path, solutions):
+    path = get_table_path(str(tmp_path), 4)
+    write_table(solutions=solutions, board_size=4, path=path)
+    table = PerfectPlayTable(path)
+    masks = get_board_masks(4)
+
+    assert table.record_count == len(solutions)
+    assert table.lookup(0, 0) is None
+
+    for player, opponent in list(solutions)[::20]:
+        value, _ = solutions[(player, opponent)]
+
+        # Every symmetric equivalent has the same value, and its best move keeps that value
+        for transform in range(TRANSFORM_COUNT):
+            transformed_player = transform_bits(player, transform, 4)
+            transformed_opponent = transform_bits(opponent, transform, 4)
+            table_value, move_bit = table.lookup(transformed_player, transformed_opponent)
+
+            assert table_value == value
+
+            if move_bit == 0:
+                assert get_legal_moves_bits(transformed_player, transformed_opponent, masks) == 0
+                continue
+
+            child_player, child_opponent = make_move_bits(
+                transformed_player, transformed_opponent, move_bit, masks
+            )
+            assert table.lookup(child_opponent, child_player)[0] == -value
+
+def test_invalid_table_is_rejected(tmp_path):
+    path = tmp_path / "perfect_4x4.bin"
+    path.write_bytes(b"not a table")
+
+    with pytest.raises(ValueError, match="not a perfect play table"):
+        PerfectPlayTable(str(path))
+
+def test_ai_plays_table_moves(table_directory):
+    board = initialise_board(4)
+    search_result = search_move(board=board, colour="Dark")
+    dark, light = board_to_bitboards(board=board)
+
+    assert search_result.score == -WIN_SCORE - 8
+    assert search_result.nodes == 0
+    assert move_to_bit(search_result.move, 4) == get_perfect_play_table(4).lookup(dark, light)[1]
+
+    # Playing out the principal variation reaches the perfect play result
+    colour = "Dark"
+    for move in search_result.principal_variation:
+        if move is not None:
+            make_move(board=board, move=move, colour=colour)
+
+        colour = invert_player_colour(colour)
+
+    dark, light = board_to_bitboards(board=board)
+    assert dark.bit_count() - light.bit_count() == -8
+
+def test_boards_without_tables_are_searched(table_directory):
+    search_result = search_move(board=initialise_board(6), colour="Dark", max_depth=2)
+
+    assert get_perfect_play_table(6) is None
+    assert search_result.nodes > 0
@@ -0,0 +1,39 @@
+import time
+
+from othello.ai import get_potential_board_states
+from othello.ponder import Ponderer
+from testing_utils import get_midgame_board
+
+def wait_for_results(session, expected_count: int, timeout_s: float = 10):
+    end_time = time.perf_counter() + timeout_s
+
+    while len(session.results) < expected_count and time.perf_counter() < end_time:
+        time.sleep(0.01)
+
+def test_ponderer_searches_every_reply():
+    board, human_colour = get_midgame_board()
+    ponderer = Ponderer(max_workers=2)
+
+    ponderer.start(game_id="game", board=board, human_colour=human_colour, deadline_ms=20)
+    session = ponderer.sessions["game"]
+
+    potential_board_states = get_potential_board_states(board=board, colour=human_colour)
+    wait_for_results(session, len(potential_board_states))
+
+    for potential_board_state in potential_board_states.values():
+        ai_colour = "Light" if human_colour == "Dark" else "Dark"
+        assert session.lookup(board=potential_board_state, colour=ai_colour) is not None
+
+    assert ponderer.stop("game") is session
+
+def test_stopped_session_is_not_filled():
+    board, human_colour = get_midgame_board()
+    ponderer = Ponderer(max_workers=1)
+
+    ponderer.start(game_id="game", board=board, human_colour=human_colour, deadline_ms=200)
+    session = ponderer.stop("game")
+    time.sleep(0.3)
+
+    assert session.stop_event.is_set()
+    assert "game" not in ponderer.sessions
+    assert len(session.results) == 0
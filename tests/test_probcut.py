@@ -0,0 +1,39 @@
+import random
+
+import pytest
+
+from othello.ai import ProbCutLine
+from othello.probcut import collect_samples, fit_probcut_lines, get_sample_positions
+
+def test_fitted_line_recovers_prediction():
+    rng = random.Random(0)
+    shallow_scores = [rng.uniform(-100, 100) for _ in range(2000)]
+    samples = {
+        (8, 4, 2, True): [
+            (shallow_score, 1.2 * shallow_score + 5 + rng.gauss(0, 10))
+            for shallow_score in shallow_scores
+        ],
+        # Deep scores that fall as shallow scores rise cannot be used to prune
+        (8, 5, 3, True): [(shallow_score, -shallow_score) for shallow_score in shallow_scores],
+    }
+
+    probcut_lines = fit_probcut_lines(samples)
+
+    assert list(probcut_lines) == [(8, 4, 2, True)]
+    assert probcut_lines[(8, 4, 2, True)].slope == pytest.approx(1.2, abs=0.05)
+    assert probcut_lines[(8, 4, 2, True)].intercept == pytest.approx(5, abs=1)
+    assert probcut_lines[(8, 4, 2, True)].sigma == pytest.approx(10, abs=1)
+
+def test_samples_are_collected_for_each_depth_pair():
+    positions = get_sample_positions(board_size=6, count=8, seed=1)
+    samples = collect_samples(positions, max_depth=5)
+
+    assert set(samples) <= {
+        (6, depth, shallow_depth, maximising)
+        for depth, shallow_depth in [(3, 1), (4, 2), (5, 1), (5, 3)]
+        for maximising in (True, False)
+    }
+    assert len(samples[(6, 3, 1, True)]) > 0
+
+    probcut_lines = fit_probcut_lines(samples)
+    assert all(isinstance(probcut_line, ProbCutLine) for probcut_line in probcut_lines.values())
@@ -0,0 +1,46 @@
+import pytest
+
+from othello.ai import AnalysisCache
+from othello.review import get_review_positions, review_game
+from testing_utils import get_random_game_moves
+
+def test_review_positions_skip_passes():
+    moves = [("Dark", (2, 3)), ("Light", None), ("Dark", (5, 4))]
+
+    positions = get_review_positions(moves, board_size=8)
+
+    assert [(ply, colour, move) for ply, _, colour, move in positions] == [
+        (1, "Dark", (2, 3)), (3, "Dark", (5, 4))
+    ]
+
+def test_illegal_move_is_rejected_before_reviewing():
+    with pytest.raises(ValueError, match="Move 1 by Dark"):
+        review_game([("Dark", (0, 0))], board_size=8)
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_review_covers_every_move(workers: int):
+    moves = get_random_game_moves(moves=10, board_size=6)
+
+    reviews = list(review_game(moves, board_size=6, depth=2, time_ms=None, workers=workers))
+
+    assert sorted(review["ply"] for review in reviews) == [
+        ply for ply, (_, move) in enumerate(moves, start=1) if move is not None
+    ]
+
+    for review in reviews:
+        assert review["loss"] >= 0
+        assert review["best_score"] >= review["played_score"]
+
+def test_review_reuses_cached_positions():
+    moves = get_random_game_moves(moves=6, board_size=6)
+    cache = AnalysisCache()
+
+    first_reviews = list(review_game(moves, board_size=6, depth=2, time_ms=None, cache=cache))
+    cached_entries = len(cache.entries)
+    second_reviews = list(review_game(moves, board_size=6, depth=2, time_ms=None, cache=cache))
+
+    assert cached_entries > 0
+    assert len(cache.entries) == cached_entries
+    assert sorted(second_reviews, key=lambda review: review["ply"]) == sorted(
+        first_reviews, key=lambda review: review["ply"]
+    )
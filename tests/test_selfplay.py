@@ -0,0 +1,63 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from othello.selfplay import (  # noqa: E402
+    SelfPlayDataset, generate_dataset, iterate_chunks, play_selfplay_game
+)
+
+def test_game_records_are_labelled_for_side_to_move():
+    records = play_selfplay_game(seed=1, board_size=6, random_moves=4, depth=1)
+
+    assert len(records) > 10
+
+    for _, dark, light, side, label in records:
+        assert len(dark) == len(light) == 5
+        assert side in (0, 1)
+        assert -36 <= label <= 36
+
+    # Both sides see the same final result from opposite points of view
+    labels_by_side = {side: label for _, _, _, side, label in records}
+    assert labels_by_side[0] == -labels_by_side[1]
+
+def test_dataset_is_deduplicated_across_chunks(tmp_path):
+    dataset = generate_dataset(str(tmp_path), games=6, board_size=6, random_moves=2, depth=1)
+    records = np.concatenate(list(iterate_chunks(str(tmp_path))))
+
+    assert len(records) == dataset.record_count
+    assert len(np.unique(records["hash"])) == len(records)
+
+    small_chunk_dataset = SelfPlayDataset(str(tmp_path / "small"), board_size=6, chunk_records=16)
+    records = play_selfplay_game(seed=0, board_size=6, random_moves=2, depth=1)
+
+    small_chunk_dataset.add_records(records)
+    small_chunk_dataset.flush()
+
+    assert len(small_chunk_dataset.chunk_counts) > 1
+    assert all(count <= 16 for count in small_chunk_dataset.chunk_counts)
+
+def test_interrupted_run_resumes(tmp_path):
+    generate_dataset(str(tmp_path / "full"), games=4, board_size=6, random_moves=2, depth=1)
+    generate_dataset(str(tmp_path / "resumed"), games=2, board_size=6, random_moves=2, depth=1)
+    resumed = generate_dataset(
+        str(tmp_path / "resumed"), games=4, board_size=6, random_moves=2, depth=1, workers=2
+    )
+
+    full_records = np.concatenate(list(iterate_chunks(str(tmp_path / "full"))))
+    resumed_records = np.concatenate(list(iterate_chunks(str(tmp_path / "resumed"))))
+
+    assert resumed.games_played == 4
+    assert (resumed_records == full_records).all()
+
+    # Hashes are reloaded as a sorted array, so replayed records are not added again
+    assert resumed.hashes.dtype == np.uint64
+    assert (resumed.hashes == np.sort(full_records["hash"])).all()
+
+    replayed = play_selfplay_game(seed=0, board_size=6, random_moves=2, depth=1)
+    assert SelfPlayDataset(str(tmp_path / "resumed"), board_size=6).add_records(replayed) == 0
+
+def test_dataset_rejects_other_board_size(tmp_path):
+    generate_dataset(str(tmp_path), games=1, board_size=6, random_moves=2, depth=1)
+
+    with pytest.raises(ValueError, match="6x6"):
+        SelfPlayDataset(str(tmp_path), board_size=8)
@@ -0,0 +1,70 @@
+from othello.components import initialise_board
+from othello.store import GameStore
+
+def get_game_record(finished: bool = False) -> dict:
+    return {
+        "board": initialise_board(4),
+        "current_player_colour": "Dark",
+        "moves_left": 12,
+        "game_finished": finished,
+        "game_mode": "ai"
+    }
+
+def test_saved_game_can_be_loaded(tmp_path):
+    store = GameStore(path=str(tmp_path / "games.sqlite3"))
+
+    store.save_game("game", get_game_record())
+
+    assert store.load_game("game") == get_game_record()
+    assert store.load_game("unknown game") is None
+
+def test_games_survive_reopening(tmp_path):
+    path = str(tmp_path / "games.sqlite3")
+    store = GameStore(path=path)
+
+    store.save_game("game", get_game_record())
+    store.record_move("game", "Dark", (0, 1))
+    store.close()
+
+    reopened_store = GameStore(path=path)
+
+    assert reopened_store.load_game("game") == get_game_record()
+    assert [move["move"] for move in reopened_store.get_moves("game")] == [(0, 1)]
+
+def test_moves_are_returned_in_order_with_passes(tmp_path):
+    store = GameStore(path=str(tmp_path / "games.sqlite3"), batch_size=2)
+
+    store.record_move("game", "Dark", (0, 1))
+    store.record_move("game", "Light", None)
+    store.record_move("game", "Dark", (2, 3))
+    store.record_move("other game", "Dark", (1, 0))
+
+    moves = store.get_moves("game")
+
+    assert [move["colour"] for move in moves] == ["Dark", "Light", "Dark"]
+    assert [move["move"] for move in moves] == [(0, 1), None, (2, 3)]
+
+def test_history_and_stats(tmp_path):
+    store = GameStore(path=str(tmp_path / "games.sqlite3"))
+
+    store.save_game("dark win", get_game_record(finished=True), result="Dark")
+    store.save_game("draw", get_game_record(finished=True), result="Draw")
+    store.save_game("unfinished", get_game_record())
+
+    for game_id in ("dark win", "draw"):
+        store.record_move(game_id, "Dark", (0, 1))
+        store.record_move(game_id, "Light", (0, 0))
+
+    finished_games = store.list_games(finished=True)
+
+    assert [game["game_id"] for game in finished_games] == ["draw", "dark win"]
+    assert all(game["finished_at"] is not None for game in finished_games)
+    assert [game["game_id"] for game in store.list_games(result="Dark")] == ["dark win"]
+    assert len(store.list_games(limit=1)) == 1
+
+    assert store.get_stats() == {
+        "games": 3,
+        "finished_games": 2,
+        "results": {"Dark": 1, "Draw": 1},
+        "average_moves": 2
+    }
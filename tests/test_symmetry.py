@@ -0,0 +1,64 @@
+import pytest
+
+from othello.bitboard import board_to_bitboards, bitboards_to_board
+from othello.components import get_legal_moves, initialise_board
+from othello.symmetry import (
+    INVERSE_TRANSFORMS, TRANSFORM_COUNT, canonicalize_board, canonicalize_bitboards,
+    transform_bits, transform_move, transform_move_bit
+)
+from testing_utils import get_midgame_board
+
+def transform_board(board, transform):
+    size = len(board)
+    dark, light = board_to_bitboards(board)
+
+    return bitboards_to_board(
+        transform_bits(dark, transform, size), transform_bits(light, transform, size), size
+    )
+
+@pytest.mark.parametrize("transform", range(TRANSFORM_COUNT))
+@pytest.mark.parametrize("size", [4, 6, 8, 16])
+def test_inverse_transform_restores_bits(transform: int, size: int):
+    bits = (1 << (size * size)) // 3
+
+    transformed_bits = transform_bits(bits, transform, size)
+
+    assert transformed_bits.bit_count() == bits.bit_count()
+    assert transform_bits(transformed_bits, INVERSE_TRANSFORMS[transform], size) == bits
+
+@pytest.mark.parametrize("transform", range(TRANSFORM_COUNT))
+def test_transforms_move_bits_and_cells_together(transform: int):
+    for index in range(64):
+        row, col = divmod(index, 8)
+        moved_row, moved_col = transform_move((row, col), transform, 8)
+
+        assert transform_bits(1 << index, transform, 8) == 1 << (moved_row * 8 + moved_col)
+        assert transform_move_bit(1 << index, transform, 8) == 1 << (moved_row * 8 + moved_col)
+
+def test_symmetric_positions_share_canonical_form():
+    board, _ = get_midgame_board()
+    canonical_board, _ = canonicalize_board(board)
+
+    for transform in range(TRANSFORM_COUNT):
+        assert canonicalize_board(transform_board(board, transform))[0] == canonical_board
+
+def test_canonical_moves_map_back_to_legal_moves():
+    board, colour = get_midgame_board()
+    canonical_board, transform = canonicalize_board(board)
+
+    assert transform_board(board, transform) == canonical_board
+
+    mapped_moves = [
+        transform_move(move, INVERSE_TRANSFORMS[transform], 8)
+        for move in get_legal_moves(board=canonical_board, colour=colour)
+    ]
+
+    assert sorted(mapped_moves) == sorted(get_legal_moves(board=board, colour=colour))
+
+def test_starting_position_is_its_own_canonical_form():
+    board = initialise_board(8)
+
+    dark, light = board_to_bitboards(board)
+
+    assert canonicalize_bitboards(dark, light, 8)[:2] == (dark, light)
+    assert canonicalize_board(board)[0] == board
@@ -0,0 +1,58 @@
+import pytest
+
+from othello.components import initialise_board, make_move
+from othello.tokens import decode_game_token, encode_game_token
+
+SECRET = b"secret"
+
+@pytest.mark.parametrize("board_size", [4, 6, 8, 16])
+def test_token_round_trip(board_size: int):
+    board = initialise_board(board_size)
+    make_move(board=board, move=(board_size // 2 - 2, board_size // 2 - 1), colour="Dark")
+
+    game = {
+        "board": board,
+        "current_player_colour": "Light",
+        "moves_left": board_size * board_size - 5,
+        "game_finished": False,
+        "game_mode": "ai"
+    }
+
+    assert decode_game_token(encode_game_token(game, SECRET), SECRET) == game
+
+def test_token_is_compact_and_url_safe():
+    game = {
+        "board": initialise_board(8),
+        "current_player_colour": "Dark",
+        "moves_left": 60,
+        "game_finished": True,
+        "game_mode": "pvp"
+    }
+
+    token = encode_game_token(game, SECRET)
+
+    # 5 header bytes, 16 board bytes and a 16 byte signature
+    assert len(token) == 50
+    assert all(character.isalnum() or character in "-_" for character in token)
+
+@pytest.mark.parametrize("token", ["", "not a token", "A" * 50])
+def test_invalid_tokens_are_rejected(token: str):
+    with pytest.raises(ValueError, match="Invalid game token."):
+        decode_game_token(token, SECRET)
+
+def test_tampered_or_foreign_tokens_are_rejected():
+    game = {
+        "board": initialise_board(8),
+        "current_player_colour": "Dark",
+        "moves_left": 60,
+        "game_finished": False,
+        "game_mode": "pvp"
+    }
+    token = encode_game_token(game, SECRET)
+    tampered_token = token[:10] + ("B" if token[10] != "B" else "C") + token[11:]
+
+    with pytest.raises(ValueError, match="Invalid game token."):
+        decode_game_token(tampered_token, SECRET)
+
+    with pytest.raises(ValueError, match="Invalid game token."):
+        decode_game_token(token, b"another secret")
@@ -0,0 +1,65 @@
+import dataclasses
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from othello.ai import EvaluationWeights, load_evaluation_weights, score_bitboards  # noqa: E402
+from othello.bitboard import get_board_masks  # noqa: E402
+from othello.selfplay import generate_dataset, iterate_chunks  # noqa: E402
+from othello.tuning import (  # noqa: E402
+    get_features, load_features, main, tune_weights, write_weights
+)
+
+# Test that the vectorised features reproduce score_bitboards for both colours
+@pytest.mark.parametrize("board_size", [6, 8, 10])
+def test_features_match_score_bitboards(tmp_path, board_size: int):
+    generate_dataset(str(tmp_path), games=3, board_size=board_size, random_moves=6, depth=1)
+    records = np.concatenate(list(iterate_chunks(str(tmp_path))))
+    features, results = get_features(records, board_size)
+    scores = features @ np.array(dataclasses.astuple(EvaluationWeights()))
+    masks = get_board_masks(board_size)
+
+    for index, record in enumerate(records):
+        dark = int.from_bytes(record["dark"].tobytes(), "little")
+        light = int.from_bytes(record["light"].tobytes(), "little")
+
+        assert scores[index] == score_bitboards(dark, light, masks)
+        assert scores[index + len(records)] == score_bitboards(light, dark, masks)
+
+    assert np.all(results[:len(records)] + results[len(records):] == 1)
+
+def test_tuning_recovers_weights():
+    rng = np.random.default_rng(0)
+    features = rng.integers(0, 5, size=(20_000, 7)).astype(float)
+    true_weights = np.array([10, 25, -5, -15, 2, 3, 4])
+    scale = 0.02
+
+    probabilities = 1 / (1 + np.exp(-scale * (features @ true_weights)))
+    results = (rng.random(len(features)) < probabilities).astype(float)
+
+    tuning_result = tune_weights(features=features, results=results)
+
+    assert tuning_result.tuned_loss < tuning_result.default_loss
+    assert tuning_result.weights.edge > tuning_result.weights.corner > 0
+    assert tuning_result.weights.edge_adj < tuning_result.weights.corner_adj < 0
+
+def test_tuned_weights_file_is_loadable(tmp_path):
+    generate_dataset(str(tmp_path / "data"), games=4, board_size=6, random_moves=4, depth=1)
+    weights_path = str(tmp_path / "weights.json")
+
+    main([str(tmp_path / "data"), "--output", weights_path])
+
+    with open(weights_path) as weights_file:
+        assert set(json.load(weights_file)) == {
+            weight_field.name for weight_field in dataclasses.fields(EvaluationWeights)
+        }
+
+    assert isinstance(load_evaluation_weights(weights_path), EvaluationWeights)
+
+    features, _ = load_features(str(tmp_path / "data"), max_positions=10)
+    assert len(features) == 20
+
+    write_weights(EvaluationWeights(corner=99), weights_path)
+    assert load_evaluation_weights(weights_path).corner == 99
@@ -1,9 +1,10 @@
+import random
+
 from othello.components import (
-    BOARD_TYPE, CELL_TYPE, initialise_board,
-    find_winner, make_move, invert_player_colour, player_can_move
+    BOARD_TYPE, CELL_TYPE, initialise_board, get_legal_moves,
+    make_move, invert_player_colour, player_can_move
 )
-from othello.game_engine import MAX_MOVES, STARTING_PLAYER, BOARD_SIZE
-from othello.ai import get_random_move, get_ai_move
+from othello.game_engine import STARTING_PLAYER, BOARD_SIZE
 from typing import Literal, cast
 
 def get_board_with_assignments(
@@ -35,58 +36,45 @@ def get_board_by_type(
 
         return cast(BOARD_TYPE, board)
 
-def ai_game_loop(random_moves: bool = False) -> str | None:
-    """Begin the AI game loop and return the winner."""
-    # Initalise game variables
-    move_counter = MAX_MOVES
+def get_midgame_board(moves: int = 20, seed: int = 1) -> tuple[BOARD_TYPE, str]:
+    """Return a board reached by seeded random moves, and the colour to move next."""
+    rng = random.Random(seed)
     board = initialise_board(BOARD_SIZE)
-    current_player_colour = STARTING_PLAYER
-
-    # Continue the game loop until either one player wins, or the move counter runs out
-    while move_counter > 0:
-        # Find the indices of all open cells
-        open_cell_indices = []
+    colour = STARTING_PLAYER
 
-        for row in range(0, BOARD_SIZE):
-            for col in range(0, BOARD_SIZE):
-                if board[row][col] is None:
-                    open_cell_indices.append((row, col))
+    for _ in range(moves):
+        legal_moves = get_legal_moves(board=board, colour=colour)
 
-        opponent_colour = invert_player_colour(current_player_colour)
+        if len(legal_moves) > 0:
+            make_move(board=board, move=rng.choice(legal_moves), colour=colour)
 
-        # Use the open cell indices to check if moves are available to any player
-        current_player_can_move = player_can_move(board=board, colour=current_player_colour)
+        colour = invert_player_colour(colour)
 
-        opponent_can_move = player_can_move(board=board, colour=opponent_colour)
+    return board, colour
 
-        # If there are no legal moves left, exit the game loop
-        if not current_player_can_move and not opponent_can_move:
+def get_random_game_moves(
+    moves: int = 20,
+    board_size: int = BOARD_SIZE,
+    seed: int = 1
+) -> list[tuple[str, tuple[int, int] | None]]:
+    """Return seeded random moves from the start of a game, with None for a pass."""
+    rng = random.Random(seed)
+    board = initialise_board(board_size)
+    colour = STARTING_PLAYER
+    played_moves = []
+
+    for _ in range(moves):
+        legal_moves = get_legal_moves(board=board, colour=colour)
+
+        if len(legal_moves) > 0:
+            move = rng.choice(legal_moves)
+            make_move(board=board, move=move, colour=colour)
+            played_moves.append((colour, move))
+        elif player_can_move(board=board, colour=invert_player_colour(colour)):
+            played_moves.append((colour, None))
+        else:
             break
-        # Skip the player's turn if they no move is available
-        if not current_player_can_move and opponent_can_move:
-            current_player_colour = opponent_colour
-        elif current_player_can_move:
-            move_made = False
-
-            # Get move (either AI generated, or random)
-            while not move_made:
-                if random_moves and current_player_colour is STARTING_PLAYER:
-                    move = get_random_move(board=board, colour=current_player_colour)
-                else:
-                    move = get_ai_move(board=board, colour=current_player_colour)
-
-                if move is not None:
-                    try:
-                        make_move(board=board, move=move, colour=current_player_colour)
-                    except ValueError as e:
-                        raise e
-                    else:
-                        move_made = True
-                else:
-                    raise RuntimeError("Failed to generated AI move.")
-
-            # Once the move has been made, decrement the move counter and swap turns
-            move_counter -= 1
-            current_player_colour = opponent_colour
-
-    return find_winner(board)
+
+        colour = invert_player_colour(colour)
+
+    return played_moves